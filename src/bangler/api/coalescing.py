@@ -0,0 +1,142 @@
+"""
+Request Coalescing for SKU Price Lookups
+Concurrent lookups for the same SKU share one in-flight request, and lookups
+arriving within a short window are merged into one multi-SKU request
+"""
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+from .rate_limit import BULK, INTERACTIVE, current_priority, request_priority
+
+
+class SkuPriceCoalescer:
+    """
+    Single-flight, micro-batching front end for per-SKU price lookups
+
+    The first caller to arrive opens a batch and becomes its leader: it waits
+    window_ms for other lookups to join, then fetches every pending SKU in one
+    call and resolves all waiters. A caller asking for a SKU that is already
+    pending or in flight waits on the existing result instead of issuing its
+    own request. Nothing is cached: once a batch resolves, the next lookup for
+    a SKU fetches it afresh.
+
+    A batch is fetched at interactive priority if any caller waiting on it
+    is interactive, so a bulk leader never spends an interactive caller's
+    request as bulk. If the leader fails for any reason (including an
+    interrupt during the window), every lookup it was responsible for is
+    failed rather than left waiting.
+    """
+
+    def __init__(self, fetch: Callable[[List[str]], Dict[str, Any]], window_ms: float = 5.0, max_batch: int = 100):
+        """
+        Args:
+            fetch: Function taking a list of SKUs and returning a search_products-style
+                response ({'success': ..., 'products': [...], ...})
+            window_ms: How long a batch leader waits for other lookups to join
+            max_batch: Maximum SKUs per fetch; larger batches are split
+        """
+        self._fetch = fetch
+        self.window_s = max(window_ms, 0) / 1000.0
+        self.max_batch = max_batch
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._pending: List[str] = []
+        self._pending_interactive = False
+        self._batch_open = False
+
+        self.lookups = 0
+        self.coalesced = 0
+        self.requests = 0
+
+    def get(self, sku: str) -> Dict[str, Any]:
+        """Price lookup for one SKU, shared with any concurrent lookup for it"""
+        interactive = current_priority() == INTERACTIVE
+        with self._lock:
+            self.lookups += 1
+            if self._batch_open:
+                self._pending_interactive |= interactive
+            future = self._in_flight.get(sku)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = self._in_flight[sku] = Future()
+                self._pending.append(sku)
+                leader = not self._batch_open
+                if leader:
+                    self._pending_interactive = interactive
+                self._batch_open = True
+
+        if leader:
+            self._run_batch()
+        return future.result()
+
+    def _take_batch(self) -> tuple:
+        with self._lock:
+            batch, self._pending = self._pending, []
+            interactive, self._pending_interactive = self._pending_interactive, False
+            self._batch_open = False
+            return {sku: self._in_flight[sku] for sku in batch}, interactive
+
+    def _run_batch(self) -> None:
+        futures = None
+        try:
+            if self.window_s:
+                time.sleep(self.window_s)
+            futures, interactive = self._take_batch()
+            batch = list(futures)
+
+            with request_priority(INTERACTIVE if interactive else BULK):
+                for start in range(0, len(batch), self.max_batch):
+                    chunk = batch[start:start + self.max_batch]
+                    try:
+                        with self._lock:
+                            self.requests += 1
+                        response = self._fetch(chunk)
+                    except Exception as e:
+                        response = {"products": [], "success": False, "error": str(e), "product_count": 0}
+                    self._resolve(chunk, response)
+        finally:
+            if futures is None:
+                futures, _ = self._take_batch()
+            self._abandon(futures)
+
+    def _abandon(self, futures: Dict[str, Future]) -> None:
+        """Fail any of a batch's lookups that were never resolved"""
+        with self._lock:
+            unresolved = [(sku, future) for sku, future in futures.items() if not future.done()]
+            for sku, future in unresolved:
+                if self._in_flight.get(sku) is future:
+                    del self._in_flight[sku]
+        for sku, future in unresolved:
+            future.set_exception(RuntimeError(f"Price lookup for SKU {sku} was abandoned"))
+
+    def _resolve(self, skus: List[str], response: Dict[str, Any]) -> None:
+        products = response.get("products") or []
+        by_sku = {}
+        for product in products:
+            product_sku = product.get("SKU") or product.get("Sku")
+            if product_sku:
+                by_sku.setdefault(product_sku, product)
+        if len(skus) == 1 and products and skus[0] not in by_sku:
+            # Single-SKU request: trust the API's match, as get_sku_price always has
+            by_sku[skus[0]] = products[0]
+
+        with self._lock:
+            futures = [(sku, self._in_flight.pop(sku)) for sku in skus]
+
+        for sku, future in futures:
+            result = dict(response)
+            if response.get("success"):
+                products = [by_sku[sku]] if sku in by_sku else []
+                result.update(products=products, product_count=len(products), total_products=len(products))
+            future.set_result(result)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Lookup, coalesced-lookup and upstream request counts"""
+        with self._lock:
+            return {"lookups": self.lookups, "coalesced": self.coalesced, "requests": self.requests}
@@ -0,0 +1,228 @@
+"""
+Client-Side Rate Limiting for Stuller Requests
+Token bucket shared by every thread and, through a locked state file, every
+bangler process on the host, with a reserve that bulk jobs can't spend
+"""
+
+import logging
+import math
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, limit within this process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+_priority: ContextVar[str] = ContextVar("bangler_request_priority", default=INTERACTIVE)
+
+_STATE = struct.Struct("<dd")   # tokens, updated_at (Unix time)
+
+
+class RateLimitTimeout(Exception):
+    """No rate limit token became available within the caller's wait limit"""
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """
+    Seconds to wait from a Retry-After header
+
+    Accepts delay-seconds (including fractions, e.g. '1.5') and HTTP dates
+    ('Wed, 21 Oct 2026 07:28:00 GMT'). Missing or unparseable values give
+    the default; dates in the past give 0.
+    """
+    value = (value or "").strip()
+    if not value:
+        return default
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError, IndexError):
+            return default
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - datetime.now(timezone.utc)).total_seconds()
+    if not math.isfinite(seconds):
+        return default
+    return max(seconds, 0.0)
+
+
+@contextmanager
+def request_priority(priority: str):
+    """Make Stuller requests in this context at the given priority (INTERACTIVE or BULK)"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def bulk_priority():
+    """Mark Stuller requests made in this context as bulk (they leave the reserve to interactive quotes)"""
+    return request_priority(BULK)
+
+
+def current_priority() -> str:
+    return _priority.get()
+
+
+class TokenBucket:
+    """
+    Token bucket limiting requests to `rate` per second with bursts up to `burst`
+
+    Interactive requests may spend every token; bulk requests stop while
+    `reserve` (a fraction of the burst) is left, so a counter quote arriving
+    during a bulk requote waits at most for its own token. With a state path,
+    the bucket lives in a 16-byte file updated under an exclusive flock, so
+    every process using the same file shares one budget.
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None, reserve: float = 0.25,
+                 path: Optional[str] = None):
+        if rate <= 0:
+            raise ValueError("Rate limit must be positive")
+        self.rate = rate
+        self.burst = max(burst or rate, 2.0)
+        # Bulk callers need `reserve + 1` tokens, so the reserve can't use the whole burst
+        self.reserve_tokens = min(max(reserve, 0.0) * self.burst, self.burst - 1)
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._tokens = self.burst
+        self._updated_at = time.time()
+        if path and fcntl is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        elif path:
+            logger.warning("File locking unavailable on this platform; rate limit applies to this process only")
+
+        self.acquired = {INTERACTIVE: 0, BULK: 0}
+        self.waited_s = {INTERACTIVE: 0.0, BULK: 0.0}
+
+    # -- shared state ---------------------------------------------------
+
+    def _read(self) -> None:
+        if self._fd is None:
+            return
+        data = os.pread(self._fd, _STATE.size, 0)
+        if len(data) == _STATE.size:
+            self._tokens, self._updated_at = _STATE.unpack(data)
+        else:
+            self._tokens, self._updated_at = self.burst, time.time()
+
+    def _write(self) -> None:
+        if self._fd is not None:
+            os.pwrite(self._fd, _STATE.pack(self._tokens, self._updated_at), 0)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock:
+            if self._fd is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                self._read()
+                yield
+                self._write()
+            finally:
+                if self._fd is not None:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + max(now - self._updated_at, 0.0) * self.rate)
+        self._updated_at = max(now, self._updated_at)
+
+    # -- public API -----------------------------------------------------
+
+    def try_acquire(self, priority: str = INTERACTIVE) -> float:
+        """Take a token if one is available; otherwise return the seconds to wait"""
+        floor = self.reserve_tokens if priority == BULK else 0.0
+        with self._locked():
+            self._refill(time.time())
+            if self._tokens - 1 >= floor:
+                self._tokens -= 1
+                return 0.0
+            return (floor + 1 - self._tokens) / self.rate
+
+    def acquire(self, priority: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a token is available
+
+        Args:
+            priority: INTERACTIVE or BULK (default: the current context's priority)
+            timeout: Give up after this many seconds (None waits indefinitely)
+
+        Returns:
+            True once a token was taken, False on timeout
+        """
+        priority = priority or current_priority()
+        started = time.monotonic()
+        while True:
+            wait = self.try_acquire(priority)
+            if wait <= 0:
+                with self._lock:
+                    self.acquired[priority] += 1
+                    self.waited_s[priority] += time.monotonic() - started
+                return True
+            if timeout is not None and time.monotonic() - started + wait > timeout:
+                return False
+            time.sleep(wait)
+
+    def penalize(self, seconds: float) -> None:
+        """Hold every caller back for `seconds` (e.g. after a 429 with Retry-After)"""
+        with self._locked():
+            self._refill(time.time())
+            self._tokens = min(self._tokens, 0.0) - seconds * self.rate
+
+    def get_stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "interactive_requests": self.acquired[INTERACTIVE],
+                "bulk_requests": self.acquired[BULK],
+                "interactive_wait_s": round(self.waited_s[INTERACTIVE], 3),
+                "bulk_wait_s": round(self.waited_s[BULK], 3)
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+
+
+def create_rate_limiter() -> Optional[TokenBucket]:
+    """
+    Rate limiter configured from the environment, or None if disabled
+
+    STULLER_RATE_LIMIT sets requests per second (0 disables), STULLER_RATE_BURST
+    the bucket size, STULLER_RATE_RESERVE the fraction held back from bulk jobs,
+    and STULLER_RATE_LIMIT_FILE the shared state file (empty: this process only).
+    """
+    rate = float(os.getenv("STULLER_RATE_LIMIT", "0") or 0)
+    if rate <= 0:
+        return None
+    burst = float(os.getenv("STULLER_RATE_BURST", "0") or 0) or None
+    reserve = float(os.getenv("STULLER_RATE_RESERVE", "0.25"))
+    path = os.getenv("STULLER_RATE_LIMIT_FILE", os.path.join(tempfile.gettempdir(), "bangler-stuller-rate.bucket"))
+    try:
+        return TokenBucket(rate, burst, reserve, path or None)
+    except OSError as e:
+        logger.warning(f"Shared rate limit file {path} unavailable ({e}); limiting this process only")
+        return TokenBucket(rate, burst, reserve)
@@ -4,16 +4,30 @@ Adapted from proven s2s2 patterns for reliable Stuller integration
 """
 
 import os
+import threading
 import time
 from typing import Dict, List, Any
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 
+from .coalescing import SkuPriceCoalescer
+from .rate_limit import INTERACTIVE, RateLimitTimeout, create_rate_limiter, current_priority, parse_retry_after
 
-class StullerClient:
-    """Client for Stuller API with enterprise reliability features"""
 
-    def __init__(self, username: str = None, password: str = None, base_url: str = "https://api.stuller.com/v2"):
+class StullerClient:
+    """
+    Client for Stuller API with enterprise reliability features
+
+    Safe to share between worker threads: the session's connection pool is
+    sized for concurrent callers and circuit breaker state is lock-protected.
+    Concurrent get_sku_price calls are coalesced into shared multi-SKU requests,
+    and every request takes a token from the host-wide rate limiter (if
+    STULLER_RATE_LIMIT is set).
+    """
+
+    def __init__(self, username: str = None, password: str = None, base_url: str = "https://api.stuller.com/v2",
+                 max_connections: int = 10, coalesce_window_ms: float = None):
         # Use environment variables if not provided
         self.username = username or os.getenv("STULLER_USERNAME")
         self.password = password or os.getenv("STULLER_PASSWORD")
@@ -32,32 +46,57 @@ class StullerClient:
             "User-Agent": "Bangler-Stuller-Client/1.0"
         })
 
-        # Circuit breaker state (from s2s2 pattern)
+        # One pooled connection per concurrent worker
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+        # Circuit breaker state (from s2s2 pattern), shared across threads
+        self._breaker_lock = threading.Lock()
         self.failure_count = 0
         self.max_failures = 5
 
+        # Single-flight + micro-batching for per-SKU price lookups
+        if coalesce_window_ms is None:
+            coalesce_window_ms = float(os.getenv("STULLER_COALESCE_WINDOW_MS", "5"))
+        self.price_coalescer = SkuPriceCoalescer(self._fetch_sku_batch, window_ms=coalesce_window_ms)
+
+        # Requests-per-second budget shared with other bangler processes
+        self.rate_limiter = create_rate_limiter()
+        # Longest an interactive request waits for a token (bulk requests wait as long as it takes)
+        self.rate_wait_timeout_s = float(os.getenv("STULLER_RATE_WAIT_TIMEOUT",
+                                                   os.getenv("BANGLER_LIVE_PRICE_TIMEOUT", "3")))
+
     def _make_request(self, endpoint: str, request_body: dict) -> requests.Response:
         """Internal method to make HTTP requests with circuit breaker"""
         # Simple circuit breaker - open after max failures
-        if self.failure_count >= self.max_failures:
-            raise Exception(f"Circuit breaker is open after {self.max_failures} failures")
+        with self._breaker_lock:
+            if self.failure_count >= self.max_failures:
+                raise Exception(f"Circuit breaker is open after {self.max_failures} failures")
+
+        if self.rate_limiter is not None:
+            priority = current_priority()
+            timeout = self.rate_wait_timeout_s if priority == INTERACTIVE else None
+            if not self.rate_limiter.acquire(priority, timeout=timeout):
+                raise RateLimitTimeout(f"No Stuller request slot within {timeout:g}s (rate limit)")
 
         try:
             response = self.session.post(endpoint, json=request_body, timeout=self.timeout)
+        except Exception:
+            with self._breaker_lock:
+                self.failure_count += 1
+            raise
 
-            # Reset failure count on success
-            if response.status_code == 200:
+        # Reset failure count on success
+        if response.status_code == 200:
+            with self._breaker_lock:
                 self.failure_count = 0
 
-            return response
-
-        except Exception:
-            self.failure_count += 1
-            raise
+        return response
 
     def search_products(self, filters: List[str] = None, includes: List[str] = None,
                        advanced_filters: List[Dict] = None, skus: List[str] = None,
-                       page_size: int = 100) -> Dict[str, Any]:
+                       page_size: int = 100, next_page: str = None) -> Dict[str, Any]:
         """
         Search for products using Stuller API with flexible filtering
 
@@ -67,6 +106,7 @@ class StullerClient:
             advanced_filters: Complex filters for product type, etc.
             skus: Specific SKUs to lookup
             page_size: Number of results per page
+            next_page: NextPage token from a previous response, to fetch the following page
 
         Returns:
             Dict with products, pagination info, and metadata
@@ -91,6 +131,9 @@ class StullerClient:
         if page_size:
             request_body["PageSize"] = page_size
 
+        if next_page:
+            request_body["NextPage"] = next_page
+
         start_time = time.time()
 
         try:
@@ -100,6 +143,8 @@ class StullerClient:
             if response.status_code == 401:
                 raise ValueError("Authentication failed - check Stuller credentials")
             elif response.status_code == 429:
+                if self.rate_limiter is not None:
+                    self.rate_limiter.penalize(parse_retry_after(response.headers.get("Retry-After")))
                 raise ValueError("API rate limit exceeded")
             elif response.status_code >= 400:
                 response.raise_for_status()
@@ -130,6 +175,7 @@ class StullerClient:
                 "request_time_ms": request_time_ms,
                 "success": False,
                 "error": str(e),
+                "error_type": "rate_limited" if isinstance(e, RateLimitTimeout) else "api_unavailable",
                 "product_count": 0
             }
 
@@ -141,9 +187,63 @@ class StullerClient:
         """
         Get current price for a specific SKU
         Used for real-time pricing in Phase 2
+
+        Callers asking for the same SKU at the same time share one request, and
+        lookups arriving within the coalescing window go out as one batch.
         """
+        return self.price_coalescer.get(sku)
+
+    def _fetch_sku_batch(self, skus: List[str]) -> Dict[str, Any]:
         return self.search_products(
-            skus=[sku],
+            skus=skus,
             includes=["All"],
-            filters=["OnPriceList", "Orderable"]
-        )
\ No newline at end of file
+            filters=["OnPriceList", "Orderable"],
+            page_size=max(len(skus), 100)
+        )
+
+    def get_sku_prices(self, skus: List[str], chunk_size: int = 100) -> Dict[str, Dict[str, Any]]:
+        """
+        Get current prices for many SKUs in as few requests as possible
+
+        Args:
+            skus: SKUs to price (duplicates are ignored)
+            chunk_size: Maximum SKUs per request
+
+        Returns:
+            Dict mapping SKU to its product data; SKUs that could not be
+            priced are absent
+
+        Raises:
+            RateLimitTimeout: If an interactive request got no rate limit token in time
+        """
+        unique_skus = list(dict.fromkeys(skus))
+        products_by_sku = {}
+
+        for start in range(0, len(unique_skus), chunk_size):
+            chunk = unique_skus[start:start + chunk_size]
+            response = self.search_products(
+                skus=chunk,
+                includes=["All"],
+                filters=["OnPriceList", "Orderable"],
+                page_size=len(chunk)
+            )
+            if not response.get("success"):
+                if response.get("error_type") == "rate_limited":
+                    raise RateLimitTimeout(response.get("error", "Stuller rate limit"))
+                continue
+            for product in response["products"]:
+                sku = product.get("SKU") or product.get("Sku")
+                if sku:
+                    products_by_sku[sku] = product
+
+        return products_by_sku
+
+    @staticmethod
+    def extract_price(product: Dict[str, Any]) -> Any:
+        """Price value from a product, handling both old and new price formats"""
+        price_obj = product.get('Price')
+        if isinstance(price_obj, dict):
+            # New format: {'Value': 87.08678, 'CurrencyCode': 'USD'}
+            return price_obj.get('Value')
+        # Old format: '87.086780000000000' or 87.08678
+        return price_obj
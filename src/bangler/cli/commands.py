@@ -0,0 +1,390 @@
+"""
+Batch subcommands for the bangler entry point
+"""
+
+import csv
+import logging
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+from itertools import product as cartesian
+from pathlib import Path
+from typing import List, Optional
+
+from ..api.rate_limit import bulk_priority
+from ..api.stuller_client import StullerClient
+from ..config.settings import BanglerConfig
+from ..core.catalog_file import write_catalog_file
+from ..core.catalog_loader import load_catalog
+from ..core.catalog_sync import DEFAULT_SHARD_SHAPES, CatalogSync
+from ..core.discovery import SizingStockLookup
+from ..core.price_matrix import MatrixSetting, PriceMatrix, synthetic_prices
+from ..core.price_warmup import start_price_warmup
+from ..core.pricing_engine import PricingEngine
+from ..core.quote_ledger import QuoteLedger, open_quote_ledger, requote
+from ..models.pricing import BanglePrice
+from ..service.server import create_server
+from ..utils.profiling import RequestProfiler
+from .display import CLIDisplay
+
+logger = logging.getLogger(__name__)
+
+
+def parse_sizes(value: Optional[str]) -> Optional[List[int]]:
+    """Parse '10-27' or '14,16,18' into a list of sizes"""
+    if not value:
+        return None
+
+    sizes = []
+    for part in value.split(","):
+        part = part.strip()
+        if "-" in part:
+            low, high = part.split("-", 1)
+            sizes.extend(range(int(low), int(high) + 1))
+        elif part:
+            sizes.append(int(part))
+    return sizes
+
+
+def run_matrix(args) -> int:
+    """bangler matrix: stream a whole-catalog price matrix to CSV"""
+    material_config = BanglerConfig.get_material_calc_config()
+    k_factors = args.k_factor or [material_config['k_factor']]
+    seam_allowances = args.seam_allowance or [material_config['seam_allowance_in']]
+    settings = [MatrixSetting(k, seam) for k, seam in cartesian(k_factors, seam_allowances)]
+
+    catalog = SizingStockLookup().snapshot
+
+    prices = {}
+    if args.with_prices:
+        client = StullerClient()
+        skus = [record.sku for record in catalog]
+        print(f"🔄 Fetching live prices for {len(set(skus))} SKUs...", file=sys.stderr)
+        with bulk_priority():
+            products = client.get_sku_prices(skus)
+        prices = {sku: StullerClient.extract_price(product) for sku, product in products.items()}
+
+    sizes = parse_sizes(args.sizes)
+    if args.verify_fixed_point and not prices:
+        print("🧪 No --with-prices: verifying with synthetic prices (including near half-cent ties)",
+              file=sys.stderr)
+        prices = synthetic_prices(catalog, sizes, settings)
+
+    matrix = PriceMatrix(catalog, sizes=sizes, settings=settings,
+                         prices=prices, workers=args.workers, use_fixed_point=args.fixed_point)
+
+    if args.verify_fixed_point:
+        compared, mismatches = matrix.verify_fixed_point()
+        for mismatch in mismatches[:20]:
+            print(f"❌ {mismatch}", file=sys.stderr)
+        if mismatches:
+            print(f"❌ {len(mismatches)} of {compared} rows differ between fixed point and Decimal", file=sys.stderr)
+            return 1
+        print(f"✅ Fixed point matches Decimal to the cent on all {compared} priced rows", file=sys.stderr)
+        return 0
+
+    start_time = time.time()
+    if args.output == "-":
+        count = matrix.write(sys.stdout, args.format)
+    else:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            count = matrix.write(f, args.format)
+    elapsed = time.time() - start_time
+
+    print(f"✅ Wrote {count} price matrix rows in {elapsed:.1f}s ({count / max(elapsed, 1e-9):,.0f} rows/s)",
+          file=sys.stderr)
+    return 0
+
+
+def default_catalog_file() -> Path:
+    """Catalog file location from config, or alongside the CSV exports"""
+    configured = BanglerConfig.CATALOG.get('binary_path')
+    if configured:
+        return Path(configured)
+    return Path(__file__).parent.parent / "data" / "sizingstock.bcat"
+
+
+def run_catalog_build(args) -> int:
+    """bangler catalog-build: convert a CSV export or JSON inventory to a memory-mapped catalog file"""
+    csv_path = Path(args.csv) if args.csv else SizingStockLookup.find_latest_csv()
+    output = Path(args.output) if args.output else default_catalog_file()
+
+    start_time = time.time()
+    snapshot, report = load_catalog(csv_path)
+    write_catalog_file(snapshot, output)
+    elapsed = time.time() - start_time
+
+    print(f"✅ Wrote {len(snapshot)} products to {output} in {elapsed:.2f}s ({report.summary()})")
+    print(f"💡 Set BANGLER_CATALOG_FILE={output} to use it")
+    return 0
+
+
+def run_sync(args) -> int:
+    """bangler sync: download the sizing stock catalog from the Stuller API into a catalog file"""
+    output = Path(args.output) if args.output else default_catalog_file()
+
+    if args.shapes:
+        shapes = [shape.strip() for shape in args.shapes.split(",") if shape.strip()]
+    else:
+        shapes = list(DEFAULT_SHARD_SHAPES)
+        try:
+            shapes += SizingStockLookup().get_available_options()["shapes"]
+        except FileNotFoundError:
+            pass  # No local catalog yet: sync the configured valid_shapes only
+
+    def progress(records: int, pages: int) -> None:
+        print(f"\r🔄 {records} products from {pages} pages", end="", file=sys.stderr, flush=True)
+
+    sync = CatalogSync(StullerClient(), output, shapes=shapes, workers=args.workers, page_size=args.page_size)
+    start_time = time.time()
+    try:
+        path = sync.run(resume=not args.restart, progress=progress)
+    except KeyboardInterrupt:
+        print("\n⚠️  Sync interrupted; run 'bangler sync' again to resume", file=sys.stderr)
+        return 130
+    except RuntimeError as e:
+        print(f"\n❌ {e}; run 'bangler sync' again to resume", file=sys.stderr)
+        return 1
+    elapsed = time.time() - start_time
+
+    print(f"\n✅ Synced {sync.report.rows_loaded} products to {path} in {elapsed:.1f}s ({sync.report.summary()})",
+          file=sys.stderr)
+    print(f"💡 Set BANGLER_CATALOG_FILE={path} to use it", file=sys.stderr)
+    return 0
+
+
+def run_catalog_history(args) -> int:
+    """bangler catalog-history: dated catalog versions, or which SKU a specification had in each"""
+    try:
+        as_of = _parse_date(args.as_of)
+    except ValueError:
+        print("❌ --as-of must be a date, e.g. 2025-09-01", file=sys.stderr)
+        return 2
+
+    lookup = SizingStockLookup()
+    history = lookup.get_catalog_history()
+    if not len(history):
+        print("❌ No dated sizingstock-YYYYMMDD.csv exports found", file=sys.stderr)
+        return 1
+    try:
+        versions = [history.version(as_of)] if as_of else list(history.versions)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    spec = (args.shape, args.quality, args.width)
+    if not all(spec):
+        print(f"\n📚 {len(history)} catalog versions ({history.unique_records} distinct products):")
+        for version in versions:
+            print(f"   {version.effective.isoformat()}  {len(version.records):>6} products  "
+                  f"+{version.added} -{version.removed}  {Path(version.source).name}")
+        return 0
+
+    description = f"{args.shape} {args.quality} {args.width}" + (f" x {args.thickness}" if args.thickness else "")
+    print(f"\n📚 {description}:")
+    for version in versions:
+        sku = history.find_sku(*spec, args.thickness, as_of=version.effective)
+        print(f"   {version.effective.isoformat()}  {sku or 'not stocked'}")
+    return 0
+
+
+def run_budget(args) -> int:
+    """bangler budget: largest dimensions whose quote fits a customer's budget"""
+    try:
+        budget = Decimal(args.budget)
+        base_price = Decimal(args.base_price) if args.base_price else None
+    except InvalidOperation:
+        print("❌ Budget and base price must be dollar amounts, e.g. 1200 or 1199.50", file=sys.stderr)
+        return 2
+
+    start_time = time.time()
+    with PricingEngine() as engine:
+        options = engine.solve_budget(args.size, args.shape, args.quality, budget, k=args.count,
+                                      custom_base_price=base_price)
+    elapsed = time.time() - start_time
+
+    if not options:
+        print(f"❌ No {args.quality} {args.shape} size {args.size} bangle fits a ${budget:.2f} budget")
+        return 1
+
+    print(f"\n💰 Best fits for ${budget:.2f} - {args.quality} {args.shape}, size {args.size}:")
+    for rank, option in enumerate(options, 1):
+        print(f"   {rank}. {option.width} × {option.thickness}  ${option.total_price:.2f} "
+              f"(${option.under_budget_by:.2f} under)  SKU {option.sku}")
+    print(f"\n✅ Searched in {elapsed * 1000:.0f}ms")
+    return 0
+
+
+def run_compare(args) -> int:
+    """bangler compare: price one size and set of dimensions in every stocked quality"""
+    try:
+        base_price = Decimal(args.base_price) if args.base_price else None
+    except InvalidOperation:
+        print("❌ Base price must be a dollar amount, e.g. 475 or 499.99", file=sys.stderr)
+        return 2
+
+    with PricingEngine() as engine:
+        results = engine.compare_qualities(args.size, args.shape, args.width, args.thickness,
+                                           custom_base_price=base_price)
+    CLIDisplay.show_quality_comparison(args.size, args.shape, args.width, args.thickness, results)
+    return 0 if results else 1
+
+
+def run_search(args) -> int:
+    """bangler search: find stocked products by SKU fragment or description, optionally priced"""
+    try:
+        base_price = Decimal(args.base_price) if args.base_price else None
+    except InvalidOperation:
+        print("❌ Base price must be a dollar amount, e.g. 475 or 499.99", file=sys.stderr)
+        return 2
+
+    hits = SizingStockLookup().get_search_index().search(args.query, args.count)
+    if not hits:
+        print(f"❌ Nothing in stock matches '{args.query}'")
+        return 1
+
+    if args.size is None:
+        for hit in hits:
+            print(f"   {hit.label}")
+        return 0
+
+    with PricingEngine() as engine:
+        results = engine.price_many([hit.to_spec(args.size) for hit in hits],
+                                    [base_price] * len(hits) if base_price is not None else None)
+    print(f"\n🔎 '{args.query}' priced at size {args.size}:")
+    for hit, result in zip(hits, results):
+        price = f"${result.total_price:.2f}" if isinstance(result, BanglePrice) else "unavailable"
+        print(f"   {price:>11}  {hit.label}")
+    return 0
+
+
+def _ledger_or_error() -> Optional[QuoteLedger]:
+    ledger = open_quote_ledger()
+    if ledger is None:
+        print("❌ Quote ledger is disabled (set BANGLER_QUOTE_LEDGER to a file path)", file=sys.stderr)
+    return ledger
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+def _date_range(args) -> Optional[tuple]:
+    """(since, until) from --since/--until, or None after printing a usage error"""
+    try:
+        return _parse_date(args.since), _parse_date(args.until)
+    except ValueError:
+        print("❌ --since and --until must be dates, e.g. 2025-09-01 or 2025-09-01T14:30", file=sys.stderr)
+        return None
+
+
+def run_quotes(args) -> int:
+    """bangler quotes: look up or export the quote ledger"""
+    dates = _date_range(args)
+    if dates is None:
+        return 2
+    start, end = dates
+
+    ledger = _ledger_or_error()
+    if ledger is None:
+        return 1
+
+    if args.export:
+        if args.export == "-":
+            count = ledger.export_csv(sys.stdout, start, end)
+        else:
+            with open(args.export, "w", newline="", encoding="utf-8") as f:
+                count = ledger.export_csv(f, start, end)
+        print(f"✅ Exported {count} quotes", file=sys.stderr)
+        return 0
+
+    if args.sku:
+        records = ledger.recent_for_sku(args.sku, args.limit, start, end)
+    elif args.customer:
+        records = ledger.for_customer(args.customer, args.limit, start, end)
+    else:
+        records = ledger.recent(start, end, args.limit)
+
+    if not records:
+        print("No matching quotes")
+        return 0
+    for record in records:
+        when = datetime.fromtimestamp(record.quoted_at).strftime("%Y-%m-%d %H:%M")
+        customer = f"  [{record.customer_ref}]" if record.customer_ref else ""
+        print(f"#{record.quote_id:<6} {when}  size {record.size:<3} {record.to_spec().to_quality_string()} "
+              f"{record.metal_shape} {record.width} × {record.thickness}  ${record.total_price:.2f}{customer}")
+    return 0
+
+
+def run_requote(args) -> int:
+    """bangler requote: reprice past quotes at today's prices"""
+    dates = _date_range(args)
+    if dates is None:
+        return 2
+    start, end = dates
+
+    ledger = _ledger_or_error()
+    if ledger is None:
+        return 1
+
+    if args.customer:
+        records = ledger.for_customer(args.customer, start=start, end=end)
+    else:
+        records = ledger.between(start, end)
+    if not records:
+        print("No matching quotes")
+        return 0
+
+    start_time = time.time()
+    with bulk_priority(), PricingEngine() as engine:
+        requotes = requote(records, engine)
+    elapsed = time.time() - start_time
+
+    changes = [item.change for item in requotes if item.change is not None]
+    failed = len(requotes) - len(changes)
+
+    if args.output:
+        with open(args.output, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["quote_id", "quoted_at", "customer_ref", "sku", "quoted_total", "current_total", "change"])
+            for item in requotes:
+                record = item.record
+                repriced = item.change is not None
+                writer.writerow([record.quote_id, datetime.fromtimestamp(record.quoted_at).isoformat(timespec="seconds"),
+                                 record.customer_ref or "", record.sku, f"{record.total_price:.2f}",
+                                 f"{item.result.total_price:.2f}" if repriced else "",
+                                 f"{item.change:+.2f}" if repriced else ""])
+
+    print(f"✅ Requoted {len(changes)} of {len(requotes)} quotes in {elapsed:.1f}s")
+    if changes:
+        total_change = sum(changes)
+        print(f"📊 Average change: ${total_change / len(changes):+.2f}   Total: ${total_change:+.2f}")
+        print(f"   Largest increase: ${max(changes):+.2f}   Largest decrease: ${min(changes):+.2f}")
+    if failed:
+        print(f"⚠️  {failed} quotes could not be repriced")
+    return 0
+
+
+def run_serve(args) -> int:
+    """bangler serve: run the HTTP pricing service"""
+    profiler = RequestProfiler(args.profile_sample, args.profile_memory, args.profile_top) if args.profile else None
+    server = create_server(args.host, args.port, profiler=profiler)
+    host, port = server.server_address[:2]
+    ledger = open_quote_ledger()
+    warmup = start_price_warmup(server.engine, ledger)
+    if ledger is not None:
+        ledger.close()
+    print(f"🌐 Pricing service on http://{host}:{port} (Ctrl+C to stop)")
+    if profiler is not None:
+        print(f"📈 Profiling {profiler.sample_rate:.0%} of requests into {BanglerConfig.PROFILING['directory']}/")
+    if warmup is not None:
+        print(f"🔥 Prefetching prices for {len(warmup.skus)} most-quoted SKU(s)")
+    print(f"💡 Try: curl -N 'http://{host}:{port}/price/events?size=16&shape=Flat&quality=14K%20Yellow&width=6.5%20Mm&thickness=1.5%20Mm'")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopping pricing service")
+    finally:
+        server.server_close()
+    return 0
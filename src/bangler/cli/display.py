@@ -4,7 +4,7 @@ from decimal import Decimal
 from typing import Union, Optional
 import questionary
 from ..models.bangle import BangleSpec
-from ..models.pricing import BanglePrice, PricingError
+from ..models.pricing import BanglePrice, PricingError, PricingEvent
 from ..utils.formatting import BusinessFormatter
 from ..config.settings import BanglerConfig
 
@@ -40,6 +40,12 @@ Real-time pricing based on current Stuller material costs.
         if thinking_time > 0:
             time.sleep(thinking_time)
 
+    @staticmethod
+    def show_pricing_event(event: PricingEvent):
+        """Show a pricing pipeline step as it happens (the result itself is shown by show_price_result)"""
+        if event.stage != 'result':
+            CLIDisplay.show_progress_step(event.label, event.detail, thinking_time=0)
+
     @staticmethod
     def show_price_result(result: Union[BanglePrice, PricingError]):
         """Display pricing result or error"""
@@ -61,6 +67,10 @@ Real-time pricing based on current Stuller material costs.
         #print(f"   Material Cost per DWT: ${price.material_cost_per_dwt:.2f}")
         print(f"   Material Length Needed: {price.material_length_in:.2f} inches")
 
+        if price.price_age_seconds is not None:
+            age = BusinessFormatter.format_age(price.price_age_seconds)
+            print(f"\n⚠️  Live Stuller pricing unavailable - quoted from the last known price ({age} old)")
+
         # Highlight the final price
         print(f"\n💰 FINAL CUSTOMER PRICE: ${price.total_price:.2f}")
         print("=" * 50)
@@ -71,12 +81,17 @@ Real-time pricing based on current Stuller material costs.
         print(f"\n❌ {error.user_message}")
         print(f"\n💡 Suggested Action: {error.suggested_action}")
 
-        if error.error_type == 'sku_not_found':
+        if error.error_type == 'sku_not_found' and error.alternatives:
+            print("\n🔍 Closest orderable alternatives:")
+            for rank, alt in enumerate(error.alternatives, 1):
+                price = f"  ${alt.total_price:.2f}" if alt.total_price is not None else ""
+                print(f"   {rank}. {alt.width} × {alt.thickness}  (SKU {alt.sku}, {alt.distance_mm:.2f}mm off){price}")
+        elif error.error_type == 'sku_not_found':
             print("\n🔍 Available alternatives:")
             print("   • Try a different width or thickness")
             print("   • Check with suppliers for special orders")
             print("   • Consider similar metal shapes")
-        elif error.error_type == 'api_unavailable':
+        elif error.error_type in ('api_unavailable', 'rate_limited'):
             print("\n🔄 Backup options:")
             print("   • Wait 5 minutes and try again")
             print("   • Use manual pricing methods")
@@ -102,6 +117,53 @@ Real-time pricing based on current Stuller material costs.
                 direction = "more" if delta > 0 else "less"
                 print(f"   Base Price: ${custom_base_price:.2f} ({sign}${abs(delta):.2f} / {percent_sign}{delta_percent}% {direction} than default)")
 
+    @staticmethod
+    def show_quality_comparison(size: int, shape: str, width: str, thickness: str, results: list,
+                                current_sku: Optional[str] = None):
+        """Display a quality/color comparison table for one size and set of dimensions"""
+        if not results:
+            print(f"\n❌ No other qualities are stocked in {shape} {width} × {thickness}")
+            return
+
+        print(f"\n📊 Quality comparison - size {size}, {shape} {width} × {thickness}")
+        print(f"   {'Quality':<28} {'Per DWT':>10} {'Material':>10} {'Total':>10}")
+        print(f"   {'-' * 28} {'-' * 10} {'-' * 10} {'-' * 10}")
+        for quality, result in results:
+            if isinstance(result, PricingError):
+                print(f"   {quality:<28} {'unavailable':>32}")
+                continue
+            marker = "  ◀ quoted" if result.sku == current_sku else ""
+            print(f"   {quality:<28} {f'${result.material_cost_per_dwt:.2f}':>10} "
+                  f"{f'${result.material_total_cost:.2f}':>10} {f'${result.total_price:.2f}':>10}{marker}")
+        print("=" * 50)
+
+    @staticmethod
+    def prompt_compare_qualities() -> bool:
+        """Ask if user wants to compare other qualities for the same size and dimensions"""
+        try:
+            response = questionary.select(
+                "\n📊 Compare prices across all qualities for this size and dimensions?",
+                choices=[
+                    "Yes",
+                    "No"
+                ],
+                default="No"
+            ).ask()
+            return response == "Yes"
+        except (KeyboardInterrupt, EOFError):
+            return False
+
+    @staticmethod
+    def prompt_customer_reference() -> Optional[str]:
+        """Ask for an optional customer reference to file the quote under"""
+        try:
+            response = questionary.text(
+                "\n🗂️  Customer reference for this quote (optional, Enter to skip):"
+            ).ask()
+            return response.strip() or None if response else None
+        except (KeyboardInterrupt, EOFError):
+            return None
+
     @staticmethod
     def prompt_open_sku_page(sku: str) -> bool:
         """Ask if user wants to open the Stuller SKU page for ordering"""
@@ -12,6 +12,8 @@ from typing import Optional
 from .prompts import BanglePrompter
 from .display import CLIDisplay
 from ..core.pricing_engine import PricingEngine
+from ..core.price_warmup import start_price_warmup
+from ..core.quote_ledger import open_quote_ledger
 from ..core.validation import BangleValidator
 from ..models.bangle import BangleSpec
 from ..models.pricing import BanglePrice
@@ -41,6 +43,9 @@ class BanglerCLI:
         self.display = CLIDisplay()
         self.pricing_engine = PricingEngine()
         self.validator = BangleValidator()
+        self.quote_ledger = open_quote_ledger()
+        # Prefetch the most-quoted SKUs while the welcome banner and first prompts show
+        self.price_warmup = start_price_warmup(self.pricing_engine, self.quote_ledger)
 
     def run(self):
         """Main CLI execution loop"""
@@ -71,6 +76,13 @@ class BanglerCLI:
             print(f"\n❌ An unexpected error occurred: {e}")
             print("Please contact technical support.")
         finally:
+            cache_stats = self.pricing_engine.get_price_cache_stats()
+            if cache_stats:
+                logger.info(f"Price cache stats: {cache_stats}")
+            rate_limiter = self.pricing_engine.stuller_client.rate_limiter
+            if rate_limiter is not None:
+                logger.info(f"Stuller rate limit stats: {rate_limiter.get_stats()}")
+            self.pricing_engine.close(wait=False)
             self.display.show_goodbye()
 
     def _collect_specification(self) -> tuple[Optional[BangleSpec], Optional[Decimal]]:
@@ -112,6 +124,20 @@ class BanglerCLI:
 
         # Ask to open SKU page if pricing was successful
         if isinstance(result, BanglePrice):  # Not PricingError
+            if self.quote_ledger is not None:
+                customer_ref = self.display.prompt_customer_reference()
+                try:
+                    quote_id = self.quote_ledger.record(spec, result, customer_ref)
+                    logger.info(f"Recorded quote #{quote_id} for {result.sku} (customer: {customer_ref})")
+                except Exception as e:
+                    logger.error(f"Could not record quote in ledger: {e}")
+            if self.display.prompt_compare_qualities():
+                comparison = self.pricing_engine.compare_qualities(
+                    spec.size, spec.metal_shape, spec.width, spec.thickness, custom_base_price
+                )
+                self.display.show_quality_comparison(
+                    spec.size, spec.metal_shape, spec.width, spec.thickness, comparison, result.sku
+                )
             if self.display.prompt_open_sku_page(result.sku):
                 self.display.open_stuller_sku_page(result.sku)
 
@@ -2,10 +2,147 @@
 """
 Bangler CLI Entry Point
 
-Simple entry point that delegates to the main CLI interface.
+With no arguments, starts the interactive pricing CLI. Subcommands run
+batch operations:
+
+    bangler matrix          Whole-catalog price matrix (parallel)
+    bangler catalog-build   Build a memory-mapped catalog file from a CSV export
+    bangler sync            Download the catalog from the Stuller API into a catalog file
+    bangler catalog-history Dated catalog versions and as-of-date SKU lookups
+    bangler budget          Largest dimensions that fit a customer's budget
+    bangler compare         One size and set of dimensions priced in every quality
+    bangler search          Find products by SKU fragment or description
+    bangler quotes          Look up or export the quote ledger
+    bangler requote         Reprice past quotes at today's prices
+    bangler serve           HTTP pricing service with streamed progress
 """
 
-from .interface import main
+import argparse
+import sys
+from .interface import main as run_interactive
+from . import commands
+from ..utils.profiling import ProfileSession
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for the bangler entry point"""
+    parser = argparse.ArgumentParser(prog="bangler", description="Askew Jewelers custom bangle pricing")
+    parser.add_argument("--profile", action="store_true",
+                        help="Profile this run (with serve: a sample of requests) and write the profile under logs/")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="With --profile, also trace allocations with tracemalloc")
+    parser.add_argument("--profile-top", type=int, default=None,
+                        help="Hotspots listed in each profile summary (default: 25)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    matrix = subparsers.add_parser("matrix", help="Compute a whole-catalog price matrix")
+    matrix.add_argument("-o", "--output", default="-", help="Output path (default: stdout)")
+    matrix.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="Output format (default: csv)")
+    matrix.add_argument("--sizes", default=None, help="Sizes to include, e.g. '10-27' or '14,16,18'")
+    matrix.add_argument("--k-factor", type=float, nargs="+", default=None,
+                        help="One or more neutral axis factors (default: configured value)")
+    matrix.add_argument("--seam-allowance", type=float, nargs="+", default=None,
+                        help="One or more seam allowances in inches (default: configured value)")
+    matrix.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    matrix.add_argument("--with-prices", action="store_true", help="Fetch live Stuller prices for every SKU")
+    matrix.add_argument("--fixed-point", action="store_true",
+                        help="Compute money in integer fixed point and write it rounded to cents")
+    matrix.add_argument("--verify-fixed-point", action="store_true",
+                        help="Check fixed-point money against Decimal for every priced row, then exit "
+                             "(synthetic prices unless --with-prices)")
+    matrix.set_defaults(handler=commands.run_matrix)
+
+    catalog_build = subparsers.add_parser("catalog-build", help="Build a memory-mapped catalog file")
+    catalog_build.add_argument("--csv", default=None,
+                               help="CSV export or JSON inventory to convert, optionally .gz/.zst/.zip "
+                                    "(default: latest export in data directory)")
+    catalog_build.add_argument("-o", "--output", default=None,
+                               help="Catalog file path (default: BANGLER_CATALOG_FILE or data/sizingstock.bcat)")
+    catalog_build.set_defaults(handler=commands.run_catalog_build)
+
+    sync = subparsers.add_parser("sync", help="Download the sizing stock catalog from the Stuller API")
+    sync.add_argument("-o", "--output", default=None,
+                      help="Catalog file path (default: BANGLER_CATALOG_FILE or data/sizingstock.bcat)")
+    sync.add_argument("--shapes", default=None, help="Comma-separated metal shapes to shard by (default: all known)")
+    sync.add_argument("--workers", type=int, default=3, help="Shards downloaded concurrently (default: 3)")
+    sync.add_argument("--page-size", type=int, default=100, help="Products per API page (default: 100)")
+    sync.add_argument("--restart", action="store_true", help="Ignore an interrupted sync and start over")
+    sync.set_defaults(handler=commands.run_sync)
+
+    history = subparsers.add_parser("catalog-history",
+                                    help="List dated catalog versions, or a specification's SKU in each")
+    history.add_argument("--as-of", default=None, help="Only the catalog in effect on this date, e.g. 2025-09-01")
+    history.add_argument("--shape", default=None, help="Metal shape, e.g. 'Flat'")
+    history.add_argument("--quality", default=None, help="Quality, e.g. '14K Yellow'")
+    history.add_argument("--width", default=None, help="Width as in the catalog, e.g. '6.5 Mm'")
+    history.add_argument("--thickness", default=None, help="Thickness as in the catalog, e.g. '1.5 Mm'")
+    history.set_defaults(handler=commands.run_catalog_history)
+
+    budget = subparsers.add_parser("budget", help="Find the dimensions that best fit a customer's budget")
+    budget.add_argument("budget", help="Target total price, e.g. 1200")
+    budget.add_argument("--size", type=int, required=True, help="Bangle size")
+    budget.add_argument("--shape", required=True, help="Metal shape, e.g. 'Flat'")
+    budget.add_argument("--quality", required=True, help="Quality, e.g. '14K Yellow' or 'Sterling Silver'")
+    budget.add_argument("--base-price", default=None, help="Base price for these quotes (default: configured)")
+    budget.add_argument("-n", "--count", type=int, default=5, help="Number of options (default: 5)")
+    budget.set_defaults(handler=commands.run_budget)
+
+    compare = subparsers.add_parser("compare", help="Price one size and set of dimensions in every quality")
+    compare.add_argument("--size", type=int, required=True, help="Bangle size")
+    compare.add_argument("--shape", required=True, help="Metal shape, e.g. 'Flat'")
+    compare.add_argument("--width", required=True, help="Width as in the catalog, e.g. '6.5 Mm'")
+    compare.add_argument("--thickness", required=True, help="Thickness as in the catalog, e.g. '1.5 Mm'")
+    compare.add_argument("--base-price", default=None, help="Base price for these quotes (default: configured)")
+    compare.set_defaults(handler=commands.run_compare)
+
+    search = subparsers.add_parser("search", help="Find products by SKU fragment or description")
+    search.add_argument("query", help="SKU fragment or description, e.g. '102600' or '6.5x1.5 Flat 14K'")
+    search.add_argument("--size", type=int, default=None, help="Price every match at this size")
+    search.add_argument("--base-price", default=None, help="Base price for these quotes (default: configured)")
+    search.add_argument("-n", "--count", type=int, default=10, help="Maximum matches (default: 10)")
+    search.set_defaults(handler=commands.run_search)
+
+    quotes = subparsers.add_parser("quotes", help="Look up or export the quote ledger")
+    quotes.add_argument("--sku", default=None, help="Most recent quotes for a SKU")
+    quotes.add_argument("--customer", default=None, help="Quotes for a customer reference")
+    quotes.add_argument("--since", default=None, help="Start date (inclusive), e.g. 2025-10-01")
+    quotes.add_argument("--until", default=None, help="End date (exclusive), e.g. 2025-11-01")
+    quotes.add_argument("--limit", type=int, default=20, help="Maximum quotes to list (default: 20)")
+    quotes.add_argument("--export", default=None, help="Export the date range to this CSV path ('-' for stdout)")
+    quotes.set_defaults(handler=commands.run_quotes)
+
+    requote = subparsers.add_parser("requote", help="Reprice past quotes at today's prices")
+    requote.add_argument("--customer", default=None, help="Only quotes for this customer reference")
+    requote.add_argument("--since", default=None, help="Start date (inclusive), e.g. 2025-10-01")
+    requote.add_argument("--until", default=None, help="End date (exclusive), e.g. 2025-11-01")
+    requote.add_argument("-o", "--output", default=None, help="Write per-quote changes to this CSV path")
+    requote.set_defaults(handler=commands.run_requote)
+
+    serve = subparsers.add_parser("serve", help="Run the HTTP pricing service")
+    serve.add_argument("--host", default=None, help="Address to bind (default: BANGLER_SERVICE_HOST or 127.0.0.1)")
+    serve.add_argument("--port", type=int, default=None, help="Port (default: BANGLER_SERVICE_PORT or 8765)")
+    serve.add_argument("--profile-sample", type=float, default=None,
+                       help="With --profile, fraction of requests profiled (default: BANGLER_PROFILE_SAMPLE or 0.05)")
+    serve.set_defaults(handler=commands.run_serve)
+
+    return parser
+
+
+def main(argv=None):
+    """CLI entry point"""
+    args = build_parser().parse_args(argv)
+    handler = getattr(args, "handler", None) or (lambda args: run_interactive())
+    # The service profiles sampled requests itself (see run_serve)
+    if not args.profile or args.command == "serve":
+        return handler(args)
+
+    with ProfileSession(f"cli-{args.command or 'interactive'}", memory=args.profile_memory,
+                        top=args.profile_top) as session:
+        result = session.run(handler, args)
+    if session.paths:
+        print(f"📈 Profile written to {session.paths[1]} ({session.paths[0].name} for pstats/snakeviz)", file=sys.stderr)
+    return result
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
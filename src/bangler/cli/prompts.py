@@ -1,10 +1,35 @@
 import questionary
 from decimal import Decimal, InvalidOperation
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from ..models.bangle import BangleSpec
+from ..core.catalog import parse_mm
 from ..core.discovery import SizingStockLookup
+from ..core.search_index import SearchHit, SearchIndex
 from ..config.settings import BanglerConfig
 
+
+try:
+    # prompt_toolkit's completion types, as re-exported by the questionary version in use
+    from questionary.prompts.autocomplete import Completer, Completion
+except ImportError:  # Typeahead unavailable: search falls back to a plain text prompt
+    Completer = Completion = None
+
+
+if Completer is not None:
+    class SearchCompleter(Completer):
+        """Typeahead completions from the catalog search index"""
+
+        def __init__(self, index: SearchIndex, limit: int = 12):
+            self.index = index
+            self.limit = limit
+
+        def get_completions(self, document, complete_event):
+            text = document.text_before_cursor
+            for hit in self.index.search(text, self.limit):
+                yield Completion(hit.label, start_position=-len(text))
+else:
+    SearchCompleter = None
+
 class BanglePrompter:
     """Guided prompts for bangle specification collection"""
 
@@ -13,6 +38,7 @@ class BanglePrompter:
         self.rules = BanglerConfig.BUSINESS_RULES
         # Navigation state
         self.BACK_OPTION = "← Back"
+        self.SEARCH_OPTION = "🔎 Search by SKU or description"
         self.current_spec = {}
 
     def prompt_size(self) -> Optional[int]:
@@ -31,8 +57,8 @@ class BanglePrompter:
         return int(size_str)
 
     def prompt_metal_shape(self) -> Optional[str]:
-        """Step 2: Metal Shape selection"""
-        choices = self.rules['valid_shapes'] + [self.BACK_OPTION]
+        """Step 2: Metal Shape selection (or search straight to a product)"""
+        choices = [self.SEARCH_OPTION] + self.rules['valid_shapes'] + [self.BACK_OPTION]
 
         try:
             shape = questionary.select(
@@ -45,9 +71,51 @@ class BanglePrompter:
 
         if shape == self.BACK_OPTION:
             return "BACK"
+        if shape == self.SEARCH_OPTION:
+            return "SEARCH"
 
         return shape
 
+    def prompt_search(self) -> Optional[Union[SearchHit, str]]:
+        """Find a product by SKU fragment or description (e.g. '102600', '6.5x1.5 flat')"""
+        index = self.sizing_stock.get_search_index()
+        print("💡 Type a SKU fragment or description, e.g. 102600 or 6.5x1.5 Flat 14K (empty to go back)")
+        try:
+            if SearchCompleter is not None:
+                query = questionary.autocomplete(
+                    "Search SKU or description:",
+                    choices=[],
+                    completer=SearchCompleter(index)
+                ).unsafe_ask()
+            else:
+                query = questionary.text("Search SKU or description:").unsafe_ask()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt()
+
+        if not query or not query.strip():
+            return "BACK"
+
+        hits = index.search(query, 20)
+        for hit in hits:
+            if hit.label == query:
+                return hit
+        if not hits:
+            print(f"\n❌ Nothing in stock matches '{query}'.")
+            return "BACK"
+        if len(hits) == 1:
+            return hits[0]
+
+        by_label = {hit.label: hit for hit in hits}
+        try:
+            label = questionary.select(
+                f"Products matching '{query}':",
+                choices=list(by_label) + [self.BACK_OPTION]
+            ).unsafe_ask()
+        except KeyboardInterrupt:
+            raise KeyboardInterrupt()
+
+        return by_label.get(label, "BACK")
+
     def prompt_metal_color(self) -> Optional[str]:
         """Step 3: Metal Color selection"""
         color_choices = list(self.rules['valid_colors']) + [self.BACK_OPTION]
@@ -242,6 +310,20 @@ class BanglePrompter:
                     if result == "BACK":
                         step = 1
                         continue
+                    elif result == "SEARCH":
+                        hit = self.prompt_search()
+                        if hit is None or hit == "BACK":
+                            continue
+                        found = hit.to_spec(self.current_spec['size'])
+                        self.current_spec.update(
+                            metal_shape=found.metal_shape,
+                            metal_color=found.metal_color,
+                            metal_quality=found.metal_quality,
+                            width=found.width,
+                            thickness=found.thickness
+                        )
+                        print(f"✓ Product: {hit.label}")
+                        step = 7  # Straight to base price, then pricing
                     elif result is not None:
                         self.current_spec['metal_shape'] = result
                         print(f"✓ Shape: {result}")
@@ -419,6 +501,15 @@ class BanglePrompter:
         except KeyError:
             try:
                 available_widths = list(available_options[shape][quality_string].keys())
+                try:
+                    # Rank by closeness to the requested width when it parses
+                    matches = self.sizing_stock.get_dimension_index().nearest(
+                        shape, quality_string, parse_mm(width), k=len(available_widths)
+                    )
+                    ranked = list(dict.fromkeys(match.width for match in matches))
+                    available_widths = ranked + [w for w in available_widths if w not in ranked]
+                except ValueError:
+                    pass
                 print(f"\n💡 Available widths for {shape} {quality_string}:")
                 for w in available_widths:
                     print(f"   • {w}")
@@ -1,4 +1,5 @@
 import os
+import threading
 from decimal import Decimal
 from typing import Dict, Any
 from dotenv import load_dotenv
@@ -8,6 +9,9 @@ load_dotenv()
 class BanglerConfig:
     """Centralized configuration for bangler system"""
 
+    # Guards copy-on-write updates to the configuration dicts below
+    _update_lock = threading.Lock()
+
     # Stuller API Configuration
     STULLER_USERNAME = os.getenv('STULLER_USERNAME')
     STULLER_PASSWORD = os.getenv('STULLER_PASSWORD')
@@ -32,6 +36,69 @@ class BanglerConfig:
         'round_up_increment': 0.25              # Round to nearest 0.25 inch (Stuller selling unit)
     }
 
+    # Catalog Configuration
+    CATALOG = {
+        # Prebuilt memory-mapped catalog file (see `bangler catalog-build`); used instead of parsing the CSV
+        'binary_path': os.getenv('BANGLER_CATALOG_FILE'),
+        # CSV export or JSON inventory to load instead of the latest data/sizingstock-*.csv
+        'source_path': os.getenv('BANGLER_CATALOG_SOURCE'),
+        # Directory of dated sizingstock-YYYYMMDD.csv exports for as-of lookups (default: data directory)
+        'history_dir': os.getenv('BANGLER_CATALOG_HISTORY_DIR'),
+    }
+
+    # Last-known-price store (SQLite) for quoting when Stuller is slow or down
+    PRICE_STORE = {
+        # Set BANGLER_PRICE_STORE to an empty string to disable the store
+        'path': os.getenv('BANGLER_PRICE_STORE', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'price_store.sqlite3')),
+        'live_timeout_s': float(os.getenv('BANGLER_LIVE_PRICE_TIMEOUT', '3')),  # Wait this long before using a stored price
+    }
+
+    # Short-lived SKU price cache shared by quotes (memory, sqlite or none)
+    PRICE_CACHE = {
+        'backend': os.getenv('BANGLER_PRICE_CACHE', 'memory'),
+        'path': os.getenv('BANGLER_PRICE_CACHE_PATH', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'price_cache.sqlite3')),
+        'ttl_s': float(os.getenv('BANGLER_PRICE_CACHE_TTL', '300')),  # Seconds a fetched price stays fresh
+    }
+
+    # Startup warm-up: prefetch prices for the most-quoted SKUs while the banner shows
+    PRICE_WARMUP = {
+        'count': int(os.getenv('BANGLER_WARMUP_COUNT', '20')),             # Top quoted SKUs to prefetch (0 disables)
+        'skus': [sku.strip() for sku in os.getenv('BANGLER_WARMUP_SKUS', '').split(',') if sku.strip()],  # Always prefetched
+        'lookback_days': float(os.getenv('BANGLER_WARMUP_LOOKBACK_DAYS', '30')),  # Quote history counted
+    }
+
+    # Append-only quote history (SQLite); set BANGLER_QUOTE_LEDGER to an empty string to disable
+    QUOTE_LEDGER = {
+        'path': os.getenv('BANGLER_QUOTE_LEDGER', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', 'quotes.sqlite3')),
+    }
+
+    # HTTP pricing service (bangler serve)
+    SERVICE = {
+        'host': os.getenv('BANGLER_SERVICE_HOST', '127.0.0.1'),
+        'port': int(os.getenv('BANGLER_SERVICE_PORT', '8765')),
+    }
+
+    # Pricing scheduler: interactive quotes always run ahead of bulk jobs
+    SCHEDULER = {
+        'workers': int(os.getenv('BANGLER_SCHEDULER_WORKERS', '8')),            # Total pricing workers
+        'bulk_workers': int(os.getenv('BANGLER_SCHEDULER_BULK_WORKERS', '2')),  # Most workers bulk chunks may occupy
+        'bulk_chunk': 100,                                                      # Specs per bulk chunk (one batched lookup)
+    }
+
+    # Profiling (bangler --profile): where profiles go and how many service requests are sampled
+    PROFILING = {
+        'directory': os.getenv('BANGLER_PROFILE_DIR', 'logs'),
+        'sample_rate': float(os.getenv('BANGLER_PROFILE_SAMPLE', '0.05')),  # Fraction of service requests profiled
+        'top': 25,                                                          # Hotspots listed in each summary
+        'traceback_frames': 1,                                              # tracemalloc frames kept per allocation
+    }
+
+    # Nearest-available substitutes offered when a spec isn't stocked
+    ALTERNATIVES = {
+        'count': 5,                             # How many substitutes to rank
+        'priced': True                          # Price them (one batched Stuller call)
+    }
+
     # Business Rules
     BUSINESS_RULES = {
         'min_size': 10,
@@ -60,8 +127,16 @@ class BanglerConfig:
 
     @classmethod
     def update_base_price(cls, new_price: Decimal):
-        """Update base price (for future admin interface)"""
-        cls.PRICING['base_price'] = new_price
+        """
+        Update base price (for future admin interface)
+
+        Copy-on-write: a new dict is published atomically, so readers holding
+        the previous PRICING dict never observe a partial update.
+        """
+        with cls._update_lock:
+            pricing = cls.PRICING.copy()
+            pricing['base_price'] = new_price
+            cls.PRICING = pricing
 
     @classmethod
     def has_stuller_credentials(cls) -> bool:
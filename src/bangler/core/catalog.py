@@ -0,0 +1,181 @@
+"""
+Immutable Sizing Stock Catalog
+Read-only, pre-indexed snapshot of sizing stock records that can be shared
+freely between threads once it has been built
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+
+# Descriptive element names (as exported by Stuller) mapped to record fields
+DESCRIPTIVE_ELEMENT_FIELDS = {
+    "Metal Shape": "shape",
+    "Quality": "quality",
+    "Width": "width",
+    "Thickness": "thickness",
+    "Length": "length",
+}
+
+DEFAULT_LENGTH = "Bulk"
+
+
+class SizingStockRecord(NamedTuple):
+    """One sizing stock product reduced to the fields pricing needs"""
+    product_id: str
+    sku: str
+    unit_of_sale: str
+    shape: str
+    quality: str
+    width: str
+    thickness: str
+    length: str
+
+
+def parse_mm(value: str) -> float:
+    """Parse a dimension string like '6.5 Mm' to float 6.5"""
+    return float(value.replace(' Mm', '').strip())
+
+
+def _lookup_key(shape: str, quality: str, width: str, thickness: Optional[str],
+                length: str) -> Tuple[str, str, str, Optional[str], str]:
+    """Normalized index key (case-insensitive, whitespace-trimmed)"""
+    return (
+        shape.strip().lower(),
+        quality.strip().lower(),
+        width.strip().lower(),
+        thickness.strip().lower() if thickness else None,
+        length.strip().lower(),
+    )
+
+
+def build_sku_index(records: Iterable[SizingStockRecord]) -> Dict[Tuple, str]:
+    """
+    Exact-match SKU index keyed like _lookup_key
+
+    The first record wins to preserve file order semantics. A second entry
+    with thickness=None serves lookups without a thickness. Field values
+    repeat heavily, so each is normalized once.
+    """
+    normalized = {}
+
+    def norm(value: str) -> str:
+        result = normalized.get(value)
+        if result is None:
+            result = normalized[value] = value.strip().lower()
+        return result
+
+    sku_index = {}
+    for record in records:
+        if not record.sku:
+            continue
+        shape, quality, width = norm(record.shape), norm(record.quality), norm(record.width)
+        length = norm(record.length)
+        sku_index.setdefault(
+            (shape, quality, width, norm(record.thickness) if record.thickness else None, length),
+            record.sku
+        )
+        sku_index.setdefault((shape, quality, width, None, length), record.sku)
+    return sku_index
+
+
+class CatalogSnapshot:
+    """
+    Immutable, pre-indexed view of a sizing stock catalog
+
+    Every index is built in the constructor and nothing is mutated afterwards,
+    so any number of threads can read a snapshot without locking. Accessors
+    that hand out option lists return fresh copies so callers may modify them.
+    """
+
+    __slots__ = ("records", "source", "_sku_index", "_available_options", "_nested_options")
+
+    def __init__(self, records: Iterable[SizingStockRecord], source: str = ""):
+        records = tuple(records)
+        object.__setattr__(self, "records", records)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "_sku_index", build_sku_index(records))
+        object.__setattr__(self, "_available_options", self._build_available_options(records))
+        object.__setattr__(self, "_nested_options", self._build_nested_options(records))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __reduce__(self):
+        # Rebuild indexes on unpickle rather than shipping them
+        return (type(self), (self.records, self.source))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __iter__(self) -> Iterator[SizingStockRecord]:
+        return iter(self.records)
+
+    def find_sku(self, shape: str, quality: str, width: str, thickness: str = None,
+                 length: str = None) -> Optional[str]:
+        """Find a SKU by exact (case-insensitive) specification match"""
+        key = _lookup_key(shape, quality, width, thickness, length or DEFAULT_LENGTH)
+        return self._sku_index.get(key)
+
+    def available_options(self) -> Dict[str, List[str]]:
+        """All shapes, qualities, widths, thicknesses and lengths (sorted)"""
+        return {key: list(values) for key, values in self._available_options.items()}
+
+    def nested_options(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        """Options structured as shape -> quality -> width -> thicknesses"""
+        return {
+            shape: {
+                quality: {width: list(thicknesses) for width, thicknesses in widths.items()}
+                for quality, widths in qualities.items()
+            }
+            for shape, qualities in self._nested_options.items()
+        }
+
+    @staticmethod
+    def _build_available_options(records: Tuple[SizingStockRecord, ...]) -> Dict[str, Tuple[str, ...]]:
+        options = {
+            "shapes": set(),
+            "qualities": set(),
+            "widths": set(),
+            "thicknesses": set(),
+            "lengths": set()
+        }
+
+        for record in records:
+            if record.shape:
+                options["shapes"].add(record.shape)
+            if record.quality:
+                options["qualities"].add(record.quality)
+            if record.width:
+                options["widths"].add(record.width)
+            if record.thickness:
+                options["thicknesses"].add(record.thickness)
+            if record.length:
+                options["lengths"].add(record.length)
+
+        return {key: tuple(sorted(values)) for key, values in options.items()}
+
+    @staticmethod
+    def _build_nested_options(records: Tuple[SizingStockRecord, ...]) -> Dict[str, Dict[str, Dict[str, Tuple[str, ...]]]]:
+        nested = {}
+
+        for record in records:
+            # Skip if any required element is missing
+            if not all([record.shape, record.quality, record.width, record.thickness]):
+                continue
+
+            widths = nested.setdefault(record.shape, {}).setdefault(record.quality, {})
+            thicknesses = widths.setdefault(record.width, [])
+            if record.thickness not in thicknesses:
+                thicknesses.append(record.thickness)
+
+        # Freeze with consistent numeric ordering
+        return {
+            shape: {
+                quality: {
+                    width: tuple(sorted(thicknesses, key=parse_mm))
+                    for width, thicknesses in widths.items()
+                }
+                for quality, widths in qualities.items()
+            }
+            for shape, qualities in nested.items()
+        }
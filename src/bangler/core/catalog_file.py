@@ -0,0 +1,270 @@
+"""
+Memory-Mapped Catalog File
+Read-only binary catalog with fixed-width records and a string table, queried
+in place so every bangler process on a host shares the same page-cache pages
+
+File layout (little-endian):
+    header      magic, version, counts and section offsets
+    records     record_count x 8 uint32 string ids (SizingStockRecord field order)
+    index       record_count x uint32 record numbers, sorted by lookup key
+    offsets     (string_count + 1) x uint32 byte offsets into the string data
+    strings     UTF-8 string data
+    meta        JSON: source name plus the precomputed option trees
+"""
+
+import bisect
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .catalog import DEFAULT_LENGTH, CatalogSnapshot, SizingStockRecord
+
+MAGIC = b"BNGCAT01"
+VERSION = 1
+
+# magic, version, record_count, string_count, records/index/offsets/strings/meta offsets, meta length
+_HEADER = struct.Struct("<8sIII6Q")
+_RECORD = struct.Struct("<8I")
+_UINT32 = struct.Struct("<I")
+
+_SHAPE, _QUALITY, _WIDTH, _THICKNESS, _LENGTH = (
+    SizingStockRecord._fields.index(name) for name in ("shape", "quality", "width", "thickness", "length")
+)
+
+
+class CatalogFileWriter:
+    """
+    Writes a catalog file from a stream of records
+
+    Records go straight to disk as they are added; only the string table
+    (distinct values) and one key tuple per record are held in memory to build
+    the sorted index at close(). The file is written to a temporary name and
+    renamed into place, so readers never see a partial catalog.
+    """
+
+    def __init__(self, path: Union[str, Path], source: str = ""):
+        self.path = Path(path)
+        self.source = source
+        self._tmp_path = self.path.with_name(self.path.name + ".tmp")
+        self._file = open(self._tmp_path, "wb")
+        self._file.write(b"\0" * _HEADER.size)
+        self._string_ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._keys: List[Tuple[int, int, int, int, int]] = []
+
+    def _string_id(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return string_id
+
+    def add(self, record: SizingStockRecord) -> None:
+        """Append one record"""
+        ids = [self._string_id(value) for value in record]
+        self._file.write(_RECORD.pack(*ids))
+        self._keys.append((ids[_SHAPE], ids[_QUALITY], ids[_WIDTH], ids[_LENGTH], ids[_THICKNESS]))
+
+    def add_all(self, records: Iterable[SizingStockRecord]) -> None:
+        for record in records:
+            self.add(record)
+
+    def close(self, snapshot: Optional[CatalogSnapshot] = None) -> Path:
+        """
+        Finish the file and move it into place
+
+        Args:
+            snapshot: Snapshot of the same records, used for the option trees.
+                If omitted, the records are read back from disk to build one.
+        """
+        f = self._file
+        record_count = len(self._keys)
+        records_offset = _HEADER.size
+
+        # Index: record numbers ordered by normalized lookup key, then file order
+        normalized = [value.strip().lower() for value in self._strings]
+        order = sorted(
+            range(record_count),
+            key=lambda n: tuple(normalized[i] for i in self._keys[n]) + (n,)
+        )
+        index_offset = f.tell()
+        f.write(struct.pack(f"<{record_count}I", *order))
+
+        encoded = [value.encode("utf-8") for value in self._strings]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        offsets_offset = f.tell()
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        strings_offset = f.tell()
+        f.write(b"".join(encoded))
+
+        f.flush()
+        if snapshot is None:
+            snapshot = CatalogSnapshot(self._read_back(record_count, records_offset))
+        meta = json.dumps({
+            "source": self.source,
+            "available_options": snapshot.available_options(),
+            "nested_options": snapshot.nested_options()
+        }).encode("utf-8")
+        meta_offset = f.tell()
+        f.write(meta)
+
+        f.seek(0)
+        f.write(_HEADER.pack(
+            MAGIC, VERSION, record_count, len(self._strings),
+            records_offset, index_offset, offsets_offset, strings_offset, meta_offset, len(meta)
+        ))
+        f.close()
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def abort(self) -> None:
+        """Discard the partially written file"""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def _read_back(self, record_count: int, records_offset: int) -> Iterator[SizingStockRecord]:
+        with open(self._tmp_path, "rb") as f:
+            f.seek(records_offset)
+            for _ in range(record_count):
+                ids = _RECORD.unpack(f.read(_RECORD.size))
+                yield SizingStockRecord(*(self._strings[i] for i in ids))
+
+
+def write_catalog_file(snapshot: CatalogSnapshot, path: Union[str, Path]) -> Path:
+    """Write a snapshot to a catalog file"""
+    writer = CatalogFileWriter(path, source=snapshot.source)
+    try:
+        writer.add_all(snapshot)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close(snapshot)
+
+
+class _MappedRecords(Sequence):
+    """Sequence view decoding records from the map on access"""
+
+    def __init__(self, catalog: "MappedCatalog"):
+        self._catalog = catalog
+
+    def __len__(self) -> int:
+        return self._catalog.record_count
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self._catalog.record(n) for n in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("record index out of range")
+        return self._catalog.record(position)
+
+
+class MappedCatalog:
+    """
+    Read-only catalog queried directly from a memory-mapped catalog file
+
+    Offers the same read interface as CatalogSnapshot. Opening costs one mmap
+    and a header read; strings are decoded only when a query touches them, and
+    the option trees are loaded from the file's metadata on first use.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+
+        (magic, version, self.record_count, self.string_count, self._records_offset, self._index_offset,
+         self._offsets_offset, self._strings_offset, self._meta_offset, self._meta_length) = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            self._view.release()
+            self._map.close()
+            raise ValueError(f"Not a bangler catalog file (or unsupported version): {self.path}")
+
+        self.records = _MappedRecords(self)
+        self._meta: Optional[Dict[str, Any]] = None
+
+    def __reduce__(self):
+        # Other processes re-map the same file instead of copying its contents
+        return (type(self), (str(self.path),))
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def __iter__(self) -> Iterator[SizingStockRecord]:
+        for n in range(self.record_count):
+            yield self.record(n)
+
+    @property
+    def source(self) -> str:
+        return self._load_meta().get("source", "") or str(self.path)
+
+    def _string(self, string_id: int) -> str:
+        start, end = struct.unpack_from("<2I", self._map, self._offsets_offset + 4 * string_id)
+        base = self._strings_offset
+        return str(self._view[base + start:base + end], "utf-8")
+
+    def _record_ids(self, record_no: int) -> Tuple[int, ...]:
+        return _RECORD.unpack_from(self._map, self._records_offset + _RECORD.size * record_no)
+
+    def record(self, record_no: int) -> SizingStockRecord:
+        """Decode one record by file position"""
+        return SizingStockRecord(*(self._string(i) for i in self._record_ids(record_no)))
+
+    def _indexed_record_no(self, position: int) -> int:
+        return _UINT32.unpack_from(self._map, self._index_offset + 4 * position)[0]
+
+    def _index_key(self, position: int, with_thickness: bool = True) -> Tuple[str, ...]:
+        ids = self._record_ids(self._indexed_record_no(position))
+        fields = (_SHAPE, _QUALITY, _WIDTH, _LENGTH, _THICKNESS) if with_thickness else (_SHAPE, _QUALITY, _WIDTH, _LENGTH)
+        return tuple(self._string(ids[field]).strip().lower() for field in fields)
+
+    def find_sku(self, shape: str, quality: str, width: str, thickness: str = None,
+                 length: str = None) -> Optional[str]:
+        """Find a SKU by exact (case-insensitive) specification match"""
+        prefix = (shape.strip().lower(), quality.strip().lower(), width.strip().lower(),
+                  (length or DEFAULT_LENGTH).strip().lower())
+
+        if thickness:
+            target = prefix + (thickness.strip().lower(),)
+            position = bisect.bisect_left(range(self.record_count), target, key=self._index_key)
+            if position < self.record_count and self._index_key(position) == target:
+                return self._string(self._record_ids(self._indexed_record_no(position))[1])
+            return None
+
+        # No thickness: earliest record (file order) among all thicknesses
+        start = bisect.bisect_left(range(self.record_count), prefix,
+                                   key=lambda p: self._index_key(p, with_thickness=False))
+        end = bisect.bisect_right(range(self.record_count), prefix, lo=start,
+                                  key=lambda p: self._index_key(p, with_thickness=False))
+        if start == end:
+            return None
+        first = min(self._indexed_record_no(p) for p in range(start, end))
+        return self._string(self._record_ids(first)[1])
+
+    def _load_meta(self) -> Dict[str, Any]:
+        # Parsing twice under a race is harmless; the result is never mutated
+        if self._meta is None:
+            raw = self._view[self._meta_offset:self._meta_offset + self._meta_length]
+            self._meta = json.loads(str(raw, "utf-8"))
+        return self._meta
+
+    def available_options(self) -> Dict[str, List[str]]:
+        """All shapes, qualities, widths, thicknesses and lengths (sorted)"""
+        return {key: list(values) for key, values in self._load_meta()["available_options"].items()}
+
+    def nested_options(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
+        """Options structured as shape -> quality -> width -> thicknesses"""
+        return {
+            shape: {
+                quality: {width: list(thicknesses) for width, thicknesses in widths.items()}
+                for quality, widths in qualities.items()
+            }
+            for shape, qualities in self._load_meta()["nested_options"].items()
+        }
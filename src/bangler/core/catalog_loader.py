@@ -0,0 +1,400 @@
+"""
+Streaming Catalog Loaders
+Parse sizing stock exports (CSV) and API inventories (JSON) record by record,
+keeping only the fields pricing needs. Exports may be gzip (.gz), Zstandard
+(.zst) or zip compressed; they are decompressed incrementally as they are parsed.
+"""
+
+import csv
+import gzip
+import io
+import json
+import re
+import sys
+import zipfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:  # Optional: only needed for .zst exports (pip install zstandard)
+    zstandard = None
+
+from .catalog import DESCRIPTIVE_ELEMENT_FIELDS, CatalogSnapshot, SizingStockRecord, parse_mm
+
+# CSV has paired columns: DescriptiveElementNameN, DescriptiveElementValueN
+MAX_DESCRIPTIVE_ELEMENTS = 6
+
+# Position of each descriptive element in RecordBuilder.build's field arguments
+ELEMENT_SLOTS = {
+    name: ("shape", "quality", "width", "thickness", "length").index(field_name)
+    for name, field_name in DESCRIPTIVE_ELEMENT_FIELDS.items()
+}
+
+
+@dataclass
+class LoadReport:
+    """Summary of a catalog load, including rows that were skipped"""
+    source: str
+    rows_read: int = 0
+    rows_loaded: int = 0
+    skipped: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def rows_skipped(self) -> int:
+        return sum(self.skipped.values())
+
+    def skip(self, reason: str) -> None:
+        self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def summary(self) -> str:
+        """One-line description of skipped rows"""
+        if not self.skipped:
+            return "no rows skipped"
+        reasons = ", ".join(f"{count} {reason}" for reason, count in sorted(self.skipped.items()))
+        return f"{self.rows_skipped} rows skipped ({reasons})"
+
+
+class RecordBuilder:
+    """
+    Validates and interns record fields as rows stream in
+
+    Descriptive values repeat thousands of times across a catalog, so loaders
+    intern each distinct string once and every record shares it. Dimension
+    strings are checked for a parseable millimetre value once per distinct
+    string.
+    """
+
+    def __init__(self, report: LoadReport):
+        self.report = report
+        self._dimension_ok: Dict[str, bool] = {}
+
+    def build(self, product_id: str, sku: str, unit_of_sale: str, shape: str, quality: str,
+              width: str, thickness: str, length: str) -> Optional[SizingStockRecord]:
+        """Return a record, or None (and count the reason) if it can't be priced"""
+        report = self.report
+        report.rows_read += 1
+
+        if not sku:
+            report.skip("missing SKU")
+            return None
+        if not shape:
+            report.skip("missing shape")
+            return None
+        if not quality:
+            report.skip("missing quality")
+            return None
+        if not width:
+            report.skip("missing width")
+            return None
+        if not thickness:
+            report.skip("missing thickness")
+            return None
+
+        dimension_ok = self._dimension_ok
+        width_ok = dimension_ok.get(width)
+        if width_ok is None:
+            width_ok = self._is_dimension(width)
+        thickness_ok = dimension_ok.get(thickness)
+        if thickness_ok is None:
+            thickness_ok = self._is_dimension(thickness)
+        if not (width_ok and thickness_ok):
+            report.skip("unparseable dimensions")
+            return None
+
+        report.rows_loaded += 1
+        return SizingStockRecord(product_id, sku, sys.intern(unit_of_sale), shape, quality, width, thickness, length)
+
+    def _is_dimension(self, value: str) -> bool:
+        try:
+            parse_mm(value)
+            ok = True
+        except ValueError:
+            ok = False
+        self._dimension_ok[value] = ok
+        return ok
+
+
+def iter_csv_records(stream: TextIO, report: LoadReport) -> Iterator[SizingStockRecord]:
+    """
+    Stream priceable records from a Stuller sizing stock CSV export
+
+    Only Id, Sku, UnitOfSale and the descriptive element pairs are read from
+    each row; every other column is ignored without building a dict per row.
+    """
+    reader = csv.reader(stream)
+    try:
+        header = next(reader)
+    except StopIteration:
+        return
+
+    columns = {name: index for index, name in enumerate(header)}
+    id_col = columns.get("Id")
+    sku_col = columns.get("Sku")
+    unit_col = columns.get("UnitOfSale")
+    element_cols: List[Tuple[int, int]] = [
+        (columns[f"DescriptiveElementName{i}"], columns[f"DescriptiveElementValue{i}"])
+        for i in range(1, MAX_DESCRIPTIVE_ELEMENTS + 1)
+        if f"DescriptiveElementName{i}" in columns and f"DescriptiveElementValue{i}" in columns
+    ]
+
+    build = RecordBuilder(report).build
+    element_slots = ELEMENT_SLOTS
+    value_cache: Dict[str, str] = {}
+    max_col = max([id_col or 0, sku_col or 0, unit_col or 0] + [col for pair in element_cols for col in pair])
+
+    for row in reader:
+        if len(row) <= max_col:
+            # Ragged row: pad so every projected column exists
+            row = row + [""] * (max_col + 1 - len(row))
+
+        values = ["", "", "", "", ""]
+        for name_col, value_col in element_cols:
+            slot = element_slots.get(row[name_col])
+            if slot is not None:
+                raw = row[value_col]
+                if raw:
+                    value = value_cache.get(raw)
+                    if value is None:
+                        value = value_cache[raw] = sys.intern(raw.strip())
+                    values[slot] = value
+
+        record = build(
+            row[id_col] if id_col is not None else "",
+            row[sku_col] if sku_col is not None else "",
+            row[unit_col] if unit_col is not None else "",
+            *values
+        )
+        if record is not None:
+            yield record
+
+
+def iter_product_records(products: Iterable[Dict[str, Any]], report: LoadReport) -> Iterator[SizingStockRecord]:
+    """
+    Stream priceable records from Stuller API product objects
+
+    Descriptive elements come from DescriptiveElementGroup.DescriptiveElements,
+    using each element's DisplayValue (the form the CSV export uses).
+    """
+    build = RecordBuilder(report).build
+    element_slots = ELEMENT_SLOTS
+    value_cache: Dict[str, str] = {}
+
+    for product in products:
+        values = ["", "", "", "", ""]
+        group = product.get("DescriptiveElementGroup") or {}
+        for element in group.get("DescriptiveElements") or ():
+            slot = element_slots.get(element.get("Name"))
+            if slot is not None:
+                raw = element.get("DisplayValue") or element.get("Value")
+                if raw:
+                    value = value_cache.get(raw)
+                    if value is None:
+                        value = value_cache[raw] = sys.intern(raw.strip())
+                    values[slot] = value
+
+        record = build(
+            str(product.get("Id") or ""),
+            product.get("SKU") or product.get("Sku") or "",
+            product.get("UnitOfSale") or "",
+            *values
+        )
+        if record is not None:
+            yield record
+
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class _JsonTokenStream:
+    """
+    Incremental reader over a JSON text stream
+
+    Holds only a sliding buffer: values are decoded one at a time with
+    JSONDecoder.raw_decode, and more text is read whenever a value runs past
+    the end of the buffer.
+    """
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self._stream = stream
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, grow: bool = False) -> bool:
+        # When a value spans the buffer, at least double the unread text so a
+        # large value is re-scanned only O(log n) times
+        size = max(self._chunk_size, len(self._buffer) - self._pos) if grow else self._chunk_size
+        data = self._stream.read(size)
+        if not data:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of input)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Malformed JSON: expected '{char}', found '{found or 'end of input'}'")
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._fill(grow=True):
+                    raise
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self._buffer) and not self._eof and self._fill(grow=True):
+                continue
+            self._pos = end
+            return value
+
+    def array_items(self) -> Iterator[Any]:
+        """Decode the elements of the array at the current position one by one"""
+        self.expect("[")
+        while True:
+            char = self.peek()
+            if char == "]":
+                self._pos += 1
+                return
+            if char == ",":
+                self._pos += 1
+                continue
+            if not char:
+                raise ValueError("Malformed JSON: unterminated array")
+            yield self.value()
+
+
+def iter_json_products(stream: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """
+    Stream product objects from a Stuller JSON inventory
+
+    Accepts either an API dump ({"products": [...], ...} as written by the
+    discovery tool, where other top-level keys are skipped) or a bare array of
+    products. Only one product is decoded and held at a time.
+    """
+    tokens = _JsonTokenStream(stream, chunk_size)
+    first = tokens.peek()
+
+    if first == "[":
+        yield from tokens.array_items()
+        return
+    if first != "{":
+        raise ValueError("Expected a JSON object or an array of products")
+
+    tokens.expect("{")
+    while True:
+        char = tokens.peek()
+        if char == "}":
+            return
+        if char == ",":
+            tokens.expect(",")
+            continue
+        if not char:
+            raise ValueError("Malformed JSON: unterminated object")
+        key = tokens.value()
+        tokens.expect(":")
+        if key in ("products", "Products") and tokens.peek() == "[":
+            yield from tokens.array_items()
+        else:
+            tokens.value()  # metadata, analysis, ... (not needed for pricing)
+
+
+# Compression suffixes understood by open_catalog_text, on top of .csv / .json
+COMPRESSION_SUFFIXES = (".gz", ".zst", ".zip")
+
+
+def zstd_available() -> bool:
+    return zstandard is not None
+
+
+def _zip_member(archive: zipfile.ZipFile) -> zipfile.ZipInfo:
+    """The export inside a zip: its first .csv or .json file"""
+    for info in archive.infolist():
+        name = info.filename.lower()
+        if not info.is_dir() and not name.startswith("__macosx/") and name.endswith((".csv", ".json")):
+            return info
+    raise ValueError(f"No .csv or .json export inside {archive.filename}")
+
+
+def catalog_format(path: Union[str, Path]) -> str:
+    """'json' or 'csv' for an export path, looking through any compression suffix"""
+    name = Path(path).name.lower()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            name = _zip_member(archive).filename.lower()
+    elif name.endswith((".gz", ".zst")):
+        name = name.rsplit(".", 1)[0]
+    return "json" if name.endswith(".json") else "csv"
+
+
+@contextmanager
+def open_catalog_text(path: Union[str, Path]) -> Iterator[TextIO]:
+    """
+    Open a catalog export as UTF-8 text, decompressing on the fly
+
+    .gz, .zst and .zip files are streamed through their decompressor, so only
+    a buffer's worth of the decompressed text is in memory at once.
+
+    Raises:
+        ImportError: For a .zst file when the zstandard package isn't installed
+        ValueError: For a zip archive without a .csv or .json member
+    """
+    path = Path(path)
+    name = path.name.lower()
+    if name.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+            yield f
+    elif name.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError(f"Reading {path.name} needs the zstandard package (pip install zstandard)")
+        with open(path, "rb") as raw, zstandard.ZstdDecompressor().stream_reader(raw) as reader:
+            yield io.TextIOWrapper(reader, encoding="utf-8", newline="")
+    elif name.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive, archive.open(_zip_member(archive)) as raw:
+            yield io.TextIOWrapper(raw, encoding="utf-8", newline="")
+    else:
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield f
+
+
+def load_csv_catalog(path: Path) -> Tuple[CatalogSnapshot, LoadReport]:
+    """Stream a CSV export (plain or compressed) into an immutable catalog snapshot"""
+    report = LoadReport(source=str(path))
+    with open_catalog_text(path) as f:
+        snapshot = CatalogSnapshot(iter_csv_records(f, report), source=str(path))
+    return snapshot, report
+
+
+def load_json_catalog(path: Path) -> Tuple[CatalogSnapshot, LoadReport]:
+    """Stream a JSON inventory (API dump, plain or compressed) into an immutable catalog snapshot"""
+    report = LoadReport(source=str(path))
+    with open_catalog_text(path) as f:
+        snapshot = CatalogSnapshot(iter_product_records(iter_json_products(f), report), source=str(path))
+    return snapshot, report
+
+
+def load_catalog(path: Path) -> Tuple[CatalogSnapshot, LoadReport]:
+    """Load a CSV export or JSON inventory, chosen by file extension (through .gz/.zst/.zip)"""
+    if catalog_format(path) == "json":
+        return load_json_catalog(path)
+    return load_csv_catalog(path)
@@ -0,0 +1,221 @@
+"""
+Stuller Catalog Sync
+Pages the sizing stock catalog out of the Stuller /products API straight into a
+memory-mapped catalog file, as an alternative to a manual CSV export
+
+The query is sharded by metal shape so several shards page concurrently (pages
+within one query are chained by NextPage tokens and can't be fetched out of
+order). Every page is spooled to disk and its NextPage token checkpointed, so
+an interrupted sync resumes where it stopped.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Set
+
+from ..api.rate_limit import bulk_priority
+from ..api.stuller_client import StullerClient
+from ..config.settings import BanglerConfig
+from .catalog import SizingStockRecord
+from .catalog_file import CatalogFileWriter
+from .catalog_loader import LoadReport, iter_product_records
+
+logger = logging.getLogger(__name__)
+
+# AdvancedProductFilters selecting sizing stock, plus one filter per shard
+SIZING_STOCK_FILTER = {"Type": "Series", "Values": [{"DisplayValue": "Sizing Stock"}]}
+SHAPE_FILTER_TYPE = "Metal Shape"
+
+# Each shard is a strict Metal Shape filter, so a shape missing here is missing
+# from the synced catalog. Defaults to every shape the business sells; bangler
+# sync also adds any shape found in the current local catalog.
+DEFAULT_SHARD_SHAPES = tuple(BanglerConfig.BUSINESS_RULES['valid_shapes'])
+
+STATE_VERSION = 1
+
+
+def is_sizing_stock(product: Dict[str, Any]) -> bool:
+    """Guard against filters the API ignores: keep only sizing stock products"""
+    group = product.get("DescriptiveElementGroup") or {}
+    return (group.get("GroupName") or product.get("GroupDescription") or "").strip().lower() == "sizing stock"
+
+
+class CatalogSync:
+    """
+    Resumable, sharded catalog download into a catalog file
+
+    Worker threads fetch pages and hand them to the calling thread through a
+    bounded queue; only the calling thread touches the catalog writer, the
+    spool and the checkpoint, so pages are recorded one at a time and memory
+    stays bounded by the queue size.
+    """
+
+    def __init__(self, client: StullerClient, output: Path, shapes: Sequence[str] = DEFAULT_SHARD_SHAPES,
+                 workers: int = 3, page_size: int = 100, max_retries: int = 3):
+        self.client = client
+        self.output = Path(output)
+        self.shapes = list(dict.fromkeys(shapes))
+        self.workers = max(1, workers)
+        self.page_size = page_size
+        self.max_retries = max_retries
+
+        self.state_path = self.output.with_name(self.output.name + ".sync.json")
+        self.spool_path = self.output.with_name(self.output.name + ".sync.jsonl")
+        self.report = LoadReport(source="Stuller API")
+        self.pages_fetched = 0
+
+    # -- checkpoint -----------------------------------------------------
+
+    def _signature(self) -> Dict[str, Any]:
+        return {"version": STATE_VERSION, "shapes": self.shapes, "page_size": self.page_size}
+
+    def _load_state(self, resume: bool) -> Dict[str, Any]:
+        fresh = {"signature": self._signature(), "shards": {}}
+        if not resume or not self.state_path.exists():
+            return fresh
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable sync state {self.state_path}: {e}")
+            return fresh
+        if state.get("signature") != self._signature():
+            logger.warning("Sync settings changed since the interrupted run; starting over")
+            return fresh
+        return state
+
+    def _save_state(self, state: Dict[str, Any]) -> None:
+        tmp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+        tmp_path.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp_path, self.state_path)
+
+    def _cleanup(self) -> None:
+        self.state_path.unlink(missing_ok=True)
+        self.spool_path.unlink(missing_ok=True)
+
+    # -- fetching -------------------------------------------------------
+
+    def _fetch_page(self, shape: str, token: Optional[str]) -> Dict[str, Any]:
+        filters = [SIZING_STOCK_FILTER, {"Type": SHAPE_FILTER_TYPE, "Values": [{"DisplayValue": shape}]}]
+        response = {}
+        for attempt in range(self.max_retries):
+            response = self.client.search_products(
+                advanced_filters=filters,
+                includes=["All"],
+                page_size=self.page_size,
+                next_page=token
+            )
+            if response.get("success"):
+                return response
+            time.sleep(min(2 ** attempt, 10))
+        return response
+
+    def _run_shard(self, shape: str, token: Optional[str], pages: "queue.Queue", stop: threading.Event) -> None:
+        while not stop.is_set():
+            response = self._fetch_page(shape, token)
+            if not response.get("success"):
+                pages.put((shape, None, None, response.get("error", "request failed")))
+                return
+            next_token = response.get("next_page_token")
+            if next_token == token:
+                next_token = None  # Defensive: never loop on a repeated token
+            pages.put((shape, response.get("products", []), next_token, None))
+            if not next_token:
+                return
+            token = next_token
+
+    # -- main loop ------------------------------------------------------
+
+    def run(self, resume: bool = True, progress=None) -> Path:
+        """
+        Sync the catalog into the output file
+
+        Args:
+            resume: Continue an interrupted sync if its checkpoint matches
+            progress: Optional callable(records_written, pages_fetched) called per page
+
+        Returns:
+            Path of the written catalog file
+
+        Raises:
+            RuntimeError: If a shard still fails after retries (progress is kept for resume)
+        """
+        state = self._load_state(resume)
+        shards = state["shards"]
+        if not shards:
+            self.spool_path.unlink(missing_ok=True)
+
+        writer = CatalogFileWriter(self.output, source=f"Stuller API sync {date.today().isoformat()}")
+        seen: Set[str] = set()
+        failures: List[str] = []
+        stop = threading.Event()
+        threads: List[threading.Thread] = []
+
+        try:
+            # Replay pages recorded before an interruption
+            if self.spool_path.exists():
+                with open(self.spool_path, "r", encoding="utf-8") as spool:
+                    for line in spool:
+                        record = SizingStockRecord(*json.loads(line))
+                        if record.sku not in seen:
+                            seen.add(record.sku)
+                            writer.add(record)
+                if seen:
+                    print(f"🔄 Resuming sync: {len(seen)} products already downloaded")
+
+            pending = [shape for shape in self.shapes if not shards.get(shape, {}).get("done")]
+            pages: "queue.Queue" = queue.Queue(maxsize=self.workers * 2)
+            semaphore = threading.Semaphore(self.workers)
+
+            def worker(shape: str) -> None:
+                with semaphore, bulk_priority():
+                    self._run_shard(shape, shards.get(shape, {}).get("next_page"), pages, stop)
+
+            for shape in pending:
+                thread = threading.Thread(target=worker, args=(shape,), daemon=True, name=f"bangler-sync-{shape}")
+                thread.start()
+                threads.append(thread)
+
+            active = len(pending)
+            with open(self.spool_path, "a", encoding="utf-8") as spool:
+                while active:
+                    shape, products, next_token, error = pages.get()
+                    if error is not None:
+                        logger.error(f"Catalog sync shard '{shape}' failed: {error}")
+                        failures.append(shape)
+                        active -= 1
+                        continue
+
+                    self.pages_fetched += 1
+                    wanted = (product for product in products if is_sizing_stock(product))
+                    for record in iter_product_records(wanted, self.report):
+                        if record.sku in seen:
+                            continue
+                        seen.add(record.sku)
+                        writer.add(record)
+                        spool.write(json.dumps(record) + "\n")
+                    spool.flush()
+
+                    shards[shape] = {"next_page": next_token, "done": not next_token}
+                    self._save_state(state)
+                    if not next_token:
+                        active -= 1
+                    if progress:
+                        progress(len(seen), self.pages_fetched)
+
+            if failures:
+                raise RuntimeError(f"Shards failed after {self.max_retries} attempts: {', '.join(failures)}")
+
+        except BaseException:
+            stop.set()
+            writer.abort()
+            raise
+
+        path = writer.close()
+        self._cleanup()
+        return path
@@ -0,0 +1,198 @@
+"""
+Versioned Catalog History
+Every dated sizing stock export held at once for as-of-date lookups, with
+unchanged records shared between versions
+"""
+
+import logging
+import re
+import threading
+from bisect import bisect_right
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .catalog import DEFAULT_LENGTH, CatalogSnapshot, SizingStockRecord, _lookup_key, build_sku_index
+from .catalog_loader import LoadReport, iter_csv_records, open_catalog_text, zstd_available
+
+logger = logging.getLogger(__name__)
+
+DATED_EXPORT = re.compile(r'sizingstock-(\d{8})\.(csv|csv\.gz|csv\.zst|csv\.zip|zip)', re.IGNORECASE)
+# When a date has several copies, the cheapest to read wins
+_FORMAT_PREFERENCE = {"csv": 0, "csv.gz": 1, "csv.zip": 2, "zip": 2, "csv.zst": 3}
+
+AsOf = Union[date, datetime]
+
+
+def dated_exports(directory: Union[str, Path]) -> List[Tuple[date, Path]]:
+    """
+    sizingstock-YYYYMMDD exports in a directory, oldest first
+
+    Exports may be .csv, .csv.gz, .csv.zst or .zip; if a date has several,
+    the uncompressed one is used. .zst files are skipped when the zstandard
+    package isn't installed.
+    """
+    best: Dict[date, Tuple[int, Path]] = {}
+    for path in Path(directory).glob("sizingstock-*"):
+        match = DATED_EXPORT.fullmatch(path.name)
+        if not match:
+            continue
+        kind = match.group(2).lower()
+        if kind == "csv.zst" and not zstd_available():
+            logger.warning(f"Ignoring {path.name}: install zstandard to read .zst exports")
+            continue
+        try:
+            effective = datetime.strptime(match.group(1), "%Y%m%d").date()
+        except ValueError:
+            logger.warning(f"Ignoring {path.name}: not a valid date")
+            continue
+        candidate = (_FORMAT_PREFERENCE[kind], path)
+        if effective not in best or candidate < best[effective]:
+            best[effective] = candidate
+    return [(effective, best[effective][1]) for effective in sorted(best)]
+
+
+class CatalogVersion(NamedTuple):
+    """One dated catalog; its records are shared with other versions wherever they are unchanged"""
+    effective: date
+    source: str
+    records: Tuple[SizingStockRecord, ...]
+    added: int                          # Records not in the previous version
+    removed: int                        # Previous version's records no longer present
+
+
+class CatalogHistory:
+    """
+    Several dated catalogs held at once
+
+    Structural sharing keeps memory proportional to what changed:
+      - Records are interned across versions, so an unchanged product is one
+        tuple referenced by every version that contains it, and changed
+        products share their field strings.
+      - Only the newest version has a full SKU index. Each older version
+        keeps just the lookup keys whose answer differs from the next newer
+        version (a reverse delta); an as-of lookup checks those deltas from
+        the requested version forwards and falls through to the newest index.
+
+    A version is in effect from its export date until the next export.
+    Exports are consumed one at a time, oldest first, so only one export's
+    raw records need to be in memory while the history is built.
+    """
+
+    def __init__(self, exports: Iterable[Tuple[date, str, Iterable[SizingStockRecord]]]):
+        interned_records: Dict[SizingStockRecord, SizingStockRecord] = {}
+        interned_strings: Dict[str, str] = {}
+
+        def intern(record: SizingStockRecord) -> SizingStockRecord:
+            shared = interned_records.get(record)
+            if shared is None:
+                shared = record._make(interned_strings.setdefault(value, value) for value in record)
+                interned_records[shared] = shared
+            return shared
+
+        versions: List[CatalogVersion] = []
+        deltas: List[Dict[Tuple, Optional[str]]] = []
+        previous_index: Optional[Dict[Tuple, str]] = None
+        previous: frozenset = frozenset()
+
+        for effective, source, records in exports:
+            if versions and effective <= versions[-1].effective:
+                raise ValueError(f"Catalog exports must be in date order ({source} is dated {effective})")
+            shared = tuple(intern(record) for record in records)
+            members = frozenset(shared)
+            versions.append(CatalogVersion(
+                effective, source, shared, len(members - previous), len(previous - members)
+            ))
+            previous = members
+
+            index = build_sku_index(shared)
+            if previous_index is not None:
+                # Reverse delta for the version before this one
+                deltas.append({
+                    key: sku for key, sku in previous_index.items() if index.get(key) != sku
+                })
+                deltas[-1].update((key, None) for key in index.keys() - previous_index.keys())
+            previous_index = index
+
+        self.versions: Tuple[CatalogVersion, ...] = tuple(versions)
+        self.unique_records = len(interned_records)
+        self._dates = [version.effective for version in versions]
+        self._deltas = tuple(deltas)
+        self._latest_index: Dict[Tuple, str] = previous_index or {}
+        self._snapshots: Dict[date, CatalogSnapshot] = {}
+        self._snapshot_lock = threading.Lock()
+
+    @classmethod
+    def from_directory(cls, directory: Union[str, Path]) -> "CatalogHistory":
+        """History of every dated CSV export (plain or compressed) in a directory"""
+        def exports():
+            for effective, path in dated_exports(directory):
+                report = LoadReport(source=str(path))
+                with open_catalog_text(path) as f:
+                    records = list(iter_csv_records(f, report))
+                yield effective, str(path), records
+
+        history = cls(exports())
+        logger.info(f"Catalog history: {history.get_stats()}")
+        return history
+
+    def __len__(self) -> int:
+        return len(self.versions)
+
+    def _position(self, as_of: AsOf) -> int:
+        if isinstance(as_of, datetime):
+            as_of = as_of.date()
+        position = bisect_right(self._dates, as_of) - 1
+        if position < 0:
+            first = self._dates[0].isoformat() if self._dates else "none"
+            raise ValueError(f"No catalog in effect on {as_of.isoformat()} (earliest export: {first})")
+        return position
+
+    def version(self, as_of: AsOf) -> CatalogVersion:
+        """
+        The catalog in effect on a date
+
+        Raises:
+            ValueError: If the date is before the earliest export
+        """
+        return self.versions[self._position(as_of)]
+
+    def find_sku(self, shape: str, quality: str, width: str, thickness: str = None,
+                 length: str = None, as_of: Optional[AsOf] = None) -> Optional[str]:
+        """
+        SKU for a specification as the catalog stood on a date (default: newest export)
+
+        Raises:
+            ValueError: If the date is before the earliest export
+        """
+        key = _lookup_key(shape, quality, width, thickness, length or DEFAULT_LENGTH)
+        if as_of is not None:
+            for delta in self._deltas[self._position(as_of):]:
+                if key in delta:
+                    return delta[key]
+        return self._latest_index.get(key)
+
+    def snapshot(self, as_of: AsOf) -> CatalogSnapshot:
+        """
+        Full CatalogSnapshot (options, SKU index) of the version in effect on a date
+
+        Built on demand from the shared records; the two most recent are kept.
+        """
+        version = self.version(as_of)
+        with self._snapshot_lock:
+            snapshot = self._snapshots.get(version.effective)
+            if snapshot is None:
+                snapshot = CatalogSnapshot(version.records, source=version.source)
+                if len(self._snapshots) >= 2:
+                    del self._snapshots[next(iter(self._snapshots))]
+                self._snapshots[version.effective] = snapshot
+            return snapshot
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "versions": len(self.versions),
+            "record_references": sum(len(version.records) for version in self.versions),
+            "unique_records": self.unique_records,
+            "delta_keys": sum(len(delta) for delta in self._deltas),
+            "latest_index_keys": len(self._latest_index)
+        }
@@ -0,0 +1,67 @@
+"""
+Orderable Combination Set
+Every (shape, quality, width, thickness) the catalog can supply in bulk,
+compiled once per snapshot so impossible specs are rejected in O(1)
+"""
+
+import threading
+from typing import Dict, FrozenSet, Iterable, Optional, Tuple
+
+from .catalog import DEFAULT_LENGTH, SizingStockRecord
+
+CombinationKey = Tuple[str, str, str, str]
+
+
+def _normalize(value: Optional[str]) -> str:
+    return value.strip().lower() if value else ""
+
+
+class OrderableCombinations:
+    """
+    Frozen set of normalized orderable combinations plus a negative cache
+
+    Membership is decided against the frozen set; specs that miss are also
+    remembered verbatim (un-normalized) in a bounded negative cache, so a spec
+    that is retried - the usual pattern when a counter keeps re-quoting an
+    unstocked size - is rejected without re-normalizing its fields.
+    """
+
+    def __init__(self, records: Iterable[SizingStockRecord], max_misses: int = 4096):
+        bulk = DEFAULT_LENGTH.lower()
+        self._combinations: FrozenSet[CombinationKey] = frozenset(
+            (_normalize(r.shape), _normalize(r.quality), _normalize(r.width), _normalize(r.thickness))
+            for r in records
+            if r.sku and r.thickness and _normalize(r.length) == bulk
+        )
+        self._misses: Dict[Tuple, None] = {}
+        self._miss_lock = threading.Lock()
+        self.max_misses = max_misses
+        self.negative_hits = 0
+
+    def __len__(self) -> int:
+        return len(self._combinations)
+
+    def is_orderable(self, shape: str, quality: str, width: str, thickness: str) -> bool:
+        """Whether the catalog stocks this combination (case-insensitive)"""
+        raw = (shape, quality, width, thickness)
+        if raw in self._misses:
+            self.negative_hits += 1
+            return False
+
+        key = (_normalize(shape), _normalize(quality), _normalize(width), _normalize(thickness))
+        if key in self._combinations:
+            return True
+
+        with self._miss_lock:
+            if len(self._misses) >= self.max_misses:
+                # Drop the oldest miss (dicts keep insertion order)
+                del self._misses[next(iter(self._misses))]
+            self._misses[raw] = None
+        return False
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "combinations": len(self._combinations),
+            "cached_misses": len(self._misses),
+            "negative_hits": self.negative_hits
+        }
@@ -0,0 +1,127 @@
+"""
+Nearest-Available Dimension Index
+Secondary catalog index keyed by shape/quality with sorted numeric widths and
+thicknesses, for ranking orderable substitutes when a spec isn't stocked
+"""
+
+import bisect
+import heapq
+import math
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .catalog import DEFAULT_LENGTH, SizingStockRecord, parse_mm
+
+
+class DimensionMatch(NamedTuple):
+    """An orderable SKU and its dimensional distance from the requested spec"""
+    sku: str
+    shape: str
+    quality: str
+    width: str
+    thickness: str
+    distance_mm: float
+
+
+class _Group(NamedTuple):
+    widths: List[float]                                   # sorted ascending
+    entries: List[Tuple[float, float, SizingStockRecord]]  # parallel to widths
+
+
+class DimensionIndex:
+    """
+    Shape/quality -> width-sorted arrays of (width_mm, thickness_mm) points
+
+    nearest() binary-searches the requested width and walks outward in both
+    directions, stopping each side once the width gap alone exceeds the k-th
+    best distance found so far, so a query touches only nearby entries.
+    """
+
+    def __init__(self, records: Iterable[SizingStockRecord]):
+        groups: Dict[Tuple[str, str], List[Tuple[float, float, SizingStockRecord]]] = {}
+        seen = set()
+        bulk = DEFAULT_LENGTH.lower()
+
+        for record in records:
+            if not (record.sku and record.width and record.thickness) or record.length.lower() != bulk:
+                continue
+            try:
+                point = (parse_mm(record.width), parse_mm(record.thickness))
+            except ValueError:
+                continue
+
+            key = (record.shape.lower(), record.quality.lower())
+            if (key, point) in seen:
+                continue  # first SKU per dimension wins, as in find_sku
+            seen.add((key, point))
+            groups.setdefault(key, []).append(point + (record,))
+
+        self._groups: Dict[Tuple[str, str], _Group] = {}
+        for key, entries in groups.items():
+            entries.sort(key=lambda entry: (entry[0], entry[1]))
+            self._groups[key] = _Group([entry[0] for entry in entries], entries)
+
+    def points(self, shape: str, quality: str) -> List[Tuple[float, float, SizingStockRecord]]:
+        """All orderable (width_mm, thickness_mm, record) for a shape/quality, sorted by width then thickness"""
+        group = self._groups.get((shape.strip().lower(), quality.strip().lower()))
+        return list(group.entries) if group is not None else []
+
+    def nearest(self, shape: str, quality: str, width_mm: float, thickness_mm: Optional[float] = None,
+                k: int = 5, include_exact: bool = False) -> List[DimensionMatch]:
+        """
+        Find the k orderable SKUs closest to the requested dimensions
+
+        Args:
+            shape: Metal shape (case-insensitive)
+            quality: Quality string (case-insensitive)
+            width_mm: Requested width in mm
+            thickness_mm: Requested thickness in mm, or None to rank by width only
+            k: Number of matches to return
+            include_exact: Whether an exact dimensional match may be returned
+
+        Returns:
+            Matches ordered by Euclidean distance in (width, thickness) mm
+        """
+        group = self._groups.get((shape.strip().lower(), quality.strip().lower()))
+        if group is None or k <= 0:
+            return []
+
+        widths, entries = group
+        best: List[Tuple[float, int]] = []  # max-heap of (-distance, position)
+
+        def consider(position: int) -> None:
+            entry_width, entry_thickness, _ = entries[position]
+            dw = entry_width - width_mm
+            dt = (entry_thickness - thickness_mm) if thickness_mm is not None else 0.0
+            distance = math.hypot(dw, dt)
+            if distance == 0 and not include_exact:
+                return
+            item = (-distance, -position)
+            if len(best) < k:
+                heapq.heappush(best, item)
+            elif item > best[0]:
+                heapq.heapreplace(best, item)
+
+        def bound() -> float:
+            return -best[0][0] if len(best) == k else math.inf
+
+        right = bisect.bisect_left(widths, width_mm)
+        left = right - 1
+        while left >= 0 or right < len(widths):
+            limit = bound()
+            left_gap = width_mm - widths[left] if left >= 0 else math.inf
+            right_gap = widths[right] - width_mm if right < len(widths) else math.inf
+            if min(left_gap, right_gap) > limit:
+                break
+            if left_gap <= right_gap:
+                consider(left)
+                left -= 1
+            else:
+                consider(right)
+                right += 1
+
+        ranked = sorted((-neg_distance, -neg_position) for neg_distance, neg_position in best)
+        return [
+            DimensionMatch(record.sku, record.shape, record.quality, record.width, record.thickness, round(distance, 4))
+            for distance, position in ranked
+            for record in (entries[position][2],)
+        ]
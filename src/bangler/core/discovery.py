@@ -3,84 +3,177 @@ Phase 2 CSV-Based Sizing Stock Lookup
 Direct CSV parsing for sizing stock products from Stuller export
 """
 
-import csv
-import re
+import logging
 import sys
+import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple, Union
+
+from ..config.settings import BanglerConfig
+from .catalog import CatalogSnapshot
+from .catalog_file import MappedCatalog
+from .combinations import OrderableCombinations
+from .dimension_index import DimensionIndex
+from .catalog_loader import LoadReport, catalog_format, load_catalog
+from .catalog_versions import AsOf, CatalogHistory, dated_exports
+from .options_payload import OptionsPayloads
+from .search_index import SearchIndex
+
+logger = logging.getLogger(__name__)
+
+
+class LoadedCatalog(NamedTuple):
+    """The current catalog and where it came from, published as one unit"""
+    snapshot: Union[CatalogSnapshot, MappedCatalog]
+    path: Optional[Path]                # Export it was loaded from (None for a mapped catalog file)
+    report: Optional[LoadReport]        # Rows read and skipped (None for a mapped catalog file)
+
+
+def _load_catalog_history(snapshot) -> CatalogHistory:
+    # Built through _derived_index so a reload() also picks up newly added exports
+    directory = BanglerConfig.CATALOG.get('history_dir') or SizingStockLookup.data_dir()
+    return CatalogHistory.from_directory(directory)
 
 
 class SizingStockLookup:
-    """Loads and searches sizing stock products from CSV export"""
+    """
+    Loads and searches sizing stock products from CSV export
+
+    Thread-safe process-wide singleton: the catalog is parsed once under a lock
+    into an immutable CatalogSnapshot, and every read goes through that snapshot
+    without locking. reload() builds a new snapshot and swaps it in atomically.
+
+    When CATALOG['binary_path'] points at a prebuilt catalog file, that file is
+    memory-mapped and queried in place instead of parsing the CSV. A JSON
+    inventory (Stuller API dump) can be used instead of a CSV export by passing
+    its path or setting CATALOG['source_path'].
+    """
 
     _instance = None
-    _initialized = False
+    _instance_lock = threading.Lock()
 
     def __new__(cls, csv_path: str = None):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._instance_lock:
+                if cls._instance is None:
+                    instance = super().__new__(cls)
+                    instance._reload_lock = threading.Lock()
+                    instance._index_lock = threading.Lock()
+                    instance._derived = {}
+                    instance._load(csv_path)
+                    cls._instance = instance
         return cls._instance
 
     def __init__(self, csv_path: str = None):
-        # Only initialize once (singleton pattern)
-        if self._initialized:
+        # All loading happens once in __new__ (singleton pattern)
+        pass
+
+    def _load(self, csv_path: Optional[str]) -> None:
+        binary_path = BanglerConfig.CATALOG.get('binary_path')
+        if not csv_path and binary_path and Path(binary_path).exists():
+            snapshot = MappedCatalog(binary_path)
+            print(f"✅ Mapped {len(snapshot)} sizing stock products from {Path(binary_path).name}")
+            self._loaded = LoadedCatalog(snapshot, None, None)
             return
 
-        if csv_path:
-            self.csv_path = Path(csv_path)
-        else:
-            # Auto-detect the most recent sizing stock CSV in data directory
-            self.csv_path = self._find_latest_csv()
-
-        self.products = []
-        self._elements_cache = {}  # Cache for parsed DescriptiveElements
-        self._load_csv()
-        self._initialized = True
-
-    def _find_latest_csv(self) -> Path:
+        csv_path = csv_path or BanglerConfig.CATALOG.get('source_path')
+        # Auto-detect the most recent sizing stock CSV in data directory if none is configured
+        path = Path(csv_path) if csv_path else self.find_latest_csv()
+        snapshot, report = self._load_csv(path)
+        # One assignment publishes path, report and snapshot together
+        self._loaded = LoadedCatalog(snapshot, path, report)
+
+    def reload(self, csv_path: str = None) -> None:
+        """Re-read the catalog and atomically publish the new snapshot"""
+        with self._reload_lock:
+            self._load(csv_path)
+
+    @property
+    def snapshot(self) -> Union[CatalogSnapshot, MappedCatalog]:
+        """Current immutable catalog (in-memory snapshot or mapped catalog file)"""
+        return self._loaded.snapshot
+
+    @property
+    def csv_path(self) -> Optional[Path]:
+        """Export the current snapshot was loaded from (None for a mapped catalog file)"""
+        return self._loaded.path
+
+    @property
+    def load_report(self) -> Optional[LoadReport]:
+        """Rows read and skipped when the current snapshot was loaded (None for a mapped catalog file)"""
+        return self._loaded.report
+
+    def _derived_index(self, build):
+        """Index built from the current snapshot on first use and rebuilt after reload()"""
+        snapshot, index = self._derived.get(build, (None, None))
+        if snapshot is not self._loaded.snapshot:
+            with self._index_lock:
+                snapshot, index = self._derived.get(build, (None, None))
+                if snapshot is not self._loaded.snapshot:
+                    snapshot = self._loaded.snapshot
+                    index = build(snapshot)
+                    self._derived[build] = (snapshot, index)
+        return index
+
+    def get_dimension_index(self) -> DimensionIndex:
+        """Nearest-dimension index for the current snapshot (built on first use)"""
+        return self._derived_index(DimensionIndex)
+
+    def get_orderable_combinations(self) -> OrderableCombinations:
+        """Set of orderable (shape, quality, width, thickness) for the current snapshot"""
+        return self._derived_index(OrderableCombinations)
+
+    def get_options_payloads(self) -> OptionsPayloads:
+        """Pre-serialized option trees for the current snapshot (built on first use)"""
+        return self._derived_index(OptionsPayloads)
+
+    def get_search_index(self) -> SearchIndex:
+        """SKU and description typeahead index for the current snapshot (built on first use)"""
+        return self._derived_index(SearchIndex)
+
+    @property
+    def products(self) -> tuple:
+        """Loaded sizing stock records"""
+        return self._loaded.snapshot.records
+
+    @staticmethod
+    def data_dir() -> Path:
+        """Bundled data directory holding the dated sizing stock exports"""
+        return Path(__file__).parent.parent / "data"
+
+    @staticmethod
+    def find_latest_csv() -> Path:
         """Find the most recent sizing stock CSV file based on date in filename"""
-        data_dir = Path(__file__).parent.parent / "data"
-
-        # Look for files matching pattern: sizingstock-YYYYMMDD.csv
-        pattern = re.compile(r'sizingstock-(\d{8})\.csv')
-        latest_date = None
-        latest_file = None
-
-        for csv_file in data_dir.glob("sizingstock-*.csv"):
-            match = pattern.match(csv_file.name)
-            if match:
-                date_str = match.group(1)
-                if latest_date is None or date_str > latest_date:
-                    latest_date = date_str
-                    latest_file = csv_file
-
-        if latest_file is None:
+        data_dir = SizingStockLookup.data_dir()
+        exports = dated_exports(data_dir)
+        if not exports:
             raise FileNotFoundError(f"No sizing stock CSV files found in {data_dir}")
 
-        # Format date as YYYY-MM-DD
-        formatted_date = f"{latest_date[:4]}-{latest_date[4:6]}-{latest_date[6:8]}"
-        print(f"📅 Using sizing stock CSV: {latest_file.name} (date: {formatted_date})")
+        latest_date, latest_file = exports[-1]
+        print(f"📅 Using sizing stock CSV: {latest_file.name} (date: {latest_date.isoformat()})")
         return latest_file
 
-    def _load_csv(self) -> None:
-        """Load sizing stock products from CSV file"""
-        if not self.csv_path.exists():
-            raise FileNotFoundError(f"Sizing stock CSV not found: {self.csv_path}")
+    @staticmethod
+    def _load_csv(path: Path) -> Tuple[CatalogSnapshot, LoadReport]:
+        """Stream sizing stock products from the CSV export (or JSON inventory) into an immutable snapshot"""
+        if not path.exists():
+            raise FileNotFoundError(f"Sizing stock CSV not found: {path}")
 
-        with open(self.csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            self.products = list(reader)
+        snapshot, report = load_catalog(path)
 
         # Memory usage logging
-        memory_mb = sys.getsizeof(self.products) / 1024 / 1024
-        print(f"✅ Loaded {len(self.products)} sizing stock products from CSV")
+        memory_mb = sys.getsizeof(snapshot.records) / 1024 / 1024
+        source_kind = "JSON inventory" if catalog_format(path) == "json" else "CSV"
+        print(f"✅ Loaded {len(snapshot)} sizing stock products from {source_kind}")
         print(f"📊 Memory usage: {memory_mb:.1f}MB (products list)")
+        if report.rows_skipped:
+            print(f"⚠️  Skipped unpriceable rows: {report.summary()}")
+            logger.warning(f"{path.name}: {report.summary()}")
 
-        # Initialize cache and display actual memory usage
-        cache_mb = sys.getsizeof(self._elements_cache) / 1024 / 1024
-        print(f"📊 Cache initialized: {cache_mb:.3f}MB")
+        return snapshot, report
 
-    def find_sku(self, shape: str, quality: str, width: str, thickness: str = None, length: str = None) -> Optional[str]:
+    def find_sku(self, shape: str, quality: str, width: str, thickness: str = None, length: str = None,
+                 as_of: Optional[AsOf] = None) -> Optional[str]:
         """
         Find sizing stock SKU based on customer specifications
 
@@ -90,144 +183,59 @@ class SizingStockLookup:
             width: Width specification (e.g., "6.5 Mm")
             thickness: Thickness specification (optional)
             length: Length specification (optional, defaults to "Bulk")
+            as_of: Look the SKU up in the dated export in effect on this date instead of the live catalog
 
         Returns:
             SKU string if found, or None if not found
+
+        Raises:
+            ValueError: If as_of is before the earliest dated export
         """
-        for product in self.products:
-            # Check descriptive elements for match (with caching)
-            product_id = product.get("Id", "")
-            if product_id in self._elements_cache:
-                elements = self._elements_cache[product_id]
-            else:
-                elements = self._extract_descriptive_elements(product)
-                if product_id:  # Only cache if we have a valid ID
-                    self._elements_cache[product_id] = elements
-
-            if (elements.get("Metal Shape", "").strip().lower() == shape.lower() and
-                elements.get("Quality", "").strip().lower() == quality.lower() and
-                elements.get("Width", "").strip().lower() == width.lower()):
-
-                # Optional thickness check
-                if thickness and elements.get("Thickness", "").strip().lower() != thickness.lower():
-                    continue
-
-                # Optional length check (default to Bulk if not specified)
-                target_length = length or "Bulk"
-                if elements.get("Length", "").strip().lower() != target_length.lower():
-                    continue
-
-                return product.get("Sku")
-
-        return None
-
-    def _extract_descriptive_elements(self, product: Dict[str, Any]) -> Dict[str, str]:
-        """Extract descriptive elements from CSV product row"""
-        elements = {}
-
-        # CSV has paired columns: DescriptiveElementNameN, DescriptiveElementValueN
-        for i in range(1, 7):  # Assuming up to 6 descriptive elements
-            name_key = f"DescriptiveElementName{i}"
-            value_key = f"DescriptiveElementValue{i}"
-
-            if name_key in product and value_key in product:
-                name = product[name_key]
-                value = product[value_key]
-                if name and value:
-                    elements[name] = value
-
-        return elements
+        if as_of is not None:
+            return self.get_catalog_history().find_sku(shape, quality, width, thickness, length, as_of)
+        return self._loaded.snapshot.find_sku(shape, quality, width, thickness, length)
+
+    def get_catalog_history(self) -> CatalogHistory:
+        """Every dated export in the history directory (loaded on first use, reloaded with the catalog)"""
+        return self._derived_index(_load_catalog_history)
+
+    def snapshot_as_of(self, as_of: AsOf) -> CatalogSnapshot:
+        """
+        Catalog snapshot of the dated export in effect on a date
+
+        Raises:
+            ValueError: If the date is before the earliest dated export
+        """
+        return self.get_catalog_history().snapshot(as_of)
 
     def get_available_options(self) -> Dict[str, List[str]]:
         """Get all available shapes, qualities, widths, etc. from CSV data"""
-        options = {
-            "shapes": set(),
-            "qualities": set(),
-            "widths": set(),
-            "thicknesses": set(),
-            "lengths": set()
-        }
-
-        for product in self.products:
-            # Use caching for get_available_options too
-            product_id = product.get("Id", "")
-            if product_id in self._elements_cache:
-                elements = self._elements_cache[product_id]
-            else:
-                elements = self._extract_descriptive_elements(product)
-                if product_id:
-                    self._elements_cache[product_id] = elements
-
-            if "Metal Shape" in elements:
-                options["shapes"].add(elements["Metal Shape"])
-            if "Quality" in elements:
-                options["qualities"].add(elements["Quality"])
-            if "Width" in elements:
-                options["widths"].add(elements["Width"])
-            if "Thickness" in elements:
-                options["thicknesses"].add(elements["Thickness"])
-            if "Length" in elements:
-                options["lengths"].add(elements["Length"])
-
-        # Convert sets to sorted lists
-        return {key: sorted(list(values)) for key, values in options.items()}
+        return self._loaded.snapshot.available_options()
 
     def get_nested_options_for_cli(self) -> Dict[str, Dict[str, Dict[str, List[str]]]]:
         """Get options structured for CLI prompts: shape -> quality -> width -> thicknesses"""
-        nested_options = {}
-        
-        for product in self.products:
-            # Use caching for performance
-            product_id = product.get("Id", "")
-            if product_id in self._elements_cache:
-                elements = self._elements_cache[product_id]
-            else:
-                elements = self._extract_descriptive_elements(product)
-                if product_id:
-                    self._elements_cache[product_id] = elements
-            
-            # Extract the key elements we need
-            shape = elements.get("Metal Shape")
-            quality = elements.get("Quality") 
-            width = elements.get("Width")
-            thickness = elements.get("Thickness")
-            
-            # Skip if any required element is missing
-            if not all([shape, quality, width, thickness]):
-                continue
-                
-            # Build nested structure
-            if shape not in nested_options:
-                nested_options[shape] = {}
-            
-            if quality not in nested_options[shape]:
-                nested_options[shape][quality] = {}
-                
-            if width not in nested_options[shape][quality]:
-                nested_options[shape][quality][width] = []
-                
-            # Add thickness if not already present
-            if thickness not in nested_options[shape][quality][width]:
-                nested_options[shape][quality][width].append(thickness)
-        
-        # Sort all lists for consistent ordering
-        for shape in nested_options:
-            for quality in nested_options[shape]:
-                for width in nested_options[shape][quality]:
-                    nested_options[shape][quality][width].sort(
-                        key=lambda x: float(x.replace(' Mm', ''))
-                    )
-        
-        return nested_options
+        return self._loaded.snapshot.nested_options()
 
     def get_cache_stats(self) -> Dict[str, Any]:
-        """Get performance statistics about the cache"""
-        cache_size = len(self._elements_cache)
-        cache_memory_mb = sys.getsizeof(self._elements_cache) / 1024 / 1024
+        """
+        Figures for the loaded catalog and the indexes built from it
 
+        Returns:
+            Catalog kind and source, product count, SKU lookup keys (in-memory
+            snapshots only), rows read/skipped by the last CSV load, and the
+            derived indexes currently built for this snapshot
+        """
+        snapshot, _, report = self._loaded
+        sku_index = getattr(snapshot, "_sku_index", None)
         return {
-            "cached_products": cache_size,
-            "total_products": len(self.products),
-            "cache_hit_ratio": f"{cache_size}/{len(self.products)}" if self.products else "0/0",
-            "cache_memory_mb": round(cache_memory_mb, 3)
-        }
\ No newline at end of file
+            "catalog": type(snapshot).__name__,
+            "source": snapshot.source,
+            "products": len(snapshot),
+            "sku_index_keys": len(sku_index) if sku_index is not None else None,
+            "rows_read": report.rows_read if report is not None else None,
+            "rows_skipped": report.rows_skipped if report is not None else None,
+            "derived_indexes": sorted(
+                getattr(build, "__name__", str(build))
+                for build, (built_from, _) in self._derived.items() if built_from is snapshot
+            )
+        }
@@ -0,0 +1,47 @@
+"""
+Pre-serialized Option Trees
+The shape -> quality -> width -> thickness tree (and each shape's subtree)
+encoded once per catalog snapshot as JSON, gzip and content-hash ETags
+"""
+
+import gzip
+import hashlib
+import json
+from typing import Any, Dict, NamedTuple, Optional
+
+
+class JsonPayload(NamedTuple):
+    """A JSON document ready to send, plain and gzip-compressed"""
+    body: bytes
+    gzip_body: bytes
+    etag: str                   # Quoted content hash, e.g. '"3f2a..."'
+    gzip_etag: str              # Tag of the gzip body, e.g. '"3f2a...-gz"'
+
+
+def make_payload(value: Any) -> JsonPayload:
+    """
+    Encode a value once for repeated serving
+
+    The ETag hashes the JSON itself, so an identical tree keeps its ETag
+    across catalog reloads and versions. The gzip body is a different
+    representation with its own tag; gzip uses mtime=0 so its bytes are
+    reproducible too.
+    """
+    body = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return JsonPayload(body, gzip.compress(body, compresslevel=9, mtime=0), f'"{digest}"', f'"{digest}-gz"')
+
+
+class OptionsPayloads:
+    """Option tree payloads for one catalog snapshot (built by SizingStockLookup on first use)"""
+
+    def __init__(self, snapshot):
+        tree = snapshot.nested_options()
+        self.tree = make_payload(tree)
+        self._shapes: Dict[str, JsonPayload] = {
+            shape.lower(): make_payload(subtree) for shape, subtree in tree.items()
+        }
+
+    def for_shape(self, shape: str) -> Optional[JsonPayload]:
+        """Subtree payload for a shape (case-insensitive), or None if it isn't stocked"""
+        return self._shapes.get(shape.strip().lower())
@@ -0,0 +1,223 @@
+"""
+SKU Price Cache
+Short-lived cache of Stuller product records keyed by SKU, with pluggable
+backends so processes on one host (or, later, many hosts) can share prices
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..config.settings import BanglerConfig
+
+logger = logging.getLogger(__name__)
+
+
+class PriceCacheBackend(ABC):
+    """
+    Storage interface for cached product records
+
+    Implementations must make set()/set_many() atomic per entry and treat
+    expired entries as absent. A networked cache only needs these methods.
+    """
+
+    @abstractmethod
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        """Cached product record, or None if missing or expired"""
+
+    @abstractmethod
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], ttl_s: float) -> None:
+        """Store (sku, product) records that expire after ttl_s seconds"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Drop every entry"""
+
+    def get_many(self, skus: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Cached records for several SKUs (missing or expired ones are absent)"""
+        found = {}
+        for sku in skus:
+            product = self.get(sku)
+            if product is not None:
+                found[sku] = product
+        return found
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryPriceCache(PriceCacheBackend):
+    """Per-process dict backend"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(sku)
+        if entry is None:
+            return None
+        expires_at, product = entry
+        if expires_at <= time.time():
+            with self._lock:
+                if self._entries.get(sku) is entry:
+                    del self._entries[sku]
+            return None
+        return product
+
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], ttl_s: float) -> None:
+        expires_at = time.time() + ttl_s
+        with self._lock:
+            for sku, product in items:
+                self._entries[sku] = (expires_at, product)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLitePriceCache(PriceCacheBackend):
+    """
+    Host-local backend shared by every process using the same file
+
+    Each write is a single upsert in its own transaction and the database runs
+    in WAL mode, so readers in other processes never see a partial entry.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS price_cache ("
+                " sku TEXT PRIMARY KEY,"
+                " product TEXT NOT NULL,"
+                " expires_at REAL NOT NULL)"
+            )
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        return self.get_many([sku]).get(sku)
+
+    def get_many(self, skus: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        skus = list(dict.fromkeys(skus))
+        if not skus:
+            return {}
+        found = {}
+        now = time.time()
+        try:
+            with self._lock:
+                # Stay well under SQLite's bound-parameter limit
+                for start in range(0, len(skus), 500):
+                    chunk = skus[start:start + 500]
+                    rows = self._conn.execute(
+                        f"SELECT sku, product FROM price_cache WHERE expires_at > ? "
+                        f"AND sku IN ({','.join('?' * len(chunk))})",
+                        [now] + chunk
+                    ).fetchall()
+                    found.update((sku, json.loads(product)) for sku, product in rows)
+        except sqlite3.Error as e:
+            logger.warning(f"Price cache read failed ({self.path}): {e}")
+        return found
+
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], ttl_s: float) -> None:
+        expires_at = time.time() + ttl_s
+        rows = [(sku, json.dumps(product, default=str), expires_at) for sku, product in items]
+        if not rows:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO price_cache (sku, product, expires_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(sku) DO UPDATE SET product = excluded.product, expires_at = excluded.expires_at",
+                    rows
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Price cache write failed ({self.path}): {e}")
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM price_cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PriceCache:
+    """
+    TTL cache front end with hit/miss accounting
+
+    Wraps a PriceCacheBackend; the engine talks only to this class, so
+    backends stay minimal.
+    """
+
+    def __init__(self, backend: PriceCacheBackend, ttl_s: float = 300.0):
+        self.backend = backend
+        self.ttl_s = ttl_s
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _count(self, hits: int, misses: int) -> None:
+        with self._stats_lock:
+            self.hits += hits
+            self.misses += misses
+
+    def get(self, sku: str) -> Optional[Dict[str, Any]]:
+        product = self.backend.get(sku)
+        self._count(product is not None, product is None)
+        return product
+
+    def get_many(self, skus: List[str]) -> Dict[str, Dict[str, Any]]:
+        found = self.backend.get_many(skus)
+        self._count(len(found), len(set(skus)) - len(found))
+        return found
+
+    def set(self, sku: str, product: Dict[str, Any]) -> None:
+        self.backend.set_many([(sku, product)], self.ttl_s)
+
+    def set_many(self, items: Iterable[Tuple[str, Dict[str, Any]]]) -> None:
+        self.backend.set_many(items, self.ttl_s)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit/miss counts and hit rate for this process"""
+        with self._stats_lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            'backend': type(self.backend).__name__,
+            'ttl_s': self.ttl_s,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 3) if lookups else None
+        }
+
+
+def create_price_cache() -> Optional[PriceCache]:
+    """Price cache configured by BanglerConfig.PRICE_CACHE, or None if disabled"""
+    config = BanglerConfig.PRICE_CACHE
+    backend_name = (config.get('backend') or 'none').lower()
+
+    if backend_name == 'memory':
+        backend = MemoryPriceCache()
+    elif backend_name == 'sqlite':
+        try:
+            backend = SQLitePriceCache(config['path'])
+        except Exception as e:
+            logger.warning(f"SQLite price cache unavailable at {config['path']}: {e}; using in-memory cache")
+            backend = MemoryPriceCache()
+    elif backend_name == 'none':
+        return None
+    else:
+        logger.warning(f"Unknown price cache backend '{backend_name}'; price caching disabled")
+        return None
+
+    return PriceCache(backend, ttl_s=config['ttl_s'])
@@ -0,0 +1,417 @@
+"""
+Parallel Price Matrix
+Whole-catalog what-if analysis: every SKU x every size x several material
+calculation settings, sharded across a process pool
+"""
+
+import csv
+import io
+import logging
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, TextIO, Tuple, Union
+
+from ..config.settings import BanglerConfig
+from ..models.bangle import BangleSpec
+from ..utils import fixed_point
+from ..utils.material_calculation import MaterialCalculator
+from ..utils.material_density import MaterialDensity
+from ..utils.serialization import RecordSerializer
+from ..utils.size_conversion import SizeConverter
+from .catalog import DEFAULT_LENGTH, CatalogSnapshot, SizingStockRecord, parse_mm
+from .catalog_file import MappedCatalog
+from .catalog_loader import load_catalog
+
+logger = logging.getLogger(__name__)
+
+
+class MatrixSetting(NamedTuple):
+    """One material calculation variant to evaluate"""
+    k_factor: float
+    seam_allowance_in: float
+
+
+class PriceMatrixRow(NamedTuple):
+    """One SKU priced at one size under one material calculation setting"""
+    sku: str
+    shape: str
+    quality: str
+    width: str
+    thickness: str
+    size: int
+    k_factor: float
+    seam_allowance_in: float
+    material_length_in: float
+    material_weight_dwt: float
+    material_cost_per_dwt: Optional[Decimal]   # None when no price was supplied
+    material_total_cost: Optional[Decimal]
+    total_price: Optional[Decimal]
+
+
+MATRIX_COLUMNS = PriceMatrixRow._fields
+MATRIX_SERIALIZER = RecordSerializer(MATRIX_COLUMNS, positional=True)
+
+
+def default_settings() -> List[MatrixSetting]:
+    """The configured MATERIAL_CALC values as a single matrix setting"""
+    config = BanglerConfig.get_material_calc_config()
+    return [MatrixSetting(config['k_factor'], config['seam_allowance_in'])]
+
+
+def is_matrix_record(record: SizingStockRecord) -> bool:
+    """Bulk-length records with every dimension the pricing formula needs"""
+    return bool(
+        record.sku and record.shape and record.quality and record.width and record.thickness
+        and record.length.lower() == DEFAULT_LENGTH.lower()
+    )
+
+
+def _calculators(settings: Sequence[MatrixSetting]) -> List[Tuple[MatrixSetting, MaterialCalculator]]:
+    base_config = BanglerConfig.get_material_calc_config()
+    return [
+        (setting, MaterialCalculator({
+            **base_config,
+            'k_factor': setting.k_factor,
+            'seam_allowance_in': setting.seam_allowance_in
+        }))
+        for setting in settings
+    ]
+
+
+def _record_geometry(records: Iterable[SizingStockRecord]) -> Iterator[Tuple[SizingStockRecord, float, float]]:
+    """(record, thickness_mm, dwt_per_in) for every record whose quality has a known density"""
+    material_density = MaterialDensity()
+    densities = {}
+
+    for record in records:
+        try:
+            width_mm = parse_mm(record.width)
+            thickness_mm = parse_mm(record.thickness)
+            if record.quality not in densities:
+                spec = BangleSpec.from_quality_string(0, record.shape, record.quality, record.width, record.thickness)
+                densities[record.quality] = material_density.get_density_for_quality(
+                    spec.metal_quality or spec.metal_color, spec.metal_color
+                )
+        except ValueError as e:
+            logger.warning(f"Skipping {record.sku} in price matrix: {e}")
+            densities.setdefault(record.quality, None)
+            continue
+
+        density = densities[record.quality]
+        if density is None:
+            continue
+        yield record, thickness_mm, material_density.dwt_per_inch(width_mm, thickness_mm, density)
+
+
+def compute_rows(records: Iterable[SizingStockRecord], sizes: Sequence[int],
+                 settings: Sequence[MatrixSetting], prices: Dict[str, Any],
+                 base_price: Decimal) -> Iterator[PriceMatrixRow]:
+    """
+    Compute matrix rows for a batch of records
+
+    Uses the same arithmetic as PricingEngine (MaterialCalculator for length,
+    MaterialDensity for weight, Decimal(str(...)) for money), with densities
+    and circumferences hoisted out of the inner loops.
+    """
+    size_converter = SizeConverter()
+    calculators = _calculators(settings)
+    circumferences = [(size, size_converter.size_to_circumference_mm(size)) for size in sizes]
+
+    for record, thickness_mm, dwt_per_in in _record_geometry(records):
+        price_value = prices.get(record.sku)
+        cost_per_dwt = Decimal(str(price_value)) if price_value is not None else None
+
+        for size, circumference_mm in circumferences:
+            for setting, calculator in calculators:
+                length_in = calculator.calculate_material_length(circumference_mm, thickness_mm).rounded_length_in
+                weight_dwt = dwt_per_in * length_in
+
+                material_total_cost = None
+                total_price = None
+                if cost_per_dwt is not None:
+                    material_total_cost = cost_per_dwt * Decimal(str(weight_dwt))
+                    total_price = material_total_cost + base_price
+
+                yield PriceMatrixRow(
+                    record.sku, record.shape, record.quality, record.width, record.thickness,
+                    size, setting.k_factor, setting.seam_allowance_in,
+                    length_in, weight_dwt, cost_per_dwt, material_total_cost, total_price
+                )
+
+
+def compute_fixed_point_rows(records: Iterable[SizingStockRecord], sizes: Sequence[int],
+                             settings: Sequence[MatrixSetting], prices: Dict[str, Any],
+                             base_price: Decimal) -> Iterator[tuple]:
+    """
+    Matrix rows with money in integer cents instead of Decimal
+
+    Same columns as compute_rows, but material_total_cost and total_price are
+    strings rounded to cents exactly as f"{Decimal:.2f}" rounds them: float
+    arithmetic decides the cents unless the amount is within a guard band of
+    a half-cent tie, where exact integer arithmetic takes over. Material
+    lengths are rounded up to a 0.25 inch increment, so many sizes share a
+    length; money is computed once per (record, length).
+    """
+    size_converter = SizeConverter()
+    calculators = _calculators(settings)
+    circumferences = [(size, size_converter.size_to_circumference_mm(size)) for size in sizes]
+    base_parts = fixed_point.decimal_parts(base_price)
+    base_cents = float(base_price) * 100
+
+    for record, thickness_mm, dwt_per_in in _record_geometry(records):
+        price_value = prices.get(record.sku)
+        price_per_dwt = float(price_value) if price_value is not None else None
+        cost_per_dwt = str(Decimal(str(price_value))) if price_value is not None else None
+        money_by_length: Dict[float, Tuple[Optional[str], Optional[str]]] = {}
+
+        for size, circumference_mm in circumferences:
+            for setting, calculator in calculators:
+                length_in = calculator.calculate_material_length(circumference_mm, thickness_mm).rounded_length_in
+                weight_dwt = dwt_per_in * length_in
+
+                money = money_by_length.get(length_in)
+                if money is None:
+                    money = (None, None)
+                    if price_per_dwt is not None:
+                        material_cents = price_per_dwt * weight_dwt * 100
+                        material = fixed_point.cents_or_none(material_cents)
+                        total = fixed_point.cents_or_none(material_cents + base_cents)
+                        if material is None or total is None:
+                            exact = fixed_point.multiply(fixed_point.decimal_parts(price_value),
+                                                         fixed_point.decimal_parts(weight_dwt))
+                            material = fixed_point.micros_to_cents(fixed_point.to_micros(exact))
+                            total = fixed_point.micros_to_cents(
+                                fixed_point.to_micros(fixed_point.add(exact, base_parts))
+                            )
+                        money = (fixed_point.format_cents(material), fixed_point.format_cents(total))
+                    money_by_length[length_in] = money
+
+                yield (
+                    record.sku, record.shape, record.quality, record.width, record.thickness,
+                    size, setting.k_factor, setting.seam_allowance_in,
+                    length_in, weight_dwt, cost_per_dwt, money[0], money[1]
+                )
+
+
+# Offsets from a half-cent tie, in multiples of the guard band: inside, at the edge and clear of it
+_TIE_OFFSETS = (0.0, 0.5, -0.5, 0.99, -0.99, 1.01, -1.01, 4.0, -4.0)
+
+
+def synthetic_prices(records: Iterable[SizingStockRecord], sizes: Optional[Sequence[int]] = None,
+                     settings: Optional[Sequence[MatrixSetting]] = None) -> Dict[str, float]:
+    """
+    Deterministic per-DWT prices for checking the money arithmetic offline
+
+    Each price is derived from the SKU's CRC32, so every run is identical.
+    A quarter of the SKUs get a round two-decimal price and a quarter a price
+    with a full-length float repr. The other half are priced so the material
+    cost of their first matrix row (first size, first setting) lands on, just
+    inside or just outside the fixed-point guard band around a half cent.
+    """
+    size_converter = SizeConverter()
+    sizes = list(sizes) if sizes else size_converter.get_valid_sizes()
+    _, calculator = _calculators(settings or default_settings())[0]
+    circumference_mm = size_converter.size_to_circumference_mm(sizes[0])
+
+    prices: Dict[str, float] = {}
+    for record, thickness_mm, dwt_per_in in _record_geometry(records):
+        if record.sku in prices:
+            continue
+        digest = zlib.crc32(record.sku.encode("utf-8"))
+        kind, digest = digest % 4, digest >> 2
+        if kind == 0:
+            prices[record.sku] = 20 + digest % 20000 / 100
+        elif kind == 1:
+            prices[record.sku] = 20 + digest % 10_000_000 / 7919
+        else:
+            weight_dwt = dwt_per_in * calculator.calculate_material_length(
+                circumference_mm, thickness_mm).rounded_length_in
+            if weight_dwt <= 0:
+                continue
+            offset = _TIE_OFFSETS[digest % len(_TIE_OFFSETS)] * fixed_point.TIE_GUARD_CENTS
+            material_cents = 2000 + (digest >> 4) % 100_000 + 0.5 + offset
+            prices[record.sku] = material_cents / 100 / weight_dwt
+    return prices
+
+
+# Per-worker state, populated once by _init_worker so shard tasks carry only bounds
+_worker_state: Dict[str, Any] = {}
+
+
+CatalogSource = Tuple[str, str]         # ('mapped' or 'export', path)
+
+
+def catalog_source(catalog: Union[CatalogSnapshot, MappedCatalog]) -> Optional[CatalogSource]:
+    """File a worker process can load the catalog from, or None for a catalog built in memory"""
+    if isinstance(catalog, MappedCatalog):
+        return ("mapped", str(catalog.path))
+    source = getattr(catalog, "source", "")
+    return ("export", source) if source and os.path.isfile(source) else None
+
+
+def matrix_records(catalog: Iterable[SizingStockRecord]) -> Tuple[SizingStockRecord, ...]:
+    return tuple(record for record in catalog if is_matrix_record(record))
+
+
+def _load_matrix_records(source: CatalogSource, expected: int) -> Tuple[SizingStockRecord, ...]:
+    """Matrix records loaded by a worker from the parent's catalog file"""
+    kind, path = source
+    catalog = MappedCatalog(path) if kind == "mapped" else load_catalog(Path(path))[0]
+    records = matrix_records(catalog)
+    if len(records) != expected:
+        raise RuntimeError(f"{path} changed while the price matrix was running "
+                           f"({len(records)} matrix records, expected {expected})")
+    return records
+
+
+def _init_worker(catalog: Union[CatalogSource, Tuple[SizingStockRecord, ...]], record_count: int,
+                 sizes: Sequence[int], settings: Sequence[MatrixSetting], prices: Dict[str, Any],
+                 base_price: Decimal, use_fixed_point: bool = False) -> None:
+    # A catalog file is loaded (or re-mapped) here rather than pickled over from the parent
+    if catalog and isinstance(catalog[0], str):
+        records = _load_matrix_records(catalog, record_count)
+    else:
+        records = catalog
+    _worker_state.update(records=records, sizes=sizes, settings=settings, prices=prices, base_price=base_price,
+                         use_fixed_point=use_fixed_point)
+
+
+def _compute_shard(bounds: Tuple[int, int]) -> List[PriceMatrixRow]:
+    start, end = bounds
+    state = _worker_state
+    return list(compute_rows(
+        state['records'][start:end], state['sizes'], state['settings'], state['prices'], state['base_price']
+    ))
+
+
+def _shard_rows(bounds: Tuple[int, int]) -> Iterator[tuple]:
+    state = _worker_state
+    if not state['use_fixed_point']:
+        return iter(_compute_shard(bounds))
+    start, end = bounds
+    return compute_fixed_point_rows(
+        state['records'][start:end], state['sizes'], state['settings'], state['prices'], state['base_price']
+    )
+
+
+def _render_shard(output_format: str, bounds: Tuple[int, int]) -> str:
+    # Render in the worker: one string per shard is far cheaper to send
+    # back than thousands of pickled rows
+    buffer = io.StringIO()
+    if output_format == "jsonl":
+        MATRIX_SERIALIZER.write_jsonl(_shard_rows(bounds), buffer)
+    else:
+        MATRIX_SERIALIZER.write_csv(_shard_rows(bounds), buffer, header=False)
+    return buffer.getvalue()
+
+
+class PriceMatrix:
+    """
+    Computes a price matrix over the whole catalog, optionally in parallel
+
+    Each worker loads the catalog itself from the parent's file (a mapped
+    catalog file is just re-mapped) when the pool starts; only a catalog
+    built in memory is shipped to workers, once, as the pool initializer's
+    arguments. Tasks are just (start, end) record ranges, so per-task IPC
+    stays tiny. Rows are
+    yielded in catalog order as shards complete, so output streams.
+    """
+
+    def __init__(self, catalog: Union[CatalogSnapshot, MappedCatalog], sizes: Optional[Sequence[int]] = None,
+                 settings: Optional[Sequence[MatrixSetting]] = None, prices: Optional[Dict[str, Any]] = None,
+                 base_price: Optional[Decimal] = None, workers: Optional[int] = None, shard_size: int = 64,
+                 use_fixed_point: bool = False):
+        self.records = matrix_records(catalog)
+        self.catalog_source = catalog_source(catalog)
+        self.sizes = list(sizes) if sizes else SizeConverter().get_valid_sizes()
+        self.settings = list(settings) if settings else default_settings()
+        self.prices = dict(prices or {})
+        self.base_price = base_price if base_price is not None else BanglerConfig.get_pricing_config()['base_price']
+        self.workers = workers or os.cpu_count() or 1
+        self.shard_size = shard_size
+        self.use_fixed_point = use_fixed_point
+
+    @property
+    def row_count(self) -> int:
+        """Number of rows the matrix will produce (before density failures)"""
+        return len(self.records) * len(self.sizes) * len(self.settings)
+
+    def _shards(self) -> List[Tuple[int, int]]:
+        return [
+            (start, min(start + self.shard_size, len(self.records)))
+            for start in range(0, len(self.records), self.shard_size)
+        ]
+
+    def _map_shards(self, task) -> Iterator[Any]:
+        """Run a shard task over the pool, yielding results in catalog order"""
+        shards = self._shards()
+        logger.info(f"Computing price matrix: {self.row_count} rows in {len(shards)} shards on {self.workers} workers")
+
+        with ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.catalog_source or self.records, len(self.records), self.sizes, self.settings, self.prices, self.base_price, self.use_fixed_point)
+        ) as pool:
+            yield from pool.map(task, shards)
+
+    def iter_rows(self) -> Iterator[PriceMatrixRow]:
+        """Yield matrix rows in catalog order"""
+        if self.workers <= 1:
+            yield from compute_rows(self.records, self.sizes, self.settings, self.prices, self.base_price)
+            return
+
+        for rows in self._map_shards(_compute_shard):
+            yield from rows
+
+    def write_csv(self, output: TextIO) -> int:
+        """Stream the matrix to a CSV file object, returning the row count"""
+        return self.write(output, "csv")
+
+    def write_jsonl(self, output: TextIO) -> int:
+        """Stream the matrix as JSON Lines (one object per row), returning the row count"""
+        return self.write(output, "jsonl")
+
+    def write(self, output: TextIO, output_format: str = "csv") -> int:
+        """Stream the matrix as 'csv' or 'jsonl', returning the row count"""
+        if output_format == "csv":
+            csv.writer(output).writerow(MATRIX_COLUMNS)
+
+        if self.workers <= 1:
+            if self.use_fixed_point:
+                rows = compute_fixed_point_rows(self.records, self.sizes, self.settings, self.prices, self.base_price)
+            else:
+                rows = self.iter_rows()
+            if output_format == "jsonl":
+                return MATRIX_SERIALIZER.write_jsonl(rows, output)
+            return MATRIX_SERIALIZER.write_csv(rows, output, header=False)
+
+        # Workers render their shard to text; the parent only concatenates
+        count = 0
+        for chunk in self._map_shards(partial(_render_shard, output_format)):
+            output.write(chunk)
+            count += chunk.count("\n")
+        return count
+
+    def verify_fixed_point(self) -> Tuple[int, List[str]]:
+        """
+        Check the fixed-point money against the Decimal path for every priced row
+
+        Returns:
+            (rows compared, descriptions of rows whose cents differ)
+        """
+        decimal_rows = compute_rows(self.records, self.sizes, self.settings, self.prices, self.base_price)
+        fixed_rows = compute_fixed_point_rows(self.records, self.sizes, self.settings, self.prices, self.base_price)
+        compared = 0
+        mismatches = []
+        for row, fixed_row in zip(decimal_rows, fixed_rows):
+            if row.total_price is None:
+                continue
+            compared += 1
+            expected = (f"{row.material_total_cost:.2f}", f"{row.total_price:.2f}")
+            if expected != fixed_row[-2:]:
+                mismatches.append(f"{row.sku} size {row.size}: Decimal {expected} vs fixed point {fixed_row[-2:]}")
+        return compared, mismatches
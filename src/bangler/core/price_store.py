@@ -0,0 +1,94 @@
+"""
+Last-Known-Price Store
+On-disk SQLite record of every successfully fetched Stuller product price,
+used to quote instantly when the live API is slow or unavailable
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+class StoredPrice(NamedTuple):
+    """A product record as last fetched from Stuller"""
+    sku: str
+    product: Dict[str, Any]
+    fetched_at: float           # Unix timestamp
+
+    @property
+    def age_seconds(self) -> float:
+        return max(time.time() - self.fetched_at, 0.0)
+
+
+class PriceStore:
+    """
+    SQLite table of sku -> (product JSON, fetched_at)
+
+    One connection is shared by all threads behind a lock; writes are small
+    upserts and the database runs in WAL mode, so several bangler processes
+    can share one store file.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sku_prices ("
+                " sku TEXT PRIMARY KEY,"
+                " product TEXT NOT NULL,"
+                " fetched_at REAL NOT NULL)"
+            )
+
+    def record(self, sku: str, product: Dict[str, Any], fetched_at: Optional[float] = None) -> None:
+        """Save the latest product record for a SKU"""
+        self.record_many([(sku, product)], fetched_at)
+
+    def record_many(self, items: Iterable[Tuple[str, Dict[str, Any]]], fetched_at: Optional[float] = None) -> None:
+        """Save several (sku, product) records with one transaction"""
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        rows = [(sku, json.dumps(product, default=str), fetched_at) for sku, product in items]
+        if not rows:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT INTO sku_prices (sku, product, fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(sku) DO UPDATE SET product = excluded.product, fetched_at = excluded.fetched_at "
+                    "WHERE excluded.fetched_at >= sku_prices.fetched_at",
+                    rows
+                )
+        except sqlite3.Error as e:
+            # The store is a fallback; never fail a live quote because of it
+            logger.warning(f"Could not record prices in {self.path}: {e}")
+
+    def lookup(self, sku: str) -> Optional[StoredPrice]:
+        """Last known product record for a SKU, if any"""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT product, fetched_at FROM sku_prices WHERE sku = ?", (sku,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Could not read price store {self.path}: {e}")
+            return None
+        if row is None:
+            return None
+        return StoredPrice(sku, json.loads(row[0]), row[1])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sku_prices").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
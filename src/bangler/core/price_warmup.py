@@ -0,0 +1,109 @@
+"""
+Price Warm-up
+Prefetches current prices for the most-quoted SKUs in the background at
+startup, so the first quotes of a session come from a fresh price cache
+instead of paying for a cold connection and a live Stuller call
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from ..api.rate_limit import bulk_priority
+from ..config.settings import BanglerConfig
+from .pricing_engine import PricingEngine
+from .quote_ledger import QuoteLedger
+
+logger = logging.getLogger(__name__)
+
+
+def warmup_skus(ledger: Optional[QuoteLedger], count: Optional[int] = None,
+                configured: Optional[List[str]] = None, lookback_days: Optional[float] = None) -> List[str]:
+    """
+    SKUs to prefetch: the configured list, then the most-quoted SKUs in the ledger
+
+    Args:
+        ledger: Quote history to rank SKUs by (None: configured SKUs only)
+        count: Most-quoted SKUs to add (default: BanglerConfig.PRICE_WARMUP['count'])
+        configured: SKUs always included (default: BanglerConfig.PRICE_WARMUP['skus'])
+        lookback_days: Only count quotes this recent (default: BanglerConfig.PRICE_WARMUP['lookback_days'])
+    """
+    config = BanglerConfig.PRICE_WARMUP
+    count = config['count'] if count is None else count
+    lookback_days = config['lookback_days'] if lookback_days is None else lookback_days
+    skus = list(configured if configured is not None else config['skus'])
+
+    if ledger is not None and count > 0:
+        since = time.time() - lookback_days * 86400 if lookback_days > 0 else None
+        try:
+            skus.extend(ledger.top_skus(count, since=since))
+        except Exception as e:
+            logger.warning(f"Could not read quote history for price warm-up: {e}")
+    return list(dict.fromkeys(skus))
+
+
+class PriceWarmup:
+    """
+    Background prefetch of SKU prices into the engine's price cache
+
+    The fetch runs on a daemon thread as bulk work (leaving the Stuller rate
+    limit reserve to interactive quotes) and opens the pooled API connection
+    on the way, so a quote made while it is still running only waits for
+    what is left of it. Failures are logged and otherwise ignored: quotes
+    fall back to live lookups as usual.
+    """
+
+    def __init__(self, engine: PricingEngine, skus: List[str]):
+        self.engine = engine
+        self.skus = skus
+        self.fetched = 0
+        self.elapsed_s: Optional[float] = None
+        self.error: Optional[str] = None
+        self._thread = threading.Thread(target=self._run, name="bangler-price-warmup", daemon=True)
+
+    def start(self) -> "PriceWarmup":
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        started = time.perf_counter()
+        try:
+            with bulk_priority():
+                self.fetched = self.engine.prefetch_prices(self.skus)
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(f"Price warm-up failed: {e}")
+        self.elapsed_s = time.perf_counter() - started
+        logger.info(f"Price warm-up: {self.get_stats()}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the prefetch to finish; True if it has"""
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def done(self) -> bool:
+        return self.elapsed_s is not None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "requested": len(self.skus),
+            "fetched": self.fetched,
+            "elapsed_s": round(self.elapsed_s, 3) if self.elapsed_s is not None else None,
+            "error": self.error
+        }
+
+
+def start_price_warmup(engine: PricingEngine, ledger: Optional[QuoteLedger]) -> Optional[PriceWarmup]:
+    """
+    Start prefetching prices configured by BanglerConfig.PRICE_WARMUP
+
+    The SKU list is read from the ledger before returning, so the ledger may
+    be closed afterwards. Returns None if there is nothing to prefetch.
+    """
+    skus = warmup_skus(ledger)
+    if not skus:
+        return None
+    logger.info(f"Price warm-up: prefetching {len(skus)} SKU(s)")
+    return PriceWarmup(engine, skus).start()
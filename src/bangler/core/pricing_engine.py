@@ -1,20 +1,36 @@
+import asyncio
 import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from dataclasses import replace
 from decimal import Decimal
-from typing import Union, Tuple, Optional
+from typing import AsyncIterator, Dict, Generator, Iterator, List, Sequence, Union, Tuple, Optional
 from ..models.bangle import BangleSpec, MaterialCalculation
-from ..models.pricing import BanglePrice, PricingError
+from ..models.pricing import AlternativeOption, BanglePrice, BudgetOption, PricingError, PricingEvent, PricingParameters
 from ..utils.size_conversion import SizeConverter
 from ..utils.material_calculation import MaterialCalculator
 from ..utils.material_density import MaterialDensity
 from ..utils.formatting import BusinessFormatter
+from ..utils.profiling import propagate
+from ..api.rate_limit import RateLimitTimeout
 from ..api.stuller_client import StullerClient
+from .catalog import SizingStockRecord, parse_mm
 from .discovery import SizingStockLookup
+from .price_cache import create_price_cache
+from .validation import BangleValidator
+from .price_store import PriceStore, StoredPrice
 from ..config.settings import BanglerConfig
 
 logger = logging.getLogger(__name__)
 
 class PricingEngine:
-    """Main pricing workflow orchestration"""
+    """
+    Main pricing workflow orchestration
+
+    One warm engine can be shared by a pool of worker threads: the catalog is
+    an immutable snapshot, the API client synchronizes its own state, and all
+    configuration a quote depends on travels with it as PricingParameters.
+    """
 
     def __init__(self):
         self.size_converter = SizeConverter()
@@ -22,364 +38,671 @@ class PricingEngine:
         self.material_density = MaterialDensity()
         self.sizing_stock = SizingStockLookup()
         self.stuller_client = StullerClient()
-        self.config = BanglerConfig.get_pricing_config()
-
-    def calculate_bangle_price(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None) -> Union[BanglePrice, PricingError]:
+        self.validator = BangleValidator()
+        self.price_store = self._open_price_store()
+        self.price_cache = create_price_cache()
+        # (shape, quality) -> (dimension index it was built from, [(record, DWT per inch)])
+        self._dwt_tables: Dict[Tuple[str, str], tuple] = {}
+        # Live lookups run here so a quote can stop waiting on a slow call
+        self._live_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="bangler-live-price")
+
+    def close(self, wait: bool = True) -> None:
         """
-        Complete end-to-end pricing calculation
+        Shut down the live-lookup pool
 
-        Returns either a BanglePrice with full breakdown or PricingError for user display
+        Args:
+            wait: Wait for live lookups still running (e.g. ones a quote stopped waiting for)
         """
-        try:
-            # Step 1: Convert size to circumference
-            logger.info(f"Converting size {spec.size} to circumference")
-            circumference_mm = self.size_converter.size_to_circumference_mm(spec.size)
+        self._live_pool.shutdown(wait=wait, cancel_futures=True)
 
-            # Step 2: Calculate material length needed
-            logger.info(f"Calculating material length for circumference {circumference_mm}mm, thickness {spec.thickness}")
-            thickness_mm = self.material_calculator.parse_thickness_string(spec.thickness)
-            material_calc = self.material_calculator.calculate_material_length(circumference_mm, thickness_mm)
-
-            # Step 3: Find SKU using existing SizingStockLookup
-            logger.info(f"Finding SKU for spec: {spec.metal_shape}, {spec.to_quality_string()}, {spec.width}, {spec.thickness}")
-            sku = self.sizing_stock.find_sku(
-                shape=spec.metal_shape,
-                quality=spec.to_quality_string(),
-                width=spec.width,
-                thickness=spec.thickness
-            )
-
-            if not sku:
-                logger.warning(f"No SKU found for specification: {spec}")
-                return BusinessFormatter.format_error_for_user(
-                    'sku_not_found',
-                    f"No SKU found for {spec.metal_shape} {spec.to_quality_string()} {spec.width} {spec.thickness}"
-                )
+    def __enter__(self) -> "PricingEngine":
+        return self
 
-            # Step 4: Get real-time pricing from Stuller
-            logger.info(f"Getting real-time price for SKU: {sku}")
-            api_response = self.stuller_client.get_sku_price(sku)
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
 
-            # Check if API call succeeded - FIXED: correct logical check
-            if not api_response or api_response.get('success') != True:
-                logger.error(f"Failed to get price for SKU {sku}: {api_response}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"Failed to get price for SKU {sku}"
-                )
+    @staticmethod
+    def _open_price_store() -> Optional[PriceStore]:
+        path = BanglerConfig.PRICE_STORE.get('path')
+        if not path:
+            return None
+        try:
+            return PriceStore(path)
+        except Exception as e:
+            logger.warning(f"Last-known-price store unavailable at {path}: {e}")
+            return None
 
-            # Extract product data from successful response
-            products = api_response.get('products', [])
-            if not products:
-                logger.error(f"No products returned for SKU {sku}: {api_response}")
-                return BusinessFormatter.format_error_for_user(
-                    'sku_not_found',
-                    f"SKU {sku} not found in Stuller catalog"
-                )
+    def build_parameters(self, custom_base_price: Optional[Decimal] = None, **material_overrides) -> PricingParameters:
+        """
+        Capture the current configuration as immutable per-request parameters
 
-            product = products[0]  # Get first (should be only) product
+        Args:
+            custom_base_price: Base price for this quote (defaults to configured base price)
+            **material_overrides: Overrides for MATERIAL_CALC keys (e.g., k_factor=0.45)
+        """
+        pricing_config = BanglerConfig.get_pricing_config()
+        material_config = BanglerConfig.get_material_calc_config()
+        material_config.update(material_overrides)
+
+        default_base_price = pricing_config['base_price']
+        return PricingParameters(
+            base_price=custom_base_price if custom_base_price is not None else default_base_price,
+            default_base_price=default_base_price,
+            k_factor=material_config['k_factor'],
+            seam_allowance_in=material_config['seam_allowance_in'],
+            mm_per_inch=material_config['mm_per_inch'],
+            round_up_increment=material_config['round_up_increment']
+        )
 
-            # Extract price and weight data from API response
-            price_obj = product.get('Price')
-            weight = product.get('Weight')
-            weight_unit = product.get('WeightUnitOfMeasure')
-            unit_of_sale = product.get('UnitOfSale')
+    def _material_calculator_for(self, params: PricingParameters) -> MaterialCalculator:
+        """Material calculator honouring the request's calculation parameters"""
+        if params.material_calc_config() == self.material_calculator.config:
+            return self.material_calculator
+        return MaterialCalculator(params.material_calc_config())
 
-            if not price_obj:
-                logger.error(f"No price data in product for SKU {sku}: {product}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"No price available for SKU {sku}"
-                )
+    def calculate_bangle_price(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None,
+                               params: Optional[PricingParameters] = None) -> Union[BanglePrice, PricingError]:
+        """
+        Complete end-to-end pricing calculation
 
-            # Handle both old and new price formats
-            if isinstance(price_obj, dict):
-                # New format: {'Value': 87.08678, 'CurrencyCode': 'USD'}
-                price_value = price_obj.get('Value')
-            else:
-                # Old format: '87.086780000000000' or 87.08678
-                price_value = price_obj
+        Returns either a BanglePrice with full breakdown or PricingError for user display
+        """
+        for event in self.iter_pricing_events(spec, custom_base_price, params):
+            pass
+        return event.result
 
-            if price_value is None:
-                logger.error(f"Invalid price format for SKU {sku}: {price_obj}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"Invalid price format for SKU {sku}"
-                )
+    def iter_pricing_events(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None,
+                            params: Optional[PricingParameters] = None) -> Iterator[PricingEvent]:
+        """
+        Run the pricing pipeline, yielding a PricingEvent as each step starts and completes
 
-            # Step 5: Calculate final pricing using weight-based calculation
-            material_cost_per_dwt = Decimal(str(price_value))
+        Events are yielded while the work happens (the live price lookup is
+        bracketed by 'started' and 'completed'), so a display never needs to
+        poll. The final event has stage 'result' and carries the BanglePrice
+        or PricingError.
+        """
+        started_at = time.perf_counter()
 
-            # Calculate material weight needed based on dimensions and length
-            material_weight_dwt = self._calculate_material_weight_dwt(
-                material_calc, spec, weight, weight_unit, unit_of_sale
-            )
+        def event(stage: str, status: str, label: str, detail: Optional[str] = None, **payload) -> PricingEvent:
+            return PricingEvent(stage, status, label, detail, payload, time.perf_counter() - started_at)
 
-            material_total_cost = material_cost_per_dwt * material_weight_dwt
-
-            # Use custom base price if provided, otherwise use default
-            default_base_price = self.config['base_price']
-            base_price = custom_base_price if custom_base_price is not None else default_base_price
-            total_price = material_total_cost + base_price
-
-            # Calculate delta info for display
-            base_price_delta = None
-            base_price_delta_percent = None
-            if custom_base_price is not None and custom_base_price != default_base_price:
-                base_price_delta = custom_base_price - default_base_price
-                base_price_delta_percent = float((base_price_delta / default_base_price * 100).quantize(Decimal('0.1')))
-
-            logger.info(f"Pricing complete: Material ${material_total_cost}, Base ${base_price}, Total ${total_price}")
-
-            return BanglePrice(
-                sku=sku,
-                material_cost_per_dwt=material_cost_per_dwt,
-                material_length_in=material_calc.rounded_length_in,
-                material_weight_dwt=material_weight_dwt,
-                material_total_cost=material_total_cost,
-                base_price=base_price,
-                total_price=total_price,
-                base_price_delta=base_price_delta,
-                base_price_delta_percent=base_price_delta_percent
-            )
+        if params is None:
+            params = self.build_parameters(custom_base_price)
 
+        try:
+            result = yield from self._pricing_steps(spec, params, event)
         except ValueError as e:
             logger.error(f"Validation error in pricing calculation: {e}")
-            return BusinessFormatter.format_error_for_user('calculation_error', str(e))
+            result = BusinessFormatter.format_error_for_user('calculation_error', str(e))
         except Exception as e:
             logger.error(f"Unexpected error in pricing calculation: {e}")
-            return BusinessFormatter.format_error_for_user('unknown', str(e))
+            result = BusinessFormatter.format_error_for_user('unknown', str(e))
+
+        final = event('result', 'completed', 'Quote complete' if isinstance(result, BanglePrice) else 'Quote failed',
+                      success=isinstance(result, BanglePrice))
+        final.result = result
+        yield final
+
+    def _pricing_steps(self, spec: BangleSpec, params: PricingParameters,
+                       event) -> Generator[PricingEvent, None, Union[BanglePrice, PricingError]]:
+        """Pricing pipeline steps for iter_pricing_events; returns the quote result"""
+        # Reject combinations the catalog doesn't stock before any calculation or API work
+        if not self.validator.is_orderable(spec):
+            logger.warning(f"No SKU found for specification: {spec}")
+            return self._sku_not_found_error(spec, params)
+
+        # Step 1: Convert size to circumference
+        logger.info(f"Converting size {spec.size} to circumference")
+        yield event('circumference', 'started', "Converting size to circumference", f"Size {spec.size}", size=spec.size)
+        circumference_mm = self.size_converter.size_to_circumference_mm(spec.size)
+        yield event('circumference', 'completed', "Circumference", f"{circumference_mm:.2f}mm",
+                    circumference_mm=circumference_mm)
+
+        # Step 2: Calculate material length needed
+        logger.info(f"Calculating material length for circumference {circumference_mm}mm, thickness {spec.thickness}")
+        yield event('material_length', 'started', "Calculating material length needed")
+        thickness_mm = self.material_calculator.parse_thickness_string(spec.thickness)
+        material_calc = self._material_calculator_for(params).calculate_material_length(circumference_mm, thickness_mm)
+        yield event('material_length', 'completed', "Material length needed", f"{material_calc.rounded_length_in:.2f} inches",
+                    length_in=material_calc.rounded_length_in)
+
+        # Step 3: Find SKU using existing SizingStockLookup
+        logger.info(f"Finding SKU for spec: {spec.metal_shape}, {spec.to_quality_string()}, {spec.width}, {spec.thickness}")
+        yield event('sku', 'started', "Finding Stuller SKU")
+        sku = self.sizing_stock.find_sku(
+            shape=spec.metal_shape,
+            quality=spec.to_quality_string(),
+            width=spec.width,
+            thickness=spec.thickness
+        )
 
-    def _calculate_material_weight_dwt(self, material_calc: MaterialCalculation, spec: BangleSpec,
-                                       api_weight: float, weight_unit: str, unit_of_sale: str) -> Decimal:
+        if not sku:
+            logger.warning(f"No SKU found for specification: {spec}")
+            return self._sku_not_found_error(spec, params)
+        yield event('sku', 'completed', "Stuller SKU", sku, sku=sku)
+
+        # Step 4: Get real-time pricing from Stuller
+        logger.info(f"Getting real-time price for SKU: {sku}")
+        yield event('live_price', 'started', "Getting real-time pricing", sku=sku)
+        fetched = self._fetch_product(sku)
+        if isinstance(fetched, PricingError):
+            return fetched
+        product, stored = fetched
+
+        # Step 5: Calculate final pricing using weight-based calculation
+        result = self._price_from_product(spec, sku, product, material_calc, params, stored)
+        if isinstance(result, PricingError):
+            return result
+
+        yield event('live_price', 'completed', "Stuller pricing", f"${result.material_cost_per_dwt:.2f} per DWT",
+                    price_per_dwt=str(result.material_cost_per_dwt), price_fetched_at=result.price_fetched_at)
+        yield event('material_weight', 'completed', "Material weight", f"{result.material_weight_dwt:.4f} DWT",
+                    weight_dwt=str(result.material_weight_dwt))
+        yield event('formula', 'completed', "Final price",
+                    f"${result.material_total_cost:.2f} + ${result.base_price:.2f} = ${result.total_price:.2f}",
+                    material_total_cost=str(result.material_total_cost), base_price=str(result.base_price),
+                    total_price=str(result.total_price))
+        return result
+
+    async def aiter_pricing_events(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None,
+                                   params: Optional[PricingParameters] = None) -> AsyncIterator[PricingEvent]:
         """
-        Calculate the weight in DWT needed using proper material science
-
-        This method uses karat-specific material densities to calculate accurate weights,
-        replacing the flawed reference-based approach that caused pricing errors.
-
-        Args:
-            material_calc: Material calculation with length needed
-            spec: Bangle specification with dimensions
-            api_weight: Weight from API response (not used - always normalized to 1.0)
-            weight_unit: Weight unit from API (should be 'DWT')
-            unit_of_sale: Unit of sale from API (should be 'DWT')
+        Async iterator over iter_pricing_events
 
-        Returns:
-            Weight in DWT needed for the calculated length
+        The pipeline runs in the event loop's default executor (the live
+        price lookup blocks), and each event is handed to the loop as soon as
+        it is yielded.
         """
-        # Get material dimensions
-        width_mm = float(spec.width.replace(' Mm', '').strip())
-        thickness_mm = float(spec.thickness.replace(' Mm', '').strip())
-        length_inches = material_calc.rounded_length_in
-
-        # Use proper material science calculation
-        calculation = self.material_density.calculate_theoretical_weight(
-            width_mm=width_mm,
-            thickness_mm=thickness_mm,
-            length_inches=length_inches,
-            quality=spec.metal_quality or spec.metal_color,
-            color=spec.metal_color
-        )
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        def produce() -> None:
+            try:
+                for event in self.iter_pricing_events(spec, custom_base_price, params):
+                    loop.call_soon_threadsafe(events.put_nowait, event)
+            finally:
+                loop.call_soon_threadsafe(events.put_nowait, finished)
+
+        producer = loop.run_in_executor(None, produce)
+        while True:
+            event = await events.get()
+            if event is finished:
+                break
+            yield event
+        await producer
+
+    def _fetch_product(self, sku: str) -> Union[Tuple[dict, Optional[StoredPrice]], PricingError]:
+        """
+        Stuller product record for a SKU, live if possible
 
-        # Comprehensive logging for verification and debugging
-        logger.info(f"=== MATERIAL WEIGHT CALCULATION ===")
-        logger.info(f"Dimensions: {width_mm}mm × {thickness_mm}mm × {length_inches}in")
-        logger.info(f"Quality: {spec.metal_quality or spec.metal_color} {spec.metal_color}")
-        logger.info(f"Density used: {calculation['density_g_per_cm3']:.3f} g/cm³")
-        logger.info(f"Volume per inch: {calculation['volume_cm3_per_in']:.6f} cm³/in")
-        logger.info(f"Weight per inch: {calculation['dwt_per_in']:.6f} DWT/in")
-        logger.info(f"Total weight: {calculation['total_weight_dwt']:.6f} DWT")
-        logger.info(f"==================================")
+        The live call runs on the engine's lookup pool. If it hasn't answered
+        within PRICE_STORE['live_timeout_s'], or it fails, the last known price
+        is used instead (returned as the StoredPrice); the live call keeps
+        running and refreshes the store when it completes. With nothing stored,
+        the quote waits for the live result as before.
 
-        return Decimal(str(calculation['total_weight_dwt']))
+        Prices fetched within PRICE_CACHE['ttl_s'] are served from the price
+        cache without a live call.
+        """
+        if self.price_cache is not None:
+            cached = self.price_cache.get(sku)
+            if cached is not None:
+                return cached, None
 
-    def get_available_options_for_shape(self, shape: str) -> dict:
-        """Get available widths and thicknesses for a given shape"""
-        return self.sizing_stock.get_available_options().get(shape, {})
+        future = self._live_pool.submit(propagate(self.stuller_client.get_sku_price), sku)
+        future.add_done_callback(lambda done: self._remember_response(sku, done))
+        timeout = BanglerConfig.PRICE_STORE['live_timeout_s'] if self.price_store else None
 
-    def validate_specification(self, spec: BangleSpec) -> Union[bool, PricingError]:
-        """Validate bangle specification against business rules"""
-        rules = BanglerConfig.BUSINESS_RULES
+        try:
+            api_response = future.result(timeout=timeout)
+        except FutureTimeoutError:
+            stored = self.price_store.lookup(sku)
+            if stored:
+                logger.warning(f"Live price for SKU {sku} timed out after {timeout}s; using price stored at {stored.fetched_at}")
+                return stored.product, stored
+            api_response = future.result()
+
+        # Check if API call succeeded - FIXED: correct logical check
+        if not api_response or api_response.get('success') != True:
+            stored = self.price_store.lookup(sku) if self.price_store else None
+            if stored:
+                logger.warning(f"Live price for SKU {sku} failed; using price stored at {stored.fetched_at}")
+                return stored.product, stored
+            logger.error(f"Failed to get price for SKU {sku}: {api_response}")
+            return BusinessFormatter.format_error_for_user(
+                (api_response or {}).get('error_type', 'api_unavailable'),
+                f"Failed to get price for SKU {sku}"
+            )
 
-        # Validate size
-        if spec.size < rules['min_size'] or spec.size > rules['max_size']:
+        # Extract product data from successful response
+        products = api_response.get('products', [])
+        if not products:
+            logger.error(f"No products returned for SKU {sku}: {api_response}")
             return BusinessFormatter.format_error_for_user(
-                'invalid_combination',
-                f"Size {spec.size} not in valid range {rules['min_size']}-{rules['max_size']}"
+                'sku_not_found',
+                f"SKU {sku} not found in Stuller catalog"
             )
 
-        # Validate shape
-        if spec.metal_shape not in rules['valid_shapes']:
+        return products[0], None  # First (should be only) product
+
+    def _remember_response(self, sku: str, future: Future) -> None:
+        """Record a successful live lookup in the price cache and last-known-price store"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        response = future.result()
+        if response and response.get('success') and response.get('products'):
+            self._remember_products({sku: response['products'][0]})
+
+    def _remember_products(self, products: dict) -> None:
+        if self.price_cache is not None:
+            self.price_cache.set_many(products.items())
+        if self.price_store is not None:
+            self.price_store.record_many(products.items())
+
+    def get_price_cache_stats(self) -> Optional[dict]:
+        """Price cache hit/miss statistics for this process (None if caching is disabled)"""
+        return self.price_cache.get_stats() if self.price_cache is not None else None
+
+    def _price_from_product(self, spec: BangleSpec, sku: str, product: dict, material_calc: MaterialCalculation,
+                            params: PricingParameters, stored: Optional[StoredPrice] = None) -> Union[BanglePrice, PricingError]:
+        """Final pricing from a Stuller product record (price per DWT) and the material calculation"""
+        # Extract price and weight data from API response
+        price_obj = product.get('Price')
+        weight = product.get('Weight')
+        weight_unit = product.get('WeightUnitOfMeasure')
+        unit_of_sale = product.get('UnitOfSale')
+
+        if not price_obj:
+            logger.error(f"No price data in product for SKU {sku}: {product}")
             return BusinessFormatter.format_error_for_user(
-                'invalid_combination',
-                f"Shape {spec.metal_shape} not in valid shapes: {rules['valid_shapes']}"
+                'api_unavailable',
+                f"No price available for SKU {sku}"
             )
 
-        # Validate color
-        if spec.metal_color not in rules['valid_colors']:
+        # Handle both old and new price formats
+        if isinstance(price_obj, dict):
+            # New format: {'Value': 87.08678, 'CurrencyCode': 'USD'}
+            price_value = price_obj.get('Value')
+        else:
+            # Old format: '87.086780000000000' or 87.08678
+            price_value = price_obj
+
+        if price_value is None:
+            logger.error(f"Invalid price format for SKU {sku}: {price_obj}")
             return BusinessFormatter.format_error_for_user(
-                'invalid_combination',
-                f"Color {spec.metal_color} not in valid colors: {rules['valid_colors']}"
+                'api_unavailable',
+                f"Invalid price format for SKU {sku}"
             )
 
-        # Quality validation removed - now using dynamic options from CSV data
-        # If user selects invalid quality, the SKU lookup will fail gracefully
+        # Step 5: Calculate final pricing using weight-based calculation
+        material_cost_per_dwt = Decimal(str(price_value))
 
-        return True
+        # Calculate material weight needed based on dimensions and length
+        material_weight_dwt = self._calculate_material_weight_dwt(
+            material_calc, spec, weight, weight_unit, unit_of_sale
+        )
+
+        material_total_cost = material_cost_per_dwt * material_weight_dwt
+
+        # Base price was resolved (custom or default) when the request started
+        default_base_price = params.default_base_price
+        base_price = params.base_price
+        total_price = material_total_cost + base_price
+
+        # Calculate delta info for display
+        base_price_delta = None
+        base_price_delta_percent = None
+        if base_price != default_base_price:
+            base_price_delta = base_price - default_base_price
+            base_price_delta_percent = float((base_price_delta / default_base_price * 100).quantize(Decimal('0.1')))
+
+        logger.info(f"Pricing complete: Material ${material_total_cost}, Base ${base_price}, Total ${total_price}")
+
+        return BanglePrice(
+            sku=sku,
+            material_cost_per_dwt=material_cost_per_dwt,
+            material_length_in=material_calc.rounded_length_in,
+            material_weight_dwt=material_weight_dwt,
+            material_total_cost=material_total_cost,
+            base_price=base_price,
+            total_price=total_price,
+            base_price_delta=base_price_delta,
+            base_price_delta_percent=base_price_delta_percent,
+            price_fetched_at=stored.fetched_at if stored else None
+        )
 
-    def calculate_bangle_price_with_progress(self, spec: BangleSpec, display=None, custom_base_price: Optional[Decimal] = None):
+    def find_alternatives(self, spec: BangleSpec, k: Optional[int] = None, with_prices: Optional[bool] = None,
+                          params: Optional[PricingParameters] = None) -> List[AlternativeOption]:
         """
-        Complete end-to-end pricing calculation with progress display
+        Rank the orderable SKUs dimensionally closest to a spec that isn't stocked
 
-        Returns either a BanglePrice with full breakdown or PricingError for user display
+        Args:
+            spec: The requested bangle specification
+            k: Number of alternatives (defaults to ALTERNATIVES['count'])
+            with_prices: Price each alternative with one batched Stuller call
+                (defaults to ALTERNATIVES['priced'])
+            params: Pricing parameters for the alternative quotes
+
+        Returns:
+            Alternatives ordered by distance in (width, thickness) mm
         """
+        config = BanglerConfig.ALTERNATIVES
+        k = config['count'] if k is None else k
+        with_prices = config['priced'] if with_prices is None else with_prices
+
         try:
-            # Step 1: Convert size to circumference
-            logger.info(f"Converting size {spec.size} to circumference")
-            if display:
-                display.show_progress_step("Converting size to circumference", f"Size {spec.size}", thinking_time=0.06)
-            circumference_mm = self.size_converter.size_to_circumference_mm(spec.size)
-            if display:
-                display.show_progress_step("Circumference", f"{circumference_mm:.2f}mm", thinking_time=0.05)
+            width_mm = parse_mm(spec.width)
+            thickness_mm = parse_mm(spec.thickness) if spec.thickness else None
+        except ValueError:
+            return []
 
-            # Step 2: Calculate material length needed
-            logger.info(f"Calculating material length for circumference {circumference_mm}mm, thickness {spec.thickness}")
-            if display:
-                display.show_progress_step("Calculating material length needed", thinking_time=0.06)
-            thickness_mm = self.material_calculator.parse_thickness_string(spec.thickness)
-            material_calc = self.material_calculator.calculate_material_length(circumference_mm, thickness_mm)
-            if display:
-                display.show_progress_step("Material length needed", f"{material_calc.rounded_length_in:.2f} inches", thinking_time=0.05)
+        matches = self.sizing_stock.get_dimension_index().nearest(
+            spec.metal_shape, spec.to_quality_string(), width_mm, thickness_mm, k=k
+        )
+        alternatives = [
+            AlternativeOption(match.sku, match.width, match.thickness, match.distance_mm) for match in matches
+        ]
+        if not (alternatives and with_prices):
+            return alternatives
 
-            # Step 3: Find SKU using existing SizingStockLookup
-            logger.info(f"Finding SKU for spec: {spec.metal_shape}, {spec.to_quality_string()}, {spec.width}, {spec.thickness}")
-            if display:
-                display.show_progress_step("Finding Stuller SKU", thinking_time=0.08)
-            sku = self.sizing_stock.find_sku(
-                shape=spec.metal_shape,
-                quality=spec.to_quality_string(),
-                width=spec.width,
-                thickness=spec.thickness
+        try:
+            products = self._get_products([alt.sku for alt in alternatives])
+            if params is None:
+                params = self.build_parameters()
+            circumference_mm = self.size_converter.size_to_circumference_mm(spec.size)
+            calculator = self._material_calculator_for(params)
+        except Exception as e:
+            logger.warning(f"Could not price alternatives for {spec}: {e}")
+            return alternatives
+
+        priced = []
+        for alt in alternatives:
+            product = products.get(alt.sku)
+            if product:
+                alt_spec = replace(spec, width=alt.width, thickness=alt.thickness)
+                material_calc = calculator.calculate_material_length(circumference_mm, parse_mm(alt.thickness))
+                result = self._price_from_product(alt_spec, alt.sku, product, material_calc, params)
+                if isinstance(result, BanglePrice):
+                    alt = replace(alt, total_price=result.total_price)
+            priced.append(alt)
+        return priced
+
+    def _get_products(self, skus: List[str]) -> Dict[str, dict]:
+        """Product records for many SKUs: price cache first, then one batched Stuller call for the rest"""
+        products = self.price_cache.get_many(skus) if self.price_cache is not None else {}
+        missing = [sku for sku in skus if sku not in products]
+        if missing:
+            fetched = self.stuller_client.get_sku_prices(missing)
+            self._remember_products(fetched)
+            products.update(fetched)
+        return products
+
+    def prefetch_prices(self, skus: List[str]) -> int:
+        """
+        Load prices for SKUs into the price cache and last-known-price store
+
+        SKUs already fresh in the cache are skipped; the rest go out in one
+        batched Stuller call. Returns the number of SKUs fetched.
+        """
+        products = self.price_cache.get_many(skus) if self.price_cache is not None else {}
+        missing = [sku for sku in dict.fromkeys(skus) if sku not in products]
+        if not missing:
+            return 0
+        fetched = self.stuller_client.get_sku_prices(missing)
+        self._remember_products(fetched)
+        return len(fetched)
+
+    def _dwt_per_inch_table(self, shape: str, quality: str) -> List[Tuple[SizingStockRecord, float]]:
+        """Every orderable bulk record of a shape/quality with its weight per inch, computed once per catalog"""
+        index = self.sizing_stock.get_dimension_index()
+        key = (shape.strip().lower(), quality.strip().lower())
+        cached = self._dwt_tables.get(key)
+        if cached is not None and cached[0] is index:
+            return cached[1]
+
+        points = index.points(shape, quality)
+        table = []
+        if points:
+            first = points[0][2]
+            metal = BangleSpec.from_quality_string(0, first.shape, first.quality, first.width, first.thickness)
+            density = self.material_density.get_density_for_quality(
+                metal.metal_quality or metal.metal_color, metal.metal_color
             )
+            table = [
+                (record, self.material_density.dwt_per_inch(width_mm, thickness_mm, density))
+                for width_mm, thickness_mm, record in points
+            ]
+        self._dwt_tables[key] = (index, table)
+        return table
+
+    def solve_budget(self, size: int, metal_shape: str, quality: str, budget: Decimal, k: int = 5,
+                     custom_base_price: Optional[Decimal] = None,
+                     params: Optional[PricingParameters] = None) -> List[BudgetOption]:
+        """
+        Find the orderable dimensions whose quote comes closest to a budget without exceeding it
 
-            if not sku:
-                logger.warning(f"No SKU found for specification: {spec}")
-                return BusinessFormatter.format_error_for_user(
-                    'sku_not_found',
-                    f"No SKU found for {spec.metal_shape} {spec.to_quality_string()} {spec.width} {spec.thickness}"
-                )
+        Every width x thickness of the shape/quality is estimated from the
+        precomputed DWT-per-inch table and one batched price fetch; the best
+        candidates are then priced exactly as a normal quote would be, a batch
+        of k at a time, until k of them fit the budget.
 
-            if display:
-                display.show_progress_step("Stuller SKU", sku, thinking_time=0.05)
+        Args:
+            size: Bangle size
+            metal_shape: Metal shape (e.g., "Flat")
+            quality: Quality string as in the catalog (e.g., "14K Yellow", "Sterling Silver")
+            budget: Customer's target total price
+            k: Number of options to return
+            custom_base_price: Base price for these quotes (defaults to configured base price)
 
-            # Step 4: Get real-time pricing from Stuller
-            logger.info(f"Getting real-time price for SKU: {sku}")
-            if display:
-                display.show_progress_step("Getting real-time pricing", thinking_time=0.08)
-            api_response = self.stuller_client.get_sku_price(sku)
-
-            # Check if API call succeeded - FIXED: correct logical check
-            if not api_response or api_response.get('success') != True:
-                logger.error(f"Failed to get price for SKU {sku}: {api_response}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"Failed to get price for SKU {sku}"
+        Returns:
+            Options ranked by closeness to the budget (smallest amount left over first)
+        """
+        if params is None:
+            params = self.build_parameters(custom_base_price)
+        table = self._dwt_per_inch_table(metal_shape, quality)
+        if not table or budget <= params.base_price:
+            return []
+
+        circumference_mm = self.size_converter.size_to_circumference_mm(size)
+        calculator = self._material_calculator_for(params)
+        products = self._get_products([record.sku for record, _ in table])
+
+        material_calcs: Dict[str, MaterialCalculation] = {}  # one per distinct thickness
+        candidates = []
+        for record, dwt_per_in in table:
+            product = products.get(record.sku)
+            price_value = StullerClient.extract_price(product) if product else None
+            if price_value is None:
+                continue
+            material_calc = material_calcs.get(record.thickness)
+            if material_calc is None:
+                material_calc = material_calcs[record.thickness] = calculator.calculate_material_length(
+                    circumference_mm, parse_mm(record.thickness)
                 )
+            estimate = Decimal(str(price_value)) * Decimal(str(dwt_per_in * material_calc.rounded_length_in)) + params.base_price
+            if estimate <= budget:
+                candidates.append((budget - estimate, record, material_calc, product))
+
+        candidates.sort(key=lambda candidate: candidate[0])
+        options = []
+        # An estimate can come out slightly under the exact quote, so a candidate may
+        # still fail the budget; keep pricing the next-best batch until k pass
+        for start in range(0, len(candidates), k):
+            for _, record, material_calc, product in candidates[start:start + k]:
+                spec = BangleSpec.from_quality_string(size, record.shape, record.quality, record.width, record.thickness)
+                price = self._price_from_product(spec, record.sku, product, material_calc, params)
+                if isinstance(price, BanglePrice) and price.total_price <= budget:
+                    options.append(BudgetOption(
+                        record.sku, record.width, record.thickness, price.total_price, budget - price.total_price, price
+                    ))
+            if len(options) >= k:
+                break
+        options.sort(key=lambda option: option.under_budget_by)
+        return options[:k]
+
+    def price_many(self, specs: Sequence[BangleSpec],
+                   custom_base_prices: Optional[Sequence[Optional[Decimal]]] = None) -> List[Union[BanglePrice, PricingError]]:
+        """
+        Price many specifications with batched price lookups
 
-            # Extract product data from successful response
-            products = api_response.get('products', [])
-            if not products:
-                logger.error(f"No products returned for SKU {sku}: {api_response}")
-                return BusinessFormatter.format_error_for_user(
-                    'sku_not_found',
-                    f"SKU {sku} not found in Stuller catalog"
-                )
+        SKUs are resolved locally, every distinct SKU is priced through the
+        price cache and as few batched Stuller calls as possible, and material
+        lengths are computed once per distinct size/thickness/parameters.
+
+        Args:
+            specs: Specifications to price
+            custom_base_prices: Optional per-spec base prices (None entries use the default)
 
-            product = products[0]  # Get first (should be only) product
+        Returns:
+            One BanglePrice or PricingError per spec, in order
+        """
+        results: List[Union[BanglePrice, PricingError, None]] = [None] * len(specs)
+        params_by_base: Dict[Optional[Decimal], PricingParameters] = {}
+        pending = []
 
-            # Extract price and weight data from API response
-            price_obj = product.get('Price')
-            weight = product.get('Weight')
-            weight_unit = product.get('WeightUnitOfMeasure')
-            unit_of_sale = product.get('UnitOfSale')
+        for i, spec in enumerate(specs):
+            base_price = custom_base_prices[i] if custom_base_prices else None
+            params = params_by_base.get(base_price)
+            if params is None:
+                params = params_by_base[base_price] = self.build_parameters(base_price)
 
-            if not price_obj:
-                logger.error(f"No price data in product for SKU {sku}: {product}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"No price available for SKU {sku}"
+            sku = self.sizing_stock.find_sku(spec.metal_shape, spec.to_quality_string(), spec.width, spec.thickness)
+            if not sku:
+                results[i] = BusinessFormatter.format_error_for_user(
+                    'sku_not_found',
+                    f"No SKU found for {spec.metal_shape} {spec.to_quality_string()} {spec.width} {spec.thickness}"
                 )
+                continue
+            pending.append((i, spec, sku, params))
 
-            # Handle both old and new price formats
-            if isinstance(price_obj, dict):
-                # New format: {'Value': 87.08678, 'CurrencyCode': 'USD'}
-                price_value = price_obj.get('Value')
-            else:
-                # Old format: '87.086780000000000' or 87.08678
-                price_value = price_obj
+        lookup_error = 'api_unavailable'
+        try:
+            products = self._get_products(list({sku for _, _, sku, _ in pending}))
+        except Exception as e:
+            logger.error(f"Batched price lookup failed: {e}")
+            products = {}
+            if isinstance(e, RateLimitTimeout):
+                lookup_error = 'rate_limited'
+
+        material_calcs = {}
+        for i, spec, sku, params in pending:
+            product = products.get(sku)
+            if product is None:
+                results[i] = BusinessFormatter.format_error_for_user(lookup_error, f"Failed to get price for SKU {sku}")
+                continue
+            try:
+                key = (params, spec.size, spec.thickness)
+                material_calc = material_calcs.get(key)
+                if material_calc is None:
+                    circumference_mm = self.size_converter.size_to_circumference_mm(spec.size)
+                    thickness_mm = self.material_calculator.parse_thickness_string(spec.thickness)
+                    material_calc = material_calcs[key] = self._material_calculator_for(params).calculate_material_length(
+                        circumference_mm, thickness_mm
+                    )
+                results[i] = self._price_from_product(spec, sku, product, material_calc, params)
+            except ValueError as e:
+                logger.error(f"Validation error in pricing calculation: {e}")
+                results[i] = BusinessFormatter.format_error_for_user('calculation_error', str(e))
+
+        return results
+
+    def compare_qualities(self, size: int, metal_shape: str, width: str, thickness: str,
+                          custom_base_price: Optional[Decimal] = None,
+                          params: Optional[PricingParameters] = None) -> List[Tuple[str, Union[BanglePrice, PricingError]]]:
+        """
+        Price one size/shape/width/thickness in every quality and color the catalog stocks it in
 
-            if price_value is None:
-                logger.error(f"Invalid price format for SKU {sku}: {price_obj}")
-                return BusinessFormatter.format_error_for_user(
-                    'api_unavailable',
-                    f"Invalid price format for SKU {sku}"
-                )
+        All SKUs are priced with one batched lookup, and the material length
+        (which depends only on size and thickness) is computed once.
 
-            # Step 5: Calculate final pricing using weight-based calculation
-            material_cost_per_dwt = Decimal(str(price_value))
-            if display:
-                display.show_progress_step("Stuller pricing", f"${material_cost_per_dwt:.2f} per DWT", thinking_time=0.05)
+        Returns:
+            (quality string, BanglePrice or PricingError) pairs, cheapest first,
+            with qualities that couldn't be priced last
+        """
+        if params is None:
+            params = self.build_parameters(custom_base_price)
 
-            if display:
-                display.show_progress_step("Calculating material weight needed", thinking_time=0.06)
+        nested = self.sizing_stock.get_nested_options_for_cli().get(metal_shape, {})
+        qualities = [quality for quality, widths in nested.items() if thickness in widths.get(width, ())]
+        if not qualities:
+            return []
 
-            # Calculate material weight needed based on dimensions and length
-            material_weight_dwt = self._calculate_material_weight_dwt(
-                material_calc, spec, weight, weight_unit, unit_of_sale
+        try:
+            circumference_mm = self.size_converter.size_to_circumference_mm(size)
+            material_calc = self._material_calculator_for(params).calculate_material_length(
+                circumference_mm, parse_mm(thickness)
             )
+        except ValueError as e:
+            logger.error(f"Validation error in quality comparison: {e}")
+            error = BusinessFormatter.format_error_for_user('calculation_error', str(e))
+            return [(quality, error) for quality in qualities]
 
-            if display:
-                display.show_progress_step("Material weight", f"{material_weight_dwt:.4f} DWT", thinking_time=0.05)
-                display.show_progress_step("Applying pricing formula", thinking_time=0.05)
+        skus = {quality: self.sizing_stock.find_sku(metal_shape, quality, width, thickness) for quality in qualities}
+        lookup_error = 'api_unavailable'
+        try:
+            products = self._get_products([sku for sku in skus.values() if sku])
+        except Exception as e:
+            logger.error(f"Batched price lookup failed for quality comparison: {e}")
+            products = {}
+            if isinstance(e, RateLimitTimeout):
+                lookup_error = 'rate_limited'
+
+        results = []
+        for quality in qualities:
+            sku = skus[quality]
+            product = products.get(sku) if sku else None
+            if product is None:
+                results.append((quality, BusinessFormatter.format_error_for_user(
+                    lookup_error, f"No price returned for {quality} ({sku})"
+                )))
+                continue
+            spec = BangleSpec.from_quality_string(size, metal_shape, quality, width, thickness)
+            results.append((quality, self._price_from_product(spec, sku, product, material_calc, params)))
+
+        results.sort(key=lambda item: (isinstance(item[1], PricingError),
+                                       getattr(item[1], 'total_price', Decimal(0)), item[0]))
+        return results
+
+    def _sku_not_found_error(self, spec: BangleSpec, params: PricingParameters) -> PricingError:
+        """sku_not_found error carrying the nearest orderable substitutes"""
+        error = BusinessFormatter.format_error_for_user(
+            'sku_not_found',
+            f"No SKU found for {spec.metal_shape} {spec.to_quality_string()} {spec.width} {spec.thickness}"
+        )
+        try:
+            error = replace(error, alternatives=tuple(self.find_alternatives(spec, params=params)))
+        except Exception as e:
+            logger.warning(f"Alternative search failed for {spec}: {e}")
+        return error
 
-            material_total_cost = material_cost_per_dwt * material_weight_dwt
+    def get_available_options_for_shape(self, shape: str) -> dict:
+        """Get available widths and thicknesses for a given shape"""
+        return self.sizing_stock.get_available_options().get(shape, {})
 
-            # Use custom base price if provided, otherwise use default
-            default_base_price = self.config['base_price']
-            base_price = custom_base_price if custom_base_price is not None else default_base_price
-            total_price = material_total_cost + base_price
+    def validate_specification(self, spec: BangleSpec) -> Union[bool, PricingError]:
+        """Validate bangle specification against business rules and catalog availability"""
+        violations = self.validator.rule_violations(spec)
+        if violations:
+            return BusinessFormatter.format_error_for_user('invalid_combination', "; ".join(violations))
 
-            # Calculate delta info for display
-            base_price_delta = None
-            base_price_delta_percent = None
-            if custom_base_price is not None and custom_base_price != default_base_price:
-                base_price_delta = custom_base_price - default_base_price
-                base_price_delta_percent = float((base_price_delta / default_base_price * 100).quantize(Decimal('0.1')))
+        if not self.validator.is_orderable(spec):
+            return self._sku_not_found_error(spec, self.build_parameters())
 
-            if display:
-                display.show_progress_step("Final price", f"${material_total_cost:.2f} + ${base_price:.2f} = ${total_price:.2f}", thinking_time=0.05)
-
-            logger.info(f"Pricing complete: Material ${material_total_cost}, Base ${base_price}, Total ${total_price}")
-
-            return BanglePrice(
-                sku=sku,
-                material_cost_per_dwt=material_cost_per_dwt,
-                material_length_in=material_calc.rounded_length_in,
-                material_weight_dwt=material_weight_dwt,
-                material_total_cost=material_total_cost,
-                base_price=base_price,
-                total_price=total_price,
-                base_price_delta=base_price_delta,
-                base_price_delta_percent=base_price_delta_percent
-            )
+        return True
 
-        except ValueError as e:
-            logger.error(f"Validation error in pricing calculation: {e}")
-            return BusinessFormatter.format_error_for_user('calculation_error', str(e))
-        except Exception as e:
-            logger.error(f"Unexpected error in pricing calculation: {e}")
-            return BusinessFormatter.format_error_for_user('unknown', str(e))
+    def calculate_bangle_price_with_progress(self, spec: BangleSpec, display=None, custom_base_price: Optional[Decimal] = None,
+                                            params: Optional[PricingParameters] = None):
+        """
+        Complete end-to-end pricing calculation with progress display
+
+        Each PricingEvent is passed to display.show_pricing_event() as it happens.
+        Returns either a BanglePrice with full breakdown or PricingError for user display
+        """
+        for event in self.iter_pricing_events(spec, custom_base_price, params):
+            if display:
+                display.show_pricing_event(event)
+        return event.result
 
     def _calculate_material_weight_dwt(self, material_calc: MaterialCalculation, spec: BangleSpec,
                                        api_weight: float, weight_unit: str, unit_of_sale: str) -> Decimal:
@@ -0,0 +1,234 @@
+"""
+Quote Ledger
+Append-only SQLite history of every quote, indexed by SKU, date and customer
+reference, for lookups, exports and bulk requotes
+"""
+
+import csv
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import List, NamedTuple, Optional, TextIO, Union
+
+from ..config.settings import BanglerConfig
+from ..models.bangle import BangleSpec
+from ..models.pricing import BanglePrice, PricingError
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteRecord(NamedTuple):
+    """One ledger entry: the specification and the price it was quoted at"""
+    quote_id: int
+    quoted_at: float                    # Unix timestamp
+    customer_ref: Optional[str]
+    sku: str
+    size: int
+    metal_shape: str
+    metal_color: str
+    metal_quality: Optional[str]
+    width: str
+    thickness: str
+    base_price: Decimal
+    material_cost_per_dwt: Decimal
+    material_weight_dwt: Decimal
+    material_length_in: float
+    total_price: Decimal
+    price_fetched_at: Optional[float]   # Set when quoted from the last-known-price store
+
+    def to_spec(self) -> BangleSpec:
+        return BangleSpec(
+            size=self.size,
+            metal_shape=self.metal_shape,
+            metal_color=self.metal_color,
+            metal_quality=self.metal_quality,
+            width=self.width,
+            thickness=self.thickness
+        )
+
+
+LEDGER_COLUMNS = QuoteRecord._fields
+
+_DECIMAL_FIELDS = {"base_price", "material_cost_per_dwt", "material_weight_dwt", "total_price"}
+
+
+def _to_record(row: sqlite3.Row) -> QuoteRecord:
+    return QuoteRecord(*(
+        Decimal(row[name]) if name in _DECIMAL_FIELDS else row[name]
+        for name in LEDGER_COLUMNS
+    ))
+
+
+def _timestamp(value: Union[None, float, datetime]) -> Optional[float]:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return value
+
+
+class QuoteLedger:
+    """
+    Append-only quote history in SQLite
+
+    Money is stored as decimal strings so values round-trip exactly. Entries
+    are never updated or deleted; a requote produces new prices for
+    comparison without touching the ledger.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS quotes ("
+                " quote_id INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " quoted_at REAL NOT NULL,"
+                " customer_ref TEXT,"
+                " sku TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " metal_shape TEXT NOT NULL,"
+                " metal_color TEXT NOT NULL,"
+                " metal_quality TEXT,"
+                " width TEXT NOT NULL,"
+                " thickness TEXT NOT NULL,"
+                " base_price TEXT NOT NULL,"
+                " material_cost_per_dwt TEXT NOT NULL,"
+                " material_weight_dwt TEXT NOT NULL,"
+                " material_length_in REAL NOT NULL,"
+                " total_price TEXT NOT NULL,"
+                " price_fetched_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS quotes_sku ON quotes (sku, quoted_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS quotes_date ON quotes (quoted_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS quotes_customer ON quotes (customer_ref, quoted_at)")
+
+    def record(self, spec: BangleSpec, price: BanglePrice, customer_ref: Optional[str] = None,
+               quoted_at: Optional[float] = None) -> int:
+        """Append a quote and return its ledger id"""
+        row = (
+            quoted_at if quoted_at is not None else time.time(), customer_ref or None, price.sku,
+            spec.size, spec.metal_shape, spec.metal_color, spec.metal_quality, spec.width, spec.thickness,
+            str(price.base_price), str(price.material_cost_per_dwt), str(price.material_weight_dwt),
+            price.material_length_in, str(price.total_price), price.price_fetched_at
+        )
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO quotes ({', '.join(LEDGER_COLUMNS[1:])}) VALUES ({', '.join('?' * len(row))})",
+                row
+            )
+        return cursor.lastrowid
+
+    def _query(self, where: str = "", params: tuple = (), order: str = "quoted_at DESC",
+               limit: Optional[int] = None) -> List[QuoteRecord]:
+        sql = f"SELECT * FROM quotes {'WHERE ' + where if where else ''} ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [_to_record(row) for row in rows]
+
+    def _in_range(self, where: List[str], params: List, start: Union[None, float, datetime],
+                  end: Union[None, float, datetime], order: str, limit: Optional[int]) -> List[QuoteRecord]:
+        """Query with [start, end) bounds added to the given conditions"""
+        if start is not None:
+            where.append("quoted_at >= ?")
+            params.append(_timestamp(start))
+        if end is not None:
+            where.append("quoted_at < ?")
+            params.append(_timestamp(end))
+        return self._query(" AND ".join(where), tuple(params), order=order, limit=limit)
+
+    def recent_for_sku(self, sku: str, limit: int = 20, start: Union[None, float, datetime] = None,
+                       end: Union[None, float, datetime] = None) -> List[QuoteRecord]:
+        """Most recent quotes for a SKU (optionally within [start, end)), newest first"""
+        return self._in_range(["sku = ?"], [sku], start, end, "quoted_at DESC", limit)
+
+    def for_customer(self, customer_ref: str, limit: Optional[int] = None, start: Union[None, float, datetime] = None,
+                     end: Union[None, float, datetime] = None) -> List[QuoteRecord]:
+        """Quotes for a customer reference (optionally within [start, end)), newest first"""
+        return self._in_range(["customer_ref = ?"], [customer_ref], start, end, "quoted_at DESC", limit)
+
+    def between(self, start: Union[None, float, datetime] = None, end: Union[None, float, datetime] = None,
+                limit: Optional[int] = None) -> List[QuoteRecord]:
+        """Quotes in [start, end), oldest first (either bound may be omitted)"""
+        return self._in_range([], [], start, end, "quoted_at ASC", limit)
+
+    def recent(self, start: Union[None, float, datetime] = None, end: Union[None, float, datetime] = None,
+               limit: int = 20) -> List[QuoteRecord]:
+        """The latest quotes in [start, end), newest first, limited in SQL"""
+        return self._in_range([], [], start, end, "quoted_at DESC", limit)
+
+    def top_skus(self, limit: int = 20, since: Union[None, float, datetime] = None) -> List[str]:
+        """SKUs quoted most often (optionally only counting quotes since a date), most quoted first"""
+        sql = "SELECT sku FROM quotes"
+        params: tuple = ()
+        if since is not None:
+            sql += " WHERE quoted_at >= ?"
+            params = (_timestamp(since),)
+        sql += f" GROUP BY sku ORDER BY COUNT(*) DESC, MAX(quoted_at) DESC LIMIT {int(limit)}"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, params).fetchall()]
+
+    def export_csv(self, output: TextIO, start: Union[None, float, datetime] = None,
+                   end: Union[None, float, datetime] = None) -> int:
+        """Write quotes in a date range to CSV, returning the row count"""
+        writer = csv.writer(output)
+        writer.writerow(LEDGER_COLUMNS)
+        records = self.between(start, end)
+        for record in records:
+            writer.writerow(record._replace(
+                quoted_at=datetime.fromtimestamp(record.quoted_at).isoformat(timespec="seconds")
+            ))
+        return len(records)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM quotes").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class Requote(NamedTuple):
+    """A past quote repriced at today's prices"""
+    record: QuoteRecord
+    result: Union[BanglePrice, PricingError]
+
+    @property
+    def change(self) -> Optional[Decimal]:
+        """New total minus quoted total (None if the requote failed)"""
+        if isinstance(self.result, BanglePrice):
+            return self.result.total_price - self.record.total_price
+        return None
+
+
+def requote(records: List[QuoteRecord], engine) -> List[Requote]:
+    """
+    Reprice past quotes through PricingEngine.price_many's batched path
+
+    Each quote keeps its original base price, so the change reflects metal
+    prices and material settings only.
+    """
+    results = engine.price_many([record.to_spec() for record in records],
+                                [record.base_price for record in records])
+    return [Requote(record, result) for record, result in zip(records, results)]
+
+
+def open_quote_ledger() -> Optional[QuoteLedger]:
+    """Quote ledger configured by BanglerConfig.QUOTE_LEDGER, or None if disabled/unavailable"""
+    path = BanglerConfig.QUOTE_LEDGER.get('path')
+    if not path:
+        return None
+    try:
+        return QuoteLedger(path)
+    except Exception as e:
+        logger.warning(f"Quote ledger unavailable at {path}: {e}")
+        return None
@@ -0,0 +1,230 @@
+"""
+Pricing Scheduler
+Interactive and bulk queues in front of PricingEngine, so a large batch job
+running in the same process never starves a quote at the counter
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from decimal import Decimal
+from typing import Any, Callable, Deque, Dict, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+from ..api.rate_limit import BULK, INTERACTIVE, bulk_priority
+from ..config.settings import BanglerConfig
+from ..models.bangle import BangleSpec
+from ..models.pricing import BanglePrice, PricingError, PricingEvent
+from ..utils.profiling import propagate
+from .pricing_engine import PricingEngine
+
+logger = logging.getLogger(__name__)
+
+
+class _Task(NamedTuple):
+    fn: Callable
+    args: tuple
+    future: Future
+    priority: str
+    enqueued_at: float
+
+
+class _WaitStats:
+    """Queue wait times for one priority class (recent waits kept for percentiles)"""
+
+    def __init__(self, window: int = 1024):
+        self.completed = 0
+        self.total_wait_s = 0.0
+        self.max_wait_s = 0.0
+        self.recent: Deque[float] = deque(maxlen=window)
+
+    def record(self, wait_s: float) -> None:
+        self.total_wait_s += wait_s
+        self.max_wait_s = max(self.max_wait_s, wait_s)
+        self.recent.append(wait_s)
+
+    def summary(self, started: int) -> Dict[str, Any]:
+        recent = sorted(self.recent)
+        return {
+            'wait_ms_avg': round(self.total_wait_s / started * 1000, 2) if started else None,
+            'wait_ms_p95': round(recent[int(0.95 * (len(recent) - 1))] * 1000, 2) if recent else None,
+            'wait_ms_max': round(self.max_wait_s * 1000, 2)
+        }
+
+
+class PricingScheduler:
+    """
+    Bounded worker pool with an interactive queue and a bulk queue
+
+    Workers always take interactive work first. Bulk work is split into
+    chunks and at most `bulk_workers` chunks run at once, so the remaining
+    workers are always free for interactive quotes; bulk chunks also run
+    under bulk_priority(), leaving the Stuller rate limit reserve to
+    interactive requests.
+    """
+
+    def __init__(self, engine: PricingEngine, workers: Optional[int] = None, bulk_workers: Optional[int] = None,
+                 bulk_chunk: Optional[int] = None):
+        config = BanglerConfig.SCHEDULER
+        self.engine = engine
+        self.workers = max(2, workers or config['workers'])
+        self.bulk_workers = min(max(1, bulk_workers or config['bulk_workers']), self.workers - 1)
+        self.bulk_chunk = max(1, bulk_chunk or config['bulk_chunk'])
+
+        self._cond = threading.Condition()
+        self._queues: Dict[str, Deque[_Task]] = {INTERACTIVE: deque(), BULK: deque()}
+        self._running = {INTERACTIVE: 0, BULK: 0}
+        self._started = {INTERACTIVE: 0, BULK: 0}
+        self._stats = {INTERACTIVE: _WaitStats(), BULK: _WaitStats()}
+        self._closed = False
+
+        self._threads = [
+            threading.Thread(target=self._work, daemon=True, name=f"bangler-pricing-{i}")
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    # -- submission -----------------------------------------------------
+
+    def submit(self, fn: Callable, *args, priority: str = INTERACTIVE) -> Future:
+        """Queue fn(*args) at the given priority (profiled into the caller's profile session, if any)"""
+        fn = propagate(fn)
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Pricing scheduler is shut down")
+            self._queues[priority].append(_Task(fn, args, future, priority, time.monotonic()))
+            self._cond.notify()
+        return future
+
+    def submit_quote(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None) -> Future:
+        """Interactive quote; the future resolves to a BanglePrice or PricingError"""
+        return self.submit(self.engine.calculate_bangle_price, spec, custom_base_price)
+
+    def stream_quote(self, spec: BangleSpec, custom_base_price: Optional[Decimal] = None) -> Iterator[PricingEvent]:
+        """Interactive quote run on a worker, with its PricingEvents yielded in the calling thread"""
+        events: "queue.Queue[Optional[PricingEvent]]" = queue.Queue()
+
+        def run() -> None:
+            try:
+                for event in self.engine.iter_pricing_events(spec, custom_base_price):
+                    events.put(event)
+            finally:
+                events.put(None)
+
+        future = self.submit(run)
+        while True:
+            event = events.get()
+            if event is None:
+                break
+            yield event
+        future.result()
+
+    def submit_bulk(self, specs: Sequence[BangleSpec],
+                    custom_base_prices: Optional[Sequence[Optional[Decimal]]] = None) -> Future:
+        """
+        Bulk pricing through PricingEngine.price_many, in chunks of bulk_chunk specs
+
+        The future resolves to one BanglePrice or PricingError per spec, in order.
+        """
+        specs = list(specs)
+        combined: Future = Future()
+        if not specs:
+            combined.set_result([])
+            return combined
+
+        results: List[Union[BanglePrice, PricingError, None]] = [None] * len(specs)
+        starts = range(0, len(specs), self.bulk_chunk)
+        remaining = [len(starts)]
+        lock = threading.Lock()
+
+        def chunk_done(start: int, future: Future) -> None:
+            if future.cancelled() or future.exception() is not None:
+                if not combined.done():
+                    combined.set_exception(future.exception() or RuntimeError("Bulk chunk cancelled"))
+                return
+            chunk = future.result()
+            with lock:
+                results[start:start + len(chunk)] = chunk
+                remaining[0] -= 1
+                finished = remaining[0] == 0
+            if finished and not combined.done():
+                combined.set_result(results)
+
+        for start in starts:
+            end = start + self.bulk_chunk
+            prices = list(custom_base_prices[start:end]) if custom_base_prices else None
+            future = self.submit(self.engine.price_many, specs[start:end], prices, priority=BULK)
+            future.add_done_callback(lambda f, start=start: chunk_done(start, f))
+        return combined
+
+    # -- workers --------------------------------------------------------
+
+    def _next_task(self) -> Optional[_Task]:
+        with self._cond:
+            while True:
+                if self._queues[INTERACTIVE]:
+                    task = self._queues[INTERACTIVE].popleft()
+                elif self._queues[BULK] and self._running[BULK] < self.bulk_workers:
+                    task = self._queues[BULK].popleft()
+                elif self._closed:
+                    return None
+                else:
+                    self._cond.wait()
+                    continue
+                self._running[task.priority] += 1
+                self._started[task.priority] += 1
+                self._stats[task.priority].record(time.monotonic() - task.enqueued_at)
+                return task
+
+    def _work(self) -> None:
+        while True:
+            task = self._next_task()
+            if task is None:
+                return
+            try:
+                if task.future.set_running_or_notify_cancel():
+                    try:
+                        if task.priority == BULK:
+                            with bulk_priority():
+                                result = task.fn(*task.args)
+                        else:
+                            result = task.fn(*task.args)
+                    except BaseException as e:
+                        logger.error(f"{task.priority.title()} pricing task failed: {e}")
+                        task.future.set_exception(e)
+                    else:
+                        task.future.set_result(result)
+            finally:
+                with self._cond:
+                    self._running[task.priority] -= 1
+                    self._stats[task.priority].completed += 1
+                    self._cond.notify_all()
+
+    # -- metrics and lifecycle --------------------------------------------
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Queue depth, running/completed counts and queue wait times per priority"""
+        with self._cond:
+            metrics: Dict[str, Any] = {'workers': self.workers, 'bulk_workers': self.bulk_workers}
+            for priority in (INTERACTIVE, BULK):
+                stats = self._stats[priority]
+                metrics[priority] = {
+                    'queued': len(self._queues[priority]),
+                    'running': self._running[priority],
+                    'completed': stats.completed,
+                    **stats.summary(self._started[priority])
+                }
+            return metrics
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; queued tasks still run before the workers exit"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
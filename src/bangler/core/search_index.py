@@ -0,0 +1,176 @@
+"""
+Typeahead Search Index
+SKU fragments and descriptions ("102600", "6.5x1.5 flat", "14k rose half")
+matched against orderable sizing stock, compiled once per catalog snapshot
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from heapq import nsmallest
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set
+
+from ..models.bangle import BangleSpec
+from .catalog import DEFAULT_LENGTH, SizingStockRecord, parse_mm
+
+_WORD = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+# "6.5x1.5", "6.5 x 1.5", "6.5mm x 1.5mm", "6.5×1.5" (thickness may still be being typed)
+_DIMENSIONS = re.compile(r"(\d+(?:\.\d*)?)\s*(?:mm)?\s*[x×]\s*(\d+(?:\.\d*)?)?")
+_STOPWORDS = frozenset({"mm", "x"})
+
+
+class SearchHit(NamedTuple):
+    """One orderable sizing stock product matching a search"""
+    sku: str
+    shape: str
+    quality: str
+    width: str
+    thickness: str
+    label: str                  # e.g. 'Flat 14K Yellow 6.5 Mm x 1.5 Mm  (SIZING STOCK:102600:P)'
+
+    def to_spec(self, size: int) -> BangleSpec:
+        return BangleSpec.from_quality_string(size, self.shape, self.quality, self.width, self.thickness)
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in _WORD.findall(text.lower()) if word not in _STOPWORDS]
+
+
+def _number(text: str) -> str:
+    """Canonical form of a dimension so '1.50' and '1.5' match"""
+    try:
+        return format(float(text), "g")
+    except ValueError:
+        return text
+
+
+def record_tokens(record: SizingStockRecord) -> Set[str]:
+    """Index tokens for a record: SKU segments, shape and quality words, and dimensions"""
+    tokens = set(_words(record.sku)) | set(_words(record.shape)) | set(_words(record.quality))
+    for prefix, value in (("w:", record.width), ("t:", record.thickness)):
+        number = _number(value.lower().replace("mm", "").strip())
+        tokens.add(number)
+        tokens.add(prefix + number)
+    return tokens
+
+
+def query_tokens(query: str) -> List[str]:
+    """
+    Search tokens for a query; each is matched as a prefix
+
+    'WxT' becomes a width token and a thickness token, so '6.5x1.5' only
+    matches 6.5 Mm wide, 1.5 Mm thick stock rather than either way round.
+    """
+    text = query.lower()
+    tokens = []
+    for match in _DIMENSIONS.finditer(text):
+        width, thickness = match.groups()
+        tokens.append("w:" + _number(width.rstrip(".")))
+        if thickness:
+            # A complete number must match exactly; a partial one ('1', '1.') is a prefix
+            complete = match.end() < len(text) and not thickness.endswith(".")
+            tokens.append("t:" + (_number(thickness) if complete else thickness))
+    text = _DIMENSIONS.sub(" ", text)
+    return tokens + _words(text)
+
+
+class SearchIndex:
+    """
+    Prefix and token index over orderable (bulk) sizing stock
+
+    Every record contributes tokens (SKU segments, shape and quality words,
+    width and thickness). Tokens are kept in a sorted array, so the tokens
+    starting with a prefix are one bisect away, and each token maps to the
+    set of record ids that contain it. A query is the intersection of the
+    record sets of its tokens. Record ids follow shape, quality, width and
+    thickness order, so the first ids are also the best-ordered hits.
+    Prefix unions are cached per prefix, so repeated typeahead keystrokes
+    are dictionary hits.
+    """
+
+    def __init__(self, records: Iterable[SizingStockRecord], max_cached_prefixes: int = 4096):
+        bulk = DEFAULT_LENGTH.lower()
+        seen = set()
+        entries = []
+        for record in records:
+            if not (record.sku and record.width and record.thickness) or record.length.lower() != bulk:
+                continue
+            key = (record.shape.lower(), record.quality.lower(), record.width.lower(), record.thickness.lower())
+            if key in seen:
+                continue  # first SKU per combination wins, as in find_sku
+            seen.add(key)
+            try:
+                dimensions = (parse_mm(record.width), parse_mm(record.thickness))
+            except ValueError:
+                dimensions = (0.0, 0.0)
+            entries.append(((record.shape, record.quality) + dimensions, record))
+        entries.sort(key=lambda entry: entry[0])
+
+        self._hits = tuple(
+            SearchHit(r.sku, r.shape, r.quality, r.width, r.thickness,
+                      f"{r.shape} {r.quality} {r.width} x {r.thickness}  ({r.sku})")
+            for _, r in entries
+        )
+        self._by_sku: Dict[str, int] = {}
+        postings: Dict[str, Set[int]] = {}
+        for record_id, (_, record) in enumerate(entries):
+            self._by_sku.setdefault(record.sku.lower(), record_id)
+            for token in record_tokens(record):
+                postings.setdefault(token, set()).add(record_id)
+
+        self._postings: Dict[str, FrozenSet[int]] = {token: frozenset(ids) for token, ids in postings.items()}
+        self._tokens = sorted(self._postings)
+        self._prefix_cache: Dict[str, FrozenSet[int]] = {}
+        self._cache_lock = threading.Lock()
+        self.max_cached_prefixes = max_cached_prefixes
+
+    def __len__(self) -> int:
+        return len(self._hits)
+
+    def _matching(self, prefix: str) -> FrozenSet[int]:
+        """Ids of records with a token starting with prefix"""
+        cached = self._prefix_cache.get(prefix)
+        if cached is not None:
+            return cached
+
+        start = bisect_left(self._tokens, prefix)
+        end = bisect_left(self._tokens, prefix + "￿", start)
+        if end - start == 1:
+            ids = self._postings[self._tokens[start]]
+        else:
+            ids = frozenset().union(*(self._postings[token] for token in self._tokens[start:end]))
+
+        with self._cache_lock:
+            if len(self._prefix_cache) >= self.max_cached_prefixes:
+                del self._prefix_cache[next(iter(self._prefix_cache))]
+            self._prefix_cache[prefix] = ids
+        return ids
+
+    def search(self, query: str, limit: int = 10) -> List[SearchHit]:
+        """
+        Best matches for a typeahead query
+
+        An exact SKU returns that product alone; otherwise every query token
+        must prefix-match some token of the product.
+        """
+        exact = self._by_sku.get(query.strip().lower())
+        if exact is not None:
+            return [self._hits[exact]]
+
+        candidates: Optional[FrozenSet[int]] = None
+        # Longest tokens first: they are usually the most selective
+        for token in sorted(set(query_tokens(query)), key=len, reverse=True):
+            ids = self._matching(token)
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return []
+        if candidates is None:
+            return []
+        return [self._hits[record_id] for record_id in nsmallest(limit, candidates)]
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "products": len(self._hits),
+            "tokens": len(self._tokens),
+            "cached_prefixes": len(self._prefix_cache)
+        }
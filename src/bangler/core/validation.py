@@ -3,12 +3,19 @@ from ..models.bangle import BangleSpec
 from ..models.pricing import PricingError
 from ..utils.formatting import BusinessFormatter
 from ..config.settings import BanglerConfig
+from .discovery import SizingStockLookup
 
 class BangleValidator:
-    """Input validation and business rules enforcement"""
+    """
+    Input validation and business rules enforcement
+
+    Shared by the CLI and PricingEngine.validate_specification, so both apply
+    the same rules and the same catalog availability check.
+    """
 
     def __init__(self):
         self.rules = BanglerConfig.BUSINESS_RULES
+        self.sizing_stock = SizingStockLookup()
 
     def validate_size(self, size: int) -> Union[bool, str]:
         """Validate bangle size"""
@@ -41,8 +48,20 @@ class BangleValidator:
         # If invalid quality is selected, SKU lookup will fail gracefully
         return True
 
-    def validate_complete_spec(self, spec: BangleSpec) -> Union[bool, List[str]]:
-        """Validate complete bangle specification"""
+    def is_orderable(self, spec: BangleSpec) -> bool:
+        """O(1) check that the catalog stocks the spec's shape/quality/width/thickness"""
+        return self.sizing_stock.get_orderable_combinations().is_orderable(
+            spec.metal_shape, spec.to_quality_string(), spec.width, spec.thickness
+        )
+
+    def validate_availability(self, spec: BangleSpec) -> Union[bool, str]:
+        """Validate that the combination can be ordered"""
+        if not self.is_orderable(spec):
+            return f"{spec.to_quality_string()} {spec.metal_shape} {spec.width} × {spec.thickness} is not stocked"
+        return True
+
+    def rule_violations(self, spec: BangleSpec) -> List[str]:
+        """Business rule errors (size, shape, color, quality) for a specification"""
         errors = []
 
         size_result = self.validate_size(spec.size)
@@ -61,4 +80,15 @@ class BangleValidator:
         if quality_result is not True:
             errors.append(quality_result)
 
+        return errors
+
+    def validate_complete_spec(self, spec: BangleSpec) -> Union[bool, List[str]]:
+        """Validate complete bangle specification"""
+        errors = self.rule_violations(spec)
+
+        if not errors:
+            availability_result = self.validate_availability(spec)
+            if availability_result is not True:
+                errors.append(availability_result)
+
         return True if not errors else errors
\ No newline at end of file
@@ -2,9 +2,9 @@ from dataclasses import dataclass
 from typing import Optional
 from decimal import Decimal
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BangleSpec:
-    """Customer bangle specifications - all 5 required variables"""
+    """Customer bangle specifications - all 5 required variables (immutable, hashable)"""
     size: int                    # 10-27
     metal_shape: str            # Flat, Comfort Fit, Low Dome, Half Round, Square, Triangle
     metal_color: str            # Yellow, White, Rose, Green, Sterling Silver
@@ -25,7 +25,18 @@ class BangleSpec:
         else:
             return self.metal_color  # Fallback to just color
 
-@dataclass
+    @classmethod
+    def from_quality_string(cls, size: int, metal_shape: str, quality: str,
+                            width: str, thickness: str) -> 'BangleSpec':
+        """Build a spec from a catalog quality string (e.g., '14K Yellow', 'Sterling Silver')"""
+        if quality in ["Sterling Silver", "Continuum Sterling Silver"]:
+            return cls(size, metal_shape, quality, None, width, thickness)
+
+        # Catalog qualities carry the color as the last word (e.g., '14K Rose')
+        color = quality.split()[-1] if quality else quality
+        return cls(size, metal_shape, color, quality, width, thickness)
+
+@dataclass(frozen=True, slots=True)
 class MaterialCalculation:
     """Results of material length calculation with detailed breakdown"""
     circumference_mm: float      # Converted from size
@@ -1,8 +1,9 @@
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple, Union
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BanglePrice:
     """Complete pricing breakdown for customer display"""
     sku: str                        # Stuller SKU found
@@ -19,6 +20,7 @@ class BanglePrice:
     overhead_cost: Optional[Decimal] = None
     base_price_delta: Optional[Decimal] = None  # Difference from default base price
     base_price_delta_percent: Optional[float] = None  # Percentage difference from default
+    price_fetched_at: Optional[float] = None  # Set when quoted from the last-known-price store (Unix time)
 
     def get_breakdown_display(self) -> dict:
         """Return user-friendly pricing breakdown"""
@@ -41,10 +43,88 @@ class BanglePrice:
             "Price per DWT": f"${self.material_cost_per_dwt:.2f}"
         }
 
+    @property
+    def price_age_seconds(self) -> Optional[float]:
+        """Age of the Stuller price used, if it came from the last-known-price store"""
+        if self.price_fetched_at is None:
+            return None
+        return max(time.time() - self.price_fetched_at, 0.0)
+
+@dataclass
+class AlternativeOption:
+    """Orderable substitute for a specification that isn't stocked"""
+    sku: str
+    width: str                          # e.g. '6 Mm'
+    thickness: str                      # e.g. '1.5 Mm'
+    distance_mm: float                  # Dimensional distance from the requested spec
+    total_price: Optional[Decimal] = None  # Quoted price at the requested size, if priced
+
 @dataclass
+class BudgetOption:
+    """Orderable SKU whose quoted price fits within a customer's budget"""
+    sku: str
+    width: str
+    thickness: str
+    total_price: Decimal                # Quoted price at the requested size
+    under_budget_by: Decimal            # Budget minus total price (>= 0)
+    price: BanglePrice                  # Full breakdown, as a normal quote
+
+@dataclass(frozen=True, slots=True)
 class PricingError:
     """Structured error information for business-friendly display"""
     error_type: str         # 'sku_not_found', 'api_unavailable', 'invalid_spec'
     user_message: str       # Business-friendly message
     technical_details: str  # For logging
-    suggested_action: str   # What user should do next
\ No newline at end of file
+    suggested_action: str   # What user should do next
+    alternatives: Tuple[AlternativeOption, ...] = ()  # Ranked substitutes (sku_not_found)
+
+@dataclass
+class PricingEvent:
+    """
+    One step of a quote, emitted as the pricing pipeline does the work
+
+    The last event of every quote has stage 'result' and carries the
+    BanglePrice or PricingError in `result`.
+    """
+    stage: str              # 'circumference', 'material_length', 'sku', 'live_price', 'material_weight', 'formula', 'result'
+    status: str             # 'started' or 'completed'
+    label: str              # Step name for display, e.g. 'Material length needed'
+    detail: Optional[str] = None                            # Formatted value, e.g. '8.25 inches'
+    payload: Dict[str, Any] = field(default_factory=dict)   # JSON-safe values for remote displays
+    elapsed_s: float = 0.0                                  # Seconds since the quote started
+    result: Optional[Union[BanglePrice, 'PricingError']] = None
+
+    def to_dict(self) -> dict:
+        """JSON-safe form (without the result object)"""
+        return {
+            'stage': self.stage,
+            'status': self.status,
+            'label': self.label,
+            'detail': self.detail,
+            'payload': self.payload,
+            'elapsed_s': round(self.elapsed_s, 4)
+        }
+
+@dataclass(frozen=True)
+class PricingParameters:
+    """
+    Per-request pricing inputs captured once at the start of a quote
+
+    Concurrent quotes each carry their own parameters instead of reading
+    shared, mutable configuration part-way through a calculation.
+    """
+    base_price: Decimal               # Base price applied to this quote
+    default_base_price: Decimal       # Configured default (for delta display)
+    k_factor: float                   # Neutral axis factor
+    seam_allowance_in: float          # Seam allowance inches
+    mm_per_inch: float = 25.4
+    round_up_increment: float = 0.25
+
+    def material_calc_config(self) -> dict:
+        """Material calculation config in MaterialCalculator's format"""
+        return {
+            'k_factor': self.k_factor,
+            'seam_allowance_in': self.seam_allowance_in,
+            'mm_per_inch': self.mm_per_inch,
+            'round_up_increment': self.round_up_increment
+        }
@@ -0,0 +1 @@
+"""HTTP pricing service for remote and web displays."""
@@ -0,0 +1,317 @@
+"""
+Pricing HTTP Service
+Standard-library HTTP server exposing the pricing engine to remote displays,
+with quote progress streamed as Server-Sent Events
+
+    GET  /health          Liveness check
+    GET  /price           One quote as JSON
+    GET  /price/events    One quote as an SSE stream of PricingEvents
+    POST /price/batch     Bulk quotes: {"specs": [{...}, ...]} -> {"results": [...]}
+    GET  /options         Shape -> quality -> width -> thickness tree
+    GET  /options?shape=  One shape's quality -> width -> thickness subtree
+    GET  /search?q=       Typeahead: products matching a SKU fragment or description
+    GET  /metrics         Scheduler queues, price cache and rate limiter stats
+
+Quote endpoints take the specification as query parameters (batch specs as
+JSON objects): size, shape, quality (e.g. '14K Yellow'), width, thickness and
+optional base_price. Quotes run on a PricingScheduler, so single quotes are
+served ahead of batch work.
+
+With a RequestProfiler (bangler --profile serve), a random sample of requests
+is profiled, including the scheduler work done on their behalf, and each
+writes a profile and hotspot summary under logs/.
+
+Search hits carry a price_query (shape, quality, width, thickness) that a
+frontend appends to /price?size=N to quote the product directly.
+
+Option responses carry a content-hash ETag (a distinct "-gz" one for the
+gzip-compressed body, served when the client accepts it) and answer
+If-None-Match with 304.
+"""
+
+import json
+import logging
+from dataclasses import asdict
+from decimal import Decimal, InvalidOperation
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from ..config.settings import BanglerConfig
+from ..core.options_payload import JsonPayload
+from ..core.pricing_engine import PricingEngine
+from ..core.scheduler import PricingScheduler
+from ..core.search_index import SearchHit
+from ..models.bangle import BangleSpec
+from ..models.pricing import BanglePrice, PricingError
+from ..utils.profiling import RequestProfiler
+
+logger = logging.getLogger(__name__)
+
+SPEC_PARAMETERS = ("size", "shape", "quality", "width", "thickness")
+MAX_BATCH_BODY_BYTES = 16 * 1024 * 1024
+MAX_SEARCH_HITS = 50
+
+
+def result_to_dict(result: Union[BanglePrice, PricingError]) -> dict:
+    """JSON-safe form of a quote result (money as decimal strings)"""
+    if isinstance(result, BanglePrice):
+        return {"success": True, "price": asdict(result), "breakdown": result.get_breakdown_display()}
+    return {"success": False, "error": asdict(result)}
+
+
+def search_hit_to_dict(hit: SearchHit) -> dict:
+    """JSON form of a search hit, with the query string that prices it at /price?size=N&..."""
+    return {
+        **hit._asdict(),
+        "price_query": urlencode({"shape": hit.shape, "quality": hit.quality,
+                                  "width": hit.width, "thickness": hit.thickness})
+    }
+
+
+def spec_from_query(query: Dict[str, list]) -> Tuple[BangleSpec, Optional[Decimal]]:
+    """
+    Build a specification from query parameters
+
+    Raises:
+        ValueError: If a parameter is missing or malformed
+    """
+    values = {name: (query.get(name) or [""])[0].strip() for name in SPEC_PARAMETERS + ("base_price",)}
+    missing = [name for name in SPEC_PARAMETERS if not values[name]]
+    if missing:
+        raise ValueError(f"Missing query parameters: {', '.join(missing)}")
+    try:
+        size = int(values["size"])
+    except ValueError:
+        raise ValueError("size must be a whole number") from None
+    try:
+        base_price = Decimal(values["base_price"]) if values["base_price"] else None
+    except InvalidOperation:
+        raise ValueError("base_price must be a dollar amount") from None
+
+    spec = BangleSpec.from_quality_string(size, values["shape"], values["quality"], values["width"], values["thickness"])
+    return spec, base_price
+
+
+def _etag_matches(if_none_match: Optional[str], *etags: str) -> bool:
+    """Weak comparison of an If-None-Match header against any of the given ETags"""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") in etags for tag in tags)
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an Accept-Encoding header allows gzip (q=0 refuses it)"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().lower()
+            try:
+                return not (q.startswith("q=") and float(q[2:] or 0) == 0)
+            except ValueError:
+                return False
+    return False
+
+
+class PricingRequestHandler(BaseHTTPRequestHandler):
+    """Routes GET requests to handler methods by path"""
+
+    server: "PricingServer"
+    server_version = "bangler"
+
+    ROUTES = {
+        "/health": "handle_health",
+        "/price": "handle_price",
+        "/price/events": "handle_price_events",
+        "/options": "handle_options",
+        "/search": "handle_search",
+        "/metrics": "handle_metrics",
+    }
+
+    POST_ROUTES = {
+        "/price/batch": "handle_price_batch",
+    }
+
+    def do_GET(self):
+        self._dispatch(self.ROUTES)
+
+    def do_POST(self):
+        self._dispatch(self.POST_ROUTES)
+
+    def _dispatch(self, routes: Dict[str, str]) -> None:
+        url = urlsplit(self.path)
+        handler = routes.get(url.path.rstrip("/") or "/")
+        if handler is None:
+            self.send_json({"error": f"Unknown path {url.path}"}, status=404)
+            return
+        profiler = self.server.profiler
+        session = profiler.sample(f"{self.command} {url.path}") if profiler is not None else None
+        try:
+            if session is None:
+                getattr(self, handler)(parse_qs(url.query))
+            else:
+                with session:
+                    session.run(getattr(self, handler), parse_qs(url.query))
+        except (BrokenPipeError, ConnectionResetError):
+            logger.info(f"Client disconnected during {url.path}")
+
+    def log_message(self, format, *args):
+        logger.info(f"{self.address_string()} - {format % args}")
+
+    # -- responses ------------------------------------------------------
+
+    def send_json(self, body: dict, status: int = 200) -> None:
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_payload(self, payload: JsonPayload) -> None:
+        """Send a pre-serialized JSON payload, honouring If-None-Match and gzip"""
+        compressed = _accepts_gzip(self.headers.get("Accept-Encoding"))
+        etag = payload.gzip_etag if compressed else payload.etag
+        # Either representation's tag validates: the content is the same
+        if _etag_matches(self.headers.get("If-None-Match"), payload.etag, payload.gzip_etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        data = payload.gzip_body if compressed else payload.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def send_event(self, name: str, data: dict, event_id: int) -> None:
+        """Write one Server-Sent Event and flush it to the client"""
+        self.wfile.write(f"id: {event_id}\nevent: {name}\ndata: {json.dumps(data, default=str)}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    # -- routes ---------------------------------------------------------
+
+    def handle_health(self, query: Dict[str, list]) -> None:
+        self.send_json({"status": "ok"})
+
+    def handle_options(self, query: Dict[str, list]) -> None:
+        payloads = self.server.engine.sizing_stock.get_options_payloads()
+        shape = (query.get("shape") or [""])[0]
+        if not shape:
+            self.send_payload(payloads.tree)
+            return
+        payload = payloads.for_shape(shape)
+        if payload is None:
+            self.send_json({"error": f"Shape '{shape}' is not stocked"}, status=404)
+            return
+        self.send_payload(payload)
+
+    def handle_search(self, query: Dict[str, list]) -> None:
+        text = (query.get("q") or [""])[0]
+        try:
+            limit = min(max(int((query.get("limit") or ["10"])[0]), 1), MAX_SEARCH_HITS)
+        except ValueError:
+            self.send_json({"error": "limit must be a whole number"}, status=400)
+            return
+        hits = self.server.engine.sizing_stock.get_search_index().search(text, limit)
+        self.send_json({"query": text, "hits": [search_hit_to_dict(hit) for hit in hits]})
+
+    def handle_price(self, query: Dict[str, list]) -> None:
+        try:
+            spec, base_price = spec_from_query(query)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, status=400)
+            return
+        result = self.server.scheduler.submit_quote(spec, base_price).result()
+        self.send_json(result_to_dict(result))
+
+    def handle_price_batch(self, query: Dict[str, list]) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not 0 < length <= MAX_BATCH_BODY_BYTES:
+            self.send_json({"error": f"Request body must be 1 to {MAX_BATCH_BODY_BYTES} bytes of JSON"}, status=400)
+            return
+        try:
+            items = json.loads(self.rfile.read(length))["specs"]
+            parsed = [spec_from_query({name: [str(value)] for name, value in item.items() if value is not None})
+                      for item in items]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self.send_json({"error": f"Invalid batch: {e}"}, status=400)
+            return
+
+        specs = [spec for spec, _ in parsed]
+        base_prices = [base_price for _, base_price in parsed]
+        results = self.server.scheduler.submit_bulk(specs, base_prices).result()
+        self.send_json({"results": [result_to_dict(result) for result in results]})
+
+    def handle_metrics(self, query: Dict[str, list]) -> None:
+        engine = self.server.engine
+        rate_limiter = engine.stuller_client.rate_limiter
+        self.send_json({
+            "scheduler": self.server.scheduler.get_metrics(),
+            "price_cache": engine.get_price_cache_stats(),
+            "rate_limit": rate_limiter.get_stats() if rate_limiter is not None else None,
+            "profiled_requests": self.server.profiler.sampled if self.server.profiler is not None else None
+        })
+
+    def handle_price_events(self, query: Dict[str, list]) -> None:
+        try:
+            spec, base_price = spec_from_query(query)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, status=400)
+            return
+
+        # HTTP/1.0 response without a length: the stream ends when the quote does
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+        for event_id, event in enumerate(self.server.scheduler.stream_quote(spec, base_price), start=1):
+            data = event.to_dict()
+            if event.result is not None:
+                data["result"] = result_to_dict(event.result)
+            self.send_event(event.stage, data, event_id)
+
+
+class PricingServer(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one PricingEngine and PricingScheduler across requests"""
+
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], engine: PricingEngine,
+                 handler_class=PricingRequestHandler, profiler: Optional[RequestProfiler] = None,
+                 owns_engine: bool = False):
+        super().__init__(address, handler_class)
+        self.engine = engine
+        self.scheduler = PricingScheduler(engine)
+        self.profiler = profiler
+        self.owns_engine = owns_engine      # Close the engine with the server
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.scheduler.shutdown(wait=False)
+        if self.owns_engine:
+            self.engine.close(wait=False)
+
+
+def create_server(host: Optional[str] = None, port: Optional[int] = None,
+                  engine: Optional[PricingEngine] = None,
+                  profiler: Optional[RequestProfiler] = None) -> PricingServer:
+    """Pricing server bound to host:port (defaults from BanglerConfig.SERVICE)"""
+    config = BanglerConfig.SERVICE
+    return PricingServer(
+        (host or config['host'], config['port'] if port is None else port),
+        engine or PricingEngine(),
+        profiler=profiler,
+        owns_engine=engine is None
+    )
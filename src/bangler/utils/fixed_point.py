@@ -0,0 +1,142 @@
+"""
+Fixed-point money for batch pricing paths.
+
+Money leaves the batch paths as integer cents that match f"{Decimal(...):.2f}"
+of PricingEngine's Decimal arithmetic digit for digit. The cents are not
+computed in pure integer arithmetic: a float fast path decides almost every
+amount, and an exact integer path takes over only where the float can't.
+
+Fast path: a float product is within 1e-6 cents of the Decimal result, so
+unless it lands within a guard band (TIE_GUARD_CENTS) of a half-cent tie,
+rounding the float gives the same cents. cents_or_none() returns None inside
+the band and the caller falls back to the exact path.
+
+Exact path: values are (coefficient, exponent) integer pairs - the same
+representation a Decimal uses - built straight from a float's shortest repr.
+Multiplication and addition round to the default Decimal context (28
+significant digits, ROUND_HALF_EVEN) exactly as Decimal does, and results
+become integer micro-dollars rounded to odd, which keeps enough information
+for the final half-even rounding to cents to be exact.
+"""
+
+import math
+from decimal import Decimal, DefaultContext
+from typing import Optional, Tuple, Union
+
+Parts = Tuple[int, int]             # (coefficient, exponent): value = coefficient * 10 ** exponent
+
+PRECISION = DefaultContext.prec     # 28 significant digits, as used by PricingEngine's Decimal math
+MICROS_PER_DOLLAR = 1_000_000
+MICROS_PER_CENT = 10_000
+
+# Float error on amounts below _FAST_LIMIT_CENTS stays under 1e-6 cents, far inside the guard band
+TIE_GUARD_CENTS = 1e-4
+_FAST_LIMIT_CENTS = 1e11
+
+_POW10 = tuple(10 ** i for i in range(128))
+_PRECISION_LIMIT = _POW10[PRECISION]
+
+
+def decimal_parts(value: Union[float, int, str, Decimal]) -> Parts:
+    """
+    Exact (coefficient, exponent) of Decimal(str(value))
+
+    Raises:
+        ValueError: For values Decimal would treat as special (inf, nan) or that aren't numbers
+    """
+    if isinstance(value, Decimal):
+        sign, digits, exponent = value.as_tuple()
+        if not isinstance(exponent, int):
+            raise ValueError(f"Not a finite amount: {value}")
+        coefficient = int("".join(map(str, digits)) or "0")
+        return (-coefficient if sign else coefficient), exponent
+
+    mantissa, _, exponent = str(value).strip().lower().partition("e")
+    whole, _, fraction = mantissa.partition(".")
+    return int(whole + fraction), int(exponent or 0) - len(fraction)
+
+
+def _digit_count(n: int) -> int:
+    """Number of decimal digits in a positive integer"""
+    estimate = (n.bit_length() * 1233) >> 12     # floor(bits * log10(2)), off by at most one
+    if estimate >= len(_POW10):
+        return len(str(n))
+    return estimate + 1 if n >= _POW10[estimate] else estimate
+
+
+def _round_half_even(n: int, drop: int) -> int:
+    """Non-negative n divided by 10**drop, rounded half-even"""
+    quotient, remainder = divmod(n, _POW10[drop])
+    half = _POW10[drop] >> 1
+    if remainder > half or (remainder == half and quotient & 1):
+        quotient += 1
+    return quotient
+
+
+def _round_context(coefficient: int, exponent: int) -> Parts:
+    """Round to PRECISION significant digits, as Decimal arithmetic does"""
+    n = -coefficient if coefficient < 0 else coefficient
+    if n < _PRECISION_LIMIT:
+        return coefficient, exponent
+    drop = _digit_count(n) - PRECISION
+    n = _round_half_even(n, drop)
+    return (-n if coefficient < 0 else n), exponent + drop
+
+
+def multiply(a: Parts, b: Parts) -> Parts:
+    """a * b with Decimal's default-context rounding"""
+    return _round_context(a[0] * b[0], a[1] + b[1])
+
+
+def add(a: Parts, b: Parts) -> Parts:
+    """a + b with Decimal's default-context rounding"""
+    exponent = min(a[1], b[1])
+    return _round_context(a[0] * _POW10[a[1] - exponent] + b[0] * _POW10[b[1] - exponent], exponent)
+
+
+def to_micros(value: Parts) -> int:
+    """
+    Value in integer micro-dollars, rounded to odd
+
+    Rounding to odd marks inexact results with an odd last digit, so rounding
+    the micros to cents later gives the same answer as rounding the exact
+    value (the four extra digits are more than the two that needs).
+    """
+    coefficient, exponent = value
+    shift = exponent + 6
+    if shift >= 0:
+        return coefficient * _POW10[shift]
+    n = -coefficient if coefficient < 0 else coefficient
+    quotient, remainder = divmod(n, _POW10[-shift])
+    if remainder and not quotient & 1:
+        quotient += 1
+    return -quotient if coefficient < 0 else quotient
+
+
+def micros_to_cents(micros: int) -> int:
+    """Micro-dollars rounded half-even to cents"""
+    n = _round_half_even(-micros if micros < 0 else micros, 4)
+    return -n if micros < 0 else n
+
+
+def format_cents(cents: int) -> str:
+    """Cents as a dollar string, e.g. 123457 -> '1234.57' (the format of f'{Decimal:.2f}')"""
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(-cents if cents < 0 else cents, 100)
+    return f"{sign}{dollars}.{cents:02d}"
+
+
+def cents_or_none(cents: float) -> Optional[int]:
+    """
+    Float amount in cents rounded half-even, or None if it is too close to a tie to decide
+
+    The float must carry no more than a few ulps of error relative to the
+    exact amount (one multiplication and one addition of repr-exact inputs).
+    """
+    if not -_FAST_LIMIT_CENTS < cents < _FAST_LIMIT_CENTS:
+        return None
+    whole = math.floor(cents)
+    fraction = cents - whole
+    if abs(fraction - 0.5) < TIE_GUARD_CENTS:
+        return None
+    return whole + (fraction > 0.5)
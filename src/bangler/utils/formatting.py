@@ -1,46 +1,58 @@
+from dataclasses import replace
 from typing import Dict, Any
 from ..models.pricing import PricingError
 
+# Shared, immutable error templates; format_error_for_user only copies one
+# when it has technical details to attach
+ERROR_TEMPLATES: Dict[str, PricingError] = {
+    'sku_not_found': PricingError(
+        error_type='sku_not_found',
+        user_message="We couldn't find that exact combination in our current inventory. Please try a different width or thickness, or check with our suppliers.",
+        technical_details="",
+        suggested_action="Try different dimensions or contact supplier"
+    ),
+    'api_unavailable': PricingError(
+        error_type='api_unavailable',
+        user_message="Our pricing system is temporarily unavailable. Please use manual pricing methods or try again in a few minutes.",
+        technical_details="",
+        suggested_action="Retry in 5 minutes or use backup pricing"
+    ),
+    'rate_limited': PricingError(
+        error_type='rate_limited',
+        user_message="Live pricing is busy right now. Please try again in a minute.",
+        technical_details="",
+        suggested_action="Retry shortly or use backup pricing"
+    ),
+    'invalid_combination': PricingError(
+        error_type='invalid_combination',
+        user_message="That combination of metal shape and dimensions isn't available. Please select from the available options.",
+        technical_details="",
+        suggested_action="Choose from filtered available options"
+    ),
+    'calculation_error': PricingError(
+        error_type='calculation_error',
+        user_message="There was an error calculating the material needed. Please double-check the size and try again.",
+        technical_details="",
+        suggested_action="Verify size input and retry"
+    ),
+    'unknown': PricingError(
+        error_type='unknown',
+        user_message="An unexpected error occurred. Please contact technical support.",
+        technical_details="",
+        suggested_action="Contact technical support"
+    )
+}
+
 class BusinessFormatter:
     """Formats technical information for business-friendly display"""
 
     @staticmethod
     def format_error_for_user(error_type: str, technical_details: str = "") -> PricingError:
         """Convert technical errors to business-friendly messages"""
-
-        error_mapping = {
-            'sku_not_found': PricingError(
-                error_type='sku_not_found',
-                user_message="We couldn't find that exact combination in our current inventory. Please try a different width or thickness, or check with our suppliers.",
-                technical_details=technical_details,
-                suggested_action="Try different dimensions or contact supplier"
-            ),
-            'api_unavailable': PricingError(
-                error_type='api_unavailable',
-                user_message="Our pricing system is temporarily unavailable. Please use manual pricing methods or try again in a few minutes.",
-                technical_details=technical_details,
-                suggested_action="Retry in 5 minutes or use backup pricing"
-            ),
-            'invalid_combination': PricingError(
-                error_type='invalid_combination',
-                user_message="That combination of metal shape and dimensions isn't available. Please select from the available options.",
-                technical_details=technical_details,
-                suggested_action="Choose from filtered available options"
-            ),
-            'calculation_error': PricingError(
-                error_type='calculation_error',
-                user_message="There was an error calculating the material needed. Please double-check the size and try again.",
-                technical_details=technical_details,
-                suggested_action="Verify size input and retry"
-            )
-        }
-
-        return error_mapping.get(error_type, PricingError(
-            error_type='unknown',
-            user_message="An unexpected error occurred. Please contact technical support.",
-            technical_details=technical_details,
-            suggested_action="Contact technical support"
-        ))
+        template = ERROR_TEMPLATES.get(error_type, ERROR_TEMPLATES['unknown'])
+        if not technical_details:
+            return template
+        return replace(template, technical_details=technical_details)
 
     @staticmethod
     def format_price_breakdown(price_breakdown: Dict[str, str]) -> str:
@@ -51,6 +63,17 @@ class BusinessFormatter:
         lines.append("=" * 25)
         return "\n".join(lines)
 
+    @staticmethod
+    def format_age(seconds: float) -> str:
+        """Human-friendly age like '45s', '12m', '3h' or '2d'"""
+        if seconds < 60:
+            return f"{int(seconds)}s"
+        if seconds < 3600:
+            return f"{int(seconds // 60)}m"
+        if seconds < 86400:
+            return f"{int(seconds // 3600)}h"
+        return f"{int(seconds // 86400)}d"
+
     @staticmethod
     def format_material_details(material_calc: 'MaterialCalculation') -> str:
         """Format material calculation details"""
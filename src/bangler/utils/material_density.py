@@ -175,6 +175,26 @@ class MaterialDensity:
             'mm3_per_cm3': 1000.0
         }
 
+    def dwt_per_inch(self, width_mm: float, thickness_mm: float, density: float) -> float:
+        """
+        Weight per inch of strip for a known density
+
+        Uses the same arithmetic as calculate_theoretical_weight, so batch paths
+        that precompute densities produce bit-identical weights.
+
+        Args:
+            width_mm: Width in millimeters
+            thickness_mm: Thickness in millimeters
+            density: Density in g/cm³
+
+        Returns:
+            DWT per inch of strip
+        """
+        constants = self.get_conversion_constants()
+        volume_cm3_per_in = (width_mm * thickness_mm * constants['mm_per_inch']) / constants['mm3_per_cm3']
+        g_per_in = volume_cm3_per_in * density
+        return g_per_in / constants['grams_per_dwt']
+
     def calculate_theoretical_weight(self, width_mm: float, thickness_mm: float,
                                    length_inches: float, quality: str,
                                    color: str = 'Yellow') -> Dict[str, float]:
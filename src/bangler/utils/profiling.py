@@ -0,0 +1,243 @@
+"""
+Profiling for CLI sessions and sampled service requests.
+
+A ProfileSession collects cProfile data from every thread that does work on
+its behalf (the calling thread plus pricing scheduler and live-price workers,
+which pick up the active session through a context variable), optionally
+traces allocations with tracemalloc, and writes a timestamped .prof file and
+a plain-text hotspot summary under the profile directory.
+
+Up to Python 3.11 each thread's work runs under its own profiler and the
+results are merged. From 3.12 cProfile uses the process-wide sys.monitoring
+profiler slot: one profiler already sees every thread, and only one can be
+active at a time. There a session enables a single profiler for its whole
+duration, and a session that finds the slot taken (an overlapping sampled
+request) runs unprofiled rather than failing.
+
+Load a .prof file with `python -m pstats <file>` or a viewer such as snakeviz.
+"""
+
+import cProfile
+import io
+import logging
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from ..config.settings import BanglerConfig
+
+logger = logging.getLogger(__name__)
+
+_active_session: ContextVar[Optional["ProfileSession"]] = ContextVar("bangler_profile_session", default=None)
+
+# From 3.12 one cProfile profiler covers all threads and only one may be enabled at a time
+PROCESS_WIDE_PROFILER = sys.version_info >= (3, 12)
+
+# tracemalloc is process-wide: overlapping sessions share one trace
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+
+
+def _start_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(BanglerConfig.PROFILING['traceback_frames'])
+        _tracemalloc_users += 1
+
+
+def _stop_tracemalloc() -> None:
+    global _tracemalloc_users
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0:
+            tracemalloc.stop()
+
+
+def current_session() -> Optional["ProfileSession"]:
+    """The profile session active in this context, if any"""
+    return _active_session.get()
+
+
+def propagate(fn: Callable) -> Callable:
+    """fn, profiled into the current session when it runs (for work handed to another thread)"""
+    session = _active_session.get()
+    return fn if session is None else partial(session.run, fn)
+
+
+class ProfileSession:
+    """
+    One profiled unit of work: a CLI session or a service request
+
+    Use as a context manager and call run() for the work itself:
+
+        with ProfileSession("cli-matrix") as session:
+            session.run(handler, args)
+
+    Args:
+        label: Short name used in the file names (e.g. 'cli-matrix', 'GET-price')
+        memory: Also trace allocations with tracemalloc (slower; process-wide)
+        top: Number of hotspots listed in the summary
+        directory: Where profiles are written (default: BanglerConfig.PROFILING['directory'])
+    """
+
+    def __init__(self, label: str, memory: bool = False, top: Optional[int] = None,
+                 directory: Optional[str] = None):
+        config = BanglerConfig.PROFILING
+        self.label = re.sub(r"[^A-Za-z0-9_.]+", "-", label).strip("-") or "session"
+        self.memory = memory
+        self.top = top or config['top']
+        self.directory = Path(directory or config['directory'])
+        self.paths: Optional[Tuple[Path, Path]] = None
+
+        self._lock = threading.Lock()
+        self._profiles: List[cProfile.Profile] = []
+        self._session_profile: Optional[cProfile.Profile] = None
+        self.unprofiled_runs = 0        # Runs skipped because another profiler held the slot
+        self._token = None
+        self._started_at = 0.0
+        self._wall_s = 0.0
+
+    def _enable(self) -> Optional[cProfile.Profile]:
+        """A started profiler kept by this session, or None if another profiling tool is active"""
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            with self._lock:
+                self.unprofiled_runs += 1
+            return None
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def run(self, fn: Callable, *args, **kwargs):
+        """
+        Call fn as part of this session
+
+        Up to 3.11 fn runs under a fresh profiler for this thread; from 3.12
+        the session's own profiler already covers it. If no profiler can be
+        enabled, fn still runs, unprofiled.
+        """
+        profile = None if PROCESS_WIDE_PROFILER else self._enable()
+        token = _active_session.set(self)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            if profile is not None:
+                profile.disable()
+            _active_session.reset(token)
+
+    def __enter__(self) -> "ProfileSession":
+        self._started_at = time.perf_counter()
+        if self.memory:
+            _start_tracemalloc()
+        if PROCESS_WIDE_PROFILER:
+            self._session_profile = self._enable()
+            if self._session_profile is None:
+                logger.warning(f"Profiler busy; {self.label} runs unprofiled")
+        self._token = _active_session.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if self._session_profile is not None:
+            self._session_profile.disable()
+        _active_session.reset(self._token)
+        self._wall_s = time.perf_counter() - self._started_at
+        snapshot = None
+        peak = None
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            _stop_tracemalloc()
+        try:
+            self.paths = self._write(snapshot, peak)
+            logger.info(f"Profile for {self.label} written to {self.paths[1]}")
+        except OSError as e:
+            logger.warning(f"Could not write profile for {self.label}: {e}")
+
+    # -- output ---------------------------------------------------------
+
+    def _stats(self, stream: io.StringIO) -> Optional[pstats.Stats]:
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = None
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile, stream=stream)
+            else:
+                stats.add(profile)
+        return stats
+
+    def _write(self, snapshot: Optional[tracemalloc.Snapshot], peak: Optional[int]) -> Tuple[Path, Path]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{self.label}"
+        prof_path = self.directory / f"{stem}.prof"
+        summary_path = self.directory / f"{stem}.txt"
+
+        buffer = io.StringIO()
+        buffer.write(f"Profile: {self.label}\n")
+        buffer.write(f"Wall time: {self._wall_s:.3f}s across {len(self._profiles)} profiled thread run(s)\n")
+        if self.unprofiled_runs:
+            buffer.write(f"Unprofiled: {self.unprofiled_runs} run(s) found another profiler active\n")
+        buffer.write("\n")
+
+        stats = self._stats(buffer)
+        if stats is None:
+            buffer.write("No profiled calls.\n")
+        else:
+            stats.dump_stats(str(prof_path))
+            buffer.write(f"Top {self.top} by cumulative time\n")
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top)
+            buffer.write(f"Top {self.top} by own time\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(self.top)
+
+        if snapshot is not None:
+            snapshot = snapshot.filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            ))
+            buffer.write(f"Peak traced memory: {peak / 1024:.1f} KiB (all threads)\n")
+            buffer.write(f"Top {self.top} allocation sites still held at the end\n")
+            for stat in snapshot.statistics("lineno")[:self.top]:
+                buffer.write(f"  {stat}\n")
+
+        summary_path.write_text(buffer.getvalue(), encoding="utf-8")
+        return prof_path, summary_path
+
+
+class RequestProfiler:
+    """
+    Profiles a random sample of service requests
+
+    Args:
+        sample_rate: Fraction of requests profiled, 0 to 1 (default: BanglerConfig.PROFILING['sample_rate'])
+        memory: Trace allocations for sampled requests
+        top: Hotspots listed in each summary
+    """
+
+    def __init__(self, sample_rate: Optional[float] = None, memory: bool = False, top: Optional[int] = None):
+        rate = BanglerConfig.PROFILING['sample_rate'] if sample_rate is None else sample_rate
+        self.sample_rate = min(max(rate, 0.0), 1.0)
+        self.memory = memory
+        self.top = top
+        self.sampled = 0
+
+    def sample(self, label: str) -> Optional[ProfileSession]:
+        """A session for this request if it falls in the sample, otherwise None"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        self.sampled += 1
+        return ProfileSession(label, memory=self.memory, top=self.top)
@@ -0,0 +1,88 @@
+"""
+Streaming CSV / JSON Lines serialization for bulk results.
+
+A RecordSerializer reads a fixed list of columns straight off each record
+(attributes of slotted result objects, or positions of tuple rows) and
+writes them out one row at a time, without building a dict per record.
+"""
+
+import csv
+import math
+from decimal import Decimal
+from json.encoder import encode_basestring_ascii
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, Iterable, Sequence, TextIO
+
+
+def _json_number(value: Any) -> str:
+    return repr(value)
+
+
+def _json_float(value: float) -> str:
+    # JSON has no NaN or infinity; write them as null rather than invalid text
+    return repr(value) if math.isfinite(value) else "null"
+
+
+# Money stays a string so no JSON parser turns it into a binary float
+_JSON_ENCODERS: Dict[type, Callable[[Any], str]] = {
+    str: encode_basestring_ascii,
+    int: _json_number,
+    float: _json_float,
+    bool: lambda value: "true" if value else "false",
+    type(None): lambda value: "null",
+    Decimal: lambda value: encode_basestring_ascii(str(value)),
+}
+
+
+def json_value(value: Any) -> str:
+    """JSON text for a scalar column value (anything unrecognised is written as its string)"""
+    encoder = _JSON_ENCODERS.get(type(value))
+    if encoder is None:
+        return encode_basestring_ascii(str(value))
+    return encoder(value)
+
+
+class RecordSerializer:
+    """
+    Writes records as CSV rows or JSON lines, column by column
+
+    Args:
+        columns: Column names, in output order
+        positional: Read values by position (tuples and NamedTuples) instead of by attribute name
+    """
+
+    def __init__(self, columns: Sequence[str], positional: bool = False):
+        self.columns = tuple(columns)
+        getter = itemgetter(*range(len(self.columns))) if positional else attrgetter(*self.columns)
+        # itemgetter/attrgetter return a bare value (not a tuple) for a single column
+        self._values = getter if len(self.columns) > 1 else (lambda record: (getter(record),))
+        self._keys = tuple(encode_basestring_ascii(column) + ":" for column in self.columns)
+
+    def values(self, record: Any) -> tuple:
+        return self._values(record)
+
+    def write_csv(self, records: Iterable[Any], output: TextIO, header: bool = True) -> int:
+        """Write records as CSV, returning the number of rows"""
+        writer = csv.writer(output)
+        if header:
+            writer.writerow(self.columns)
+        count = 0
+        for record in records:
+            writer.writerow(self._values(record))
+            count += 1
+        return count
+
+    def jsonl_line(self, record: Any) -> str:
+        """One record as a JSON object on a single line (with trailing newline)"""
+        return "{" + ",".join(
+            key + json_value(value) for key, value in zip(self._keys, self._values(record))
+        ) + "}\n"
+
+    def write_jsonl(self, records: Iterable[Any], output: TextIO) -> int:
+        """Write records as JSON Lines, returning the number of lines"""
+        count = 0
+        line = self.jsonl_line
+        for record in records:
+            output.write(line(record))
+            count += 1
+        return count
@@ -0,0 +1,45 @@
+"""Budget solving must not come up short when estimates undershoot exact quotes"""
+
+import dataclasses
+from decimal import Decimal
+
+import pytest
+
+from bangler.core.pricing_engine import PricingEngine
+
+
+@pytest.fixture(autouse=True)
+def stuller_credentials(monkeypatch):
+    monkeypatch.setenv("STULLER_USERNAME", "test")
+    monkeypatch.setenv("STULLER_PASSWORD", "test")
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    with PricingEngine() as engine:
+        monkeypatch.setattr(engine, "_get_products",
+                            lambda skus: {sku: {"Price": {"Value": 20.0}} for sku in skus})
+        yield engine
+
+
+def test_budget_keeps_pricing_when_closest_estimates_miss(engine, monkeypatch):
+    budget = Decimal("700")
+    closest = engine.solve_budget(18, "Half Round", "14K Yellow", budget, k=3)
+    assert len(closest) == 3
+
+    # Exact quotes for the closest estimates land just over the budget
+    missed = {option.sku for option in closest}
+    exact = engine._price_from_product
+
+    def undershot_estimate(spec, sku, *args, **kwargs):
+        price = exact(spec, sku, *args, **kwargs)
+        if sku in missed:
+            return dataclasses.replace(price, total_price=budget + Decimal("0.01"))
+        return price
+
+    monkeypatch.setattr(engine, "_price_from_product", undershot_estimate)
+    options = engine.solve_budget(18, "Half Round", "14K Yellow", budget, k=3)
+    assert len(options) == 3
+    assert not missed & {option.sku for option in options}
+    assert all(option.total_price <= budget for option in options)
+    assert [option.under_budget_by for option in options] == sorted(option.under_budget_by for option in options)
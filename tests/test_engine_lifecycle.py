@@ -0,0 +1,33 @@
+"""Short-lived engines must not leave live-lookup threads behind"""
+
+import threading
+
+import pytest
+
+from bangler.core.discovery import SizingStockLookup
+from bangler.core.pricing_engine import PricingEngine
+
+
+@pytest.fixture(autouse=True)
+def stuller_credentials(monkeypatch):
+    monkeypatch.setenv("STULLER_USERNAME", "test")
+    monkeypatch.setenv("STULLER_PASSWORD", "test")
+
+
+def live_threads() -> int:
+    return sum(thread.name.startswith("bangler-live-price") for thread in threading.enumerate())
+
+
+def test_closed_engine_leaves_no_live_threads():
+    before = live_threads()
+    for _ in range(3):
+        with PricingEngine() as engine:
+            engine._live_pool.submit(lambda: None).result()
+    assert live_threads() == before
+
+
+def test_cache_stats_describe_the_published_catalog():
+    lookup = SizingStockLookup()
+    stats = lookup.get_cache_stats()
+    assert stats["source"] == str(lookup.csv_path)
+    assert stats["products"] == len(lookup.snapshot) == lookup.load_report.rows_loaded
@@ -0,0 +1,74 @@
+"""Fixed-point money must round to the same cents as the Decimal pricing path"""
+
+from decimal import Decimal
+
+import pytest
+
+from bangler.core.catalog_loader import load_catalog
+from bangler.core.discovery import SizingStockLookup
+from bangler.core.price_matrix import PriceMatrix, synthetic_prices
+from bangler.utils import fixed_point
+
+GUARD = fixed_point.TIE_GUARD_CENTS
+
+
+def decimal_cents(value: Decimal) -> str:
+    return f"{value:.2f}"
+
+
+def exact_cents(value: fixed_point.Parts) -> str:
+    return fixed_point.format_cents(fixed_point.micros_to_cents(fixed_point.to_micros(value)))
+
+
+@pytest.mark.parametrize("price, weight", [
+    ("0.125", "0.1"),           # 0.0125: tie, rounds down to even
+    ("2.5", "0.01"),            # 0.025
+    ("0.35", "0.1"),            # 0.035: tie, rounds up to even
+    ("1234.5", "0.001"),        # 1.2345
+    ("87.08678", "3.25"),
+    ("19.999999999999996", "0.30000000000000004"),
+])
+def test_exact_path_matches_decimal_on_ties(price, weight):
+    product = fixed_point.multiply(fixed_point.decimal_parts(price), fixed_point.decimal_parts(weight))
+    expected = Decimal(price) * Decimal(weight)
+    assert exact_cents(product) == decimal_cents(expected)
+
+    base = Decimal("475.00")
+    total = fixed_point.add(product, fixed_point.decimal_parts(base))
+    assert exact_cents(total) == decimal_cents(expected + base)
+
+
+@pytest.mark.parametrize("cents, expected", [
+    (1050.5, None),
+    (1050.5 + 0.99 * GUARD, None),
+    (1050.5 - 0.99 * GUARD, None),
+    (1050.5 + 1.01 * GUARD, 1051),
+    (1050.5 - 1.01 * GUARD, 1050),
+    (1050.49, 1050),
+    (-1050.51, -1051),
+    (1e12, None),
+])
+def test_fast_path_defers_inside_guard_band(cents, expected):
+    assert fixed_point.cents_or_none(cents) == expected
+
+
+def test_matrix_fixed_point_matches_decimal_on_bundled_catalog(monkeypatch):
+    catalog, _ = load_catalog(SizingStockLookup.find_latest_csv())
+    prices = synthetic_prices(catalog)
+
+    decided = {"fast": 0, "exact": 0}
+    cents_or_none = fixed_point.cents_or_none
+
+    def counting(cents):
+        result = cents_or_none(cents)
+        decided["fast" if result is not None else "exact"] += 1
+        return result
+
+    monkeypatch.setattr(fixed_point, "cents_or_none", counting)
+
+    compared, mismatches = PriceMatrix(catalog, prices=prices, workers=1).verify_fixed_point()
+    assert mismatches == []
+    assert compared > 10_000
+    # The synthetic prices must exercise both the float fast path and the exact fallback
+    assert decided["fast"] > 0
+    assert decided["exact"] > 0
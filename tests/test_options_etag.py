@@ -0,0 +1,52 @@
+"""Plain and gzip option bodies are distinct representations with distinct ETags"""
+
+import gzip
+import http.client
+import json
+import threading
+
+import pytest
+
+from bangler.service.server import create_server
+
+
+@pytest.fixture(scope="module")
+def server():
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setenv("STULLER_USERNAME", "test")
+        patch.setenv("STULLER_PASSWORD", "test")
+        server = create_server("127.0.0.1", 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def get(server, **headers):
+    conn = http.client.HTTPConnection(*server.server_address[:2], timeout=10)
+    conn.request("GET", "/options?shape=Flat", headers=headers)
+    response = conn.getresponse()
+    body = response.read()
+    conn.close()
+    return response, body
+
+
+def test_gzip_body_has_its_own_etag(server):
+    plain, plain_body = get(server)
+    packed, packed_body = get(server, **{"Accept-Encoding": "gzip"})
+    assert packed.getheader("Content-Encoding") == "gzip"
+    assert json.loads(gzip.decompress(packed_body)) == json.loads(plain_body)
+    assert packed.getheader("ETag") == plain.getheader("ETag")[:-1] + '-gz"'
+    assert plain.getheader("Vary") == packed.getheader("Vary") == "Accept-Encoding"
+
+
+@pytest.mark.parametrize("accept_encoding", ["identity", "gzip"])
+def test_either_tag_revalidates(server, accept_encoding):
+    plain, _ = get(server)
+    packed, _ = get(server, **{"Accept-Encoding": "gzip"})
+    for etag in (plain.getheader("ETag"), packed.getheader("ETag"), "W/" + packed.getheader("ETag")):
+        response, body = get(server, **{"Accept-Encoding": accept_encoding, "If-None-Match": etag})
+        assert response.status == 304 and body == b""
+        expected = packed if accept_encoding == "gzip" else plain
+        assert response.getheader("ETag") == expected.getheader("ETag")
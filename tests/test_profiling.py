@@ -0,0 +1,57 @@
+"""Profiled sessions must never break the work they profile"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bangler.utils.profiling import ProfileSession, propagate
+
+
+def priced_work(n: int) -> int:
+    return sum(i * i for i in range(n * 1000))
+
+
+def test_propagated_call_runs_while_session_profiler_active(tmp_path):
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with ProfileSession("propagated", directory=str(tmp_path)) as session:
+            result = session.run(lambda: pool.submit(propagate(priced_work), 3).result())
+
+    assert result == priced_work(3)
+    prof_path, summary_path = session.paths
+    assert prof_path.exists()
+    assert "priced_work" in summary_path.read_text(encoding="utf-8")
+
+
+def test_overlapping_sessions_both_complete(tmp_path):
+    # Concurrently sampled service requests: each session's work must still run
+    barrier = threading.Barrier(2)
+    results, errors = {}, []
+
+    def request(label: str) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                with ProfileSession(label, directory=str(tmp_path)) as session:
+                    barrier.wait(timeout=5)
+                    results[label] = session.run(lambda: pool.submit(propagate(priced_work), 2).result())
+                    barrier.wait(timeout=5)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=request, args=(label,)) for label in ("first", "second")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert errors == []
+    assert results == {"first": priced_work(2), "second": priced_work(2)}
+
+
+def test_errors_from_profiled_work_propagate(tmp_path):
+    def fails() -> None:
+        raise ValueError("bad specification")
+
+    with ProfileSession("failing", directory=str(tmp_path)) as session:
+        with pytest.raises(ValueError, match="bad specification"):
+            session.run(fails)
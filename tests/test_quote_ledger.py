@@ -0,0 +1,44 @@
+"""Ledger queries apply date bounds and limits in SQL"""
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from bangler.core.quote_ledger import QuoteLedger
+from bangler.models.bangle import BangleSpec
+from bangler.models.pricing import BanglePrice
+
+
+def quote(sku: str) -> BanglePrice:
+    return BanglePrice(
+        sku=sku, base_price=Decimal("475.00"), material_cost_per_dwt=Decimal("20"),
+        material_weight_dwt=Decimal("5"), material_total_cost=Decimal("100.00"), material_length_in=7.5,
+        total_price=Decimal("575.00")
+    )
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    ledger = QuoteLedger(tmp_path / "quotes.db")
+    spec = BangleSpec(size=18, metal_shape="Flat", metal_color="Yellow", metal_quality="14k",
+                      width="3 Mm", thickness="1.5 Mm")
+    for day in range(1, 11):
+        sku = "A" if day % 2 else "B"
+        ledger.record(spec, quote(sku), customer_ref=sku.lower(), quoted_at=datetime(2025, 10, day).timestamp())
+    yield ledger
+    ledger.close()
+
+
+def days(records):
+    return [datetime.fromtimestamp(record.quoted_at).day for record in records]
+
+
+def test_recent_returns_latest_in_range_newest_first(ledger):
+    assert days(ledger.recent(datetime(2025, 10, 2), datetime(2025, 10, 9), limit=3)) == [8, 7, 6]
+    assert days(ledger.recent(limit=2)) == [10, 9]
+
+
+def test_sku_and_customer_queries_honour_date_bounds(ledger):
+    assert days(ledger.recent_for_sku("A", 10, start=datetime(2025, 10, 4))) == [9, 7, 5]
+    assert days(ledger.for_customer("b", end=datetime(2025, 10, 6))) == [4, 2]
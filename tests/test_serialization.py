@@ -0,0 +1,78 @@
+"""JSON Lines written by RecordSerializer must parse back to the same values"""
+
+import io
+import json
+import math
+from decimal import Decimal
+from typing import NamedTuple, Optional
+
+import pytest
+
+from bangler.core.catalog_loader import load_catalog
+from bangler.core.discovery import SizingStockLookup
+from bangler.core.price_matrix import MATRIX_SERIALIZER, PriceMatrix, synthetic_prices
+from bangler.utils.serialization import RecordSerializer, json_value
+
+
+class Row(NamedTuple):
+    name: str
+    count: int
+    ratio: float
+    price: Optional[Decimal]
+    active: bool
+
+
+ROWS = [
+    Row('plain', 1, 0.1, Decimal("475.00"), True),
+    Row('quote "and" \\ backslash\n', -2, 1e-300, Decimal("0.005"), False),
+    Row('unicode ×', 0, 1.7976931348623157e308, None, True),
+    Row('nan', 3, math.nan, Decimal("12.3"), False),
+    Row('inf', 4, math.inf, Decimal("1"), True),
+    Row('-inf', 5, -math.inf, Decimal("-7.50"), False),
+]
+
+
+def expected(row: Row) -> dict:
+    return {
+        "name": row.name,
+        "count": row.count,
+        "ratio": row.ratio if math.isfinite(row.ratio) else None,
+        "price": str(row.price) if row.price is not None else None,
+        "active": row.active,
+    }
+
+
+@pytest.mark.parametrize("positional", [True, False])
+def test_jsonl_round_trips(positional):
+    serializer = RecordSerializer(Row._fields, positional=positional)
+    buffer = io.StringIO()
+    assert serializer.write_jsonl(ROWS, buffer) == len(ROWS)
+
+    lines = buffer.getvalue().splitlines()
+    # Strict parsing: NaN/Infinity literals would be rejected here
+    parsed = [json.loads(line, parse_constant=lambda name: pytest.fail(f"non-JSON constant {name}")) for line in lines]
+    assert parsed == [expected(row) for row in ROWS]
+
+
+@pytest.mark.parametrize("value", [math.nan, math.inf, -math.inf])
+def test_non_finite_floats_are_null(value):
+    assert json_value(value) == "null"
+
+
+def test_matrix_jsonl_round_trips():
+    catalog, _ = load_catalog(SizingStockLookup.find_latest_csv())
+    records = catalog.records[:50]
+    matrix = PriceMatrix(records, prices=synthetic_prices(records), workers=1)
+
+    buffer = io.StringIO()
+    count = matrix.write_jsonl(buffer)
+    lines = buffer.getvalue().splitlines()
+    assert count == len(lines) > 0
+
+    for row, line in zip(matrix.iter_rows(), lines):
+        parsed = json.loads(line)
+        assert list(parsed) == list(MATRIX_SERIALIZER.columns)
+        assert parsed["sku"] == row.sku
+        assert parsed["material_weight_dwt"] == row.material_weight_dwt
+        if row.total_price is not None:
+            assert Decimal(parsed["total_price"]) == row.total_price